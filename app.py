@@ -153,8 +153,11 @@ def main():
                 with typing_placeholder:
                     ui.render_typing_indicator()
                 
-                # Generate bot response
-                bot_response = chatbot_engine.process_message(chat_history[-1].content, selected_language)
+                # Stream the bot response into the bubble; the typing indicator stays until the first chunk
+                bot_response = ""
+                for chunk in chatbot_engine.process_message_stream(chat_history[-1].content, selected_language):
+                    bot_response += chunk
+                    ui.render_streaming_bot_message(typing_placeholder, bot_response)
                 chat_session.add_message(bot_response, is_user=False)
                 app_logger.info(f"Bot response generated successfully")
                 
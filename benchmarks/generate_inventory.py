@@ -0,0 +1,152 @@
+"""
+Synthetic inventory generator for the search benchmarks.
+
+Writes a complete data/ directory (trucks.csv, new_trucks.csv, used_trucks.csv,
+the two detail-page scrapes, plus the real contact and dealer files) with
+`rows` vehicles in the same formats as the scraped sources.
+
+    python benchmarks/generate_inventory.py --rows 10000 --output /tmp/inventory-10k
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+BRANDS = ['STX', 'AKX', 'KETTERER', 'REYDAMS']
+CHASSIS = [
+    ('Scania', 'P 410'), ('Scania', 'S 500'), ('Volvo', 'FH 540'), ('Mercedes', 'Actros L 2551'),
+    ('Mercedes', 'Actros S 2540'), ('Renault', 'Master 170 HP'), ('Renault', 'D-Range'),
+    ('Ford', 'Transit'), ('Iveco', 'Stralis 350'), ('MAN', 'TGX 18.510'), ('DAF', 'XF 480')
+]
+WEIGHT_BY_HORSES = {2: '3,5T', 3: '7,5T', 4: '16T', 5: '18T', 6: '26T', 7: '26T', 8: '26T', 9: '32T'}
+HORSE_FEATURES = [
+    'Rubber flooring', 'Skylights', 'Cooling fans', 'Surveillance camera', 'Adjustable partitions',
+    'Side and rear ramp', 'Blanket rack', 'Saddle cupboard', 'Temperature registration', 'Water hose'
+]
+LIVING_FEATURES = [
+    'Luxurious upholstered walls', 'Leather seats', 'Satellite TV', 'Flat screen', 'Kitchenette',
+    'Refrigerator', 'Induction cooking plate', 'Shower', 'Toilet', 'Air conditioning'
+]
+OPTIONS = [
+    'Automatic gearbox', 'Alcoa Rims', 'Generator', 'Cameras (horse area and rearview)',
+    'Pop Out', 'Push-Up', 'Tackbox with lift', 'Extended tackroom'
+]
+# A short stand-in for the cookie banner and country picker every scraped page carries
+BOILERPLATE = (
+    'Manage Consent To provide the best experiences, we use technologies like cookies to store '
+    'and/or access device information. Functional Always active Preferences Statistics Marketing '
+    'Accept Decline View preferences Cookie Policy Privacy Policy Back GET YOUR OFFER Localisation* '
+    'Austria Belgium Denmark France Germany Italy Netherlands Norway Spain Sweden United Kingdom'
+)
+FOOTER = 'Share: E-mail Discover our vehicles in stock Manage consent'
+
+
+def _vehicle(i: int, rng: random.Random) -> dict:
+    brand = rng.choice(BRANDS)
+    make, model = rng.choice(CHASSIS)
+    horses = rng.choice(list(WEIGHT_BY_HORSES))
+    used = rng.random() < 0.45
+    year = rng.randint(2000, 2024) if used else rng.randint(2024, 2025)
+    name = f"{brand} HORSEBOX {make} {model} {horses} Horses {i:07d}"
+    slug = name.lower().replace(' ', '-').replace('.', '')
+    return {
+        'id': i + 1,
+        'name': name,
+        'brand': brand,
+        'chassis': f"{make} {model}",
+        'weight': WEIGHT_BY_HORSES[horses],
+        'horses': horses,
+        'year': year,
+        'used': used,
+        'mileage': rng.randint(5, 400) * 1000 if used else 0,
+        'price': rng.randint(25, 400) * 1000,
+        'horse_features': rng.sample(HORSE_FEATURES, 5),
+        'living_features': rng.sample(LIVING_FEATURES, 4),
+        'options': rng.sample(OPTIONS, 3),
+        'url': f"https://stephexhorsetrucks.com/vehicles/{slug}/",
+        'image_url': f"https://stephexhorsetrucks.com/wp-content/uploads/{year}/{slug}-720x460.jpg"
+    }
+
+
+def _detail_content(v: dict) -> str:
+    specs = f"Brand: {v['brand']} Chassis: {v['chassis']} Weight: {v['weight']} Horses: {v['horses']} Year: {v['year']}"
+    if v['used']:
+        specs += f" Mileage: {v['mileage']} km"
+    features = f"Horse Area {' '.join(v['horse_features'])} Living Area {' '.join(v['living_features'])}"
+    return f"{BOILERPLATE} Back {v['name']} {specs} Features {features} GET YOUR OFFER Options {' '.join(v['options'])} {FOOTER}"
+
+
+def isolate_global_index():
+    """
+    Importing src.utils.inventory_index builds the app's global index and, by
+    default, writes a knowledge snapshot into the real data/. The benchmarks
+    build their own indexes, so keep the global one in memory; call this
+    before importing anything from src.
+    """
+    os.environ['USE_KNOWLEDGE_SNAPSHOT'] = 'false'
+    os.environ['KNOWLEDGE_BACKEND'] = 'memory'
+
+
+def generate(output: Path, rows: int, detail_fraction: float = 0.1, seed: int = 42) -> Path:
+    """Write a synthetic data/ directory with `rows` vehicles; returns the directory"""
+    from src.utils.inventory_index import DATA_PATH, DEALER_FILES, DETAIL_FILES
+    new_detail_file, used_detail_file = DETAIL_FILES
+    rng = random.Random(seed)
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+
+    for file_name in ['contact.txt'] + list(DEALER_FILES.values()):
+        shutil.copyfile(DATA_PATH / file_name, output / file_name)
+
+    with open(output / 'trucks.csv', 'w', newline='', encoding='utf-8') as trucks_file, \
+            open(output / 'new_trucks.csv', 'w', newline='', encoding='utf-8') as new_file, \
+            open(output / 'used_trucks.csv', 'w', newline='', encoding='utf-8') as used_file, \
+            open(output / new_detail_file, 'w', encoding='utf-8') as new_details, \
+            open(output / used_detail_file, 'w', encoding='utf-8') as used_details:
+        trucks = csv.writer(trucks_file)
+        trucks.writerow(['id', 'name', 'condition', 'price', 'capacity', 'image_url', 'url'])
+        new = csv.writer(new_file)
+        new.writerow(['Name', 'Brand', 'Chassis', 'Weight', 'Side Ramp', 'Pop-Outs', 'Push-up', 'Horses',
+                      'Year', 'Cabin', 'Version', 'Living', 'Features', 'Options', 'Gearbox'])
+        used = csv.writer(used_file, delimiter='\t')
+        used.writerow(['Image', 'News__item URL', 'News__item-label', 'News__item-button-visible'])
+        for details in (new_details, used_details):
+            details.write('URL\tTitle\tContent\tWord Count\n')
+
+        for i in range(rows):
+            v = _vehicle(i, rng)
+            trucks.writerow([v['id'], v['name'], 'Second-Hand' if v['used'] else 'New', v['price'],
+                             f"{v['horses']} horses", v['image_url'], v['url']])
+            if v['used']:
+                used.writerow([v['image_url'], v['url'], 'Second-Hand', v['name']])
+            else:
+                features = f"Horse Area: {', '.join(v['horse_features'])}; Living Area: {', '.join(v['living_features'])}"
+                new.writerow([v['name'], v['brand'], v['chassis'], v['weight'], '1 side ramp', '1 pop-out', '',
+                              v['horses'], v['year'], '', '', 'Yes', features, ', '.join(v['options']), 'Automatic'])
+            if rng.random() < detail_fraction:
+                content = _detail_content(v)
+                details = used_details if v['used'] else new_details
+                details.write(f"{v['url']}\tFOR SALE I {v['name']} I Stephex Horsetrucks\t{content}\t{len(content.split())}\n")
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--output', type=Path, required=True)
+    parser.add_argument('--detail-fraction', type=float, default=0.1, help='share of vehicles with a detail page')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    isolate_global_index()
+    generate(args.output, args.rows, args.detail_fraction, args.seed)
+    print(f"Wrote {args.rows} synthetic vehicles to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
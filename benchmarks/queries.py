@@ -0,0 +1,51 @@
+"""
+Fixed query corpus for the search benchmarks, grouped by category
+"""
+
+QUERIES = {
+    'used': [
+        'Show me used trucks available',
+        'second hand horsebox',
+        'used trucks 2 years old',
+        'pre-owned 6 horse truck',
+        'used 6-horse under 7.5T from 2022 or newer',
+    ],
+    'capacity': [
+        '2 horse truck',
+        'I have 3 horses',
+        'horsebox for 8 horses',
+        '2 horse 3.5t',
+        'scania 7 horses',
+    ],
+    'name': [
+        'STX HORSEBOX Scania S 500',
+        'mercedes actros l',
+        'renualt master',
+        'actros gigga',
+        'ketterer exclusive',
+    ],
+    'dealer': [
+        'dealers in Germany',
+        'do you have a dealer in the uk',
+        'stx dealer list',
+        'ketterer dealer phone',
+    ],
+    'contact': [
+        'contact information',
+        'where is your office',
+        'what are your opening hours',
+        'company history',
+    ],
+    'multilingual': [
+        'Muéstrame camiones usados disponibles',
+        'Montrez-moi les nouveaux camions disponibles',
+        "Montrez-moi les camions d'occasion disponibles",
+        'Mostrami i camion usati disponibili',
+        'Toon me nieuwe beschikbare vrachtwagens',
+    ],
+}
+
+
+def all_queries():
+    """(category, query) pairs in a stable order"""
+    return [(category, query) for category, queries in QUERIES.items() for query in queries]
@@ -0,0 +1,168 @@
+"""
+Search latency and memory benchmark over synthetic inventories.
+
+For each size it generates a synthetic data/ directory, builds an
+InventoryIndex from it and runs the fixed query corpus through
+search_knowledge with the result cache disabled. Index build time and peak
+memory, search latency percentiles (overall and per query category) and peak
+search memory are written as JSON.
+
+    python benchmarks/search_benchmark.py --sizes 100 10000 1000000 --output bench.json
+    python benchmarks/search_benchmark.py --sizes 100 10000 --compare bench.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.generate_inventory import generate, isolate_global_index
+from benchmarks.queries import all_queries
+
+DEFAULT_SIZES = [100, 10000, 1000000]
+PERCENTILES = ('p50', 'p95', 'p99')
+
+
+def latency_summary(samples_ms):
+    """p50/p95/p99/mean/max of a list of latencies in milliseconds"""
+    ordered = sorted(samples_ms)
+    cuts = statistics.quantiles(ordered, n=100, method='inclusive') if len(ordered) > 1 else ordered * 99
+    return {
+        'count': len(ordered),
+        'p50': round(cuts[49], 4),
+        'p95': round(cuts[94], 4),
+        'p99': round(cuts[98], 4),
+        'mean': round(statistics.fmean(ordered), 4),
+        'max': round(ordered[-1], 4)
+    }
+
+
+def bench_size(rows, workdir, rounds, detail_fraction):
+    from src.utils.inventory_index import InventoryIndex
+    from src.utils.smart_search import search_knowledge
+    data_path = generate(Path(workdir) / f"inventory-{rows}", rows, detail_fraction)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = InventoryIndex(data_path)
+    build_seconds = time.perf_counter() - started
+    build_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if index.load_errors:
+        raise RuntimeError(f"synthetic inventory failed to load: {index.load_errors}")
+
+    queries = all_queries()
+    samples = {category: [] for category, _ in queries}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # Warm-up pass: lazy structures, regex caches
+        for _, query in queries:
+            search_knowledge(query, index=index)
+
+        for _ in range(rounds):
+            for category, query in queries:
+                started = time.perf_counter()
+                search_knowledge(query, index=index)
+                samples[category].append((time.perf_counter() - started) * 1000)
+
+        # Separate pass for memory, since tracing slows every allocation down
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _, query in queries:
+            search_knowledge(query, index=index)
+        search_peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+
+    all_samples = [sample for category_samples in samples.values() for sample in category_samples]
+    return {
+        'rows': rows,
+        'vehicles': len(index.vehicles),
+        'documents': len(index.bm25),
+        'build_seconds': round(build_seconds, 3),
+        'build_peak_mb': round(build_peak / 2**20, 2),
+        'search_peak_mb': round(search_peak / 2**20, 3),
+        'latency_ms': latency_summary(all_samples),
+        'latency_ms_by_category': {category: latency_summary(values) for category, values in samples.items()}
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    """Print percentile changes against a baseline run; returns the regressions"""
+    previous = {result['rows']: result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = previous.get(result['rows'])
+        if before is None:
+            continue
+        for percentile in PERCENTILES:
+            old, new = before['latency_ms'][percentile], result['latency_ms'][percentile]
+            change = (new - old) / old if old else 0.0
+            flag = ' REGRESSION' if change > threshold else ''
+            print(f"{result['rows']:>8} rows {percentile}: {old:.3f} -> {new:.3f} ms ({change:+.1%}){flag}")
+            if flag:
+                regressions.append((result['rows'], percentile, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--rounds', type=int, default=20, help='passes over the query corpus per size')
+    parser.add_argument('--detail-fraction', type=float, default=0.1)
+    parser.add_argument('--output', type=Path, help='write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', type=Path, help='baseline JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative slowdown reported as a regression')
+    args = parser.parse_args()
+
+    # Every index is built here, from synthetic data in a temp directory; the real data/ is never written
+    isolate_global_index()
+    from src.utils.search_cache import search_cache
+    search_cache.max_size = 0  # measure the search itself, not the result cache
+    report = {
+        'revision': _git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'rounds': args.rounds,
+        'queries': len(all_queries()),
+        'results': []
+    }
+    with tempfile.TemporaryDirectory(prefix='truck-bench-') as workdir:
+        for rows in args.sizes:
+            result = bench_size(rows, workdir, args.rounds, args.detail_fraction)
+            report['results'].append(result)
+            latency = result['latency_ms']
+            print(f"{rows:>8} rows: build {result['build_seconds']}s / {result['build_peak_mb']} MB, "
+                  f"search p50 {latency['p50']} ms p95 {latency['p95']} ms p99 {latency['p99']} ms",
+                  file=sys.stderr)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        if compare(report, json.loads(args.compare.read_text()), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
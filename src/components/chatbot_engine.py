@@ -1,74 +1,36 @@
 """
 Main chatbot engine with conversation logic
 """
-import pandas as pd
-from pathlib import Path
+from typing import Any, Dict, Iterator, Union
 from ..utils.ai_service import ai_service
+from ..utils.inventory_index import inventory_index
 from ..config.settings import get_settings
 
 settings = get_settings()
 
 class ChatbotEngine:
     def __init__(self):
-        self.knowledge_base = self._load_knowledge_base()
+        # Pick up inventory changes in data/ without a restart
+        inventory_index.start_watching(settings.data_reload_interval)
+    
+    @property
+    def knowledge_base(self):
+        """Knowledge base from the current inventory snapshot"""
+        return self._load_knowledge_base()
     
     def _load_knowledge_base(self):
-        """Load all data files as comprehensive knowledge base"""
-        data_path = Path(__file__).parent.parent.parent / "data"
-        knowledge = {}
-        
-        try:
-            # Load new trucks inventory
-            new_trucks_df = pd.read_csv(data_path / "new_trucks.csv")
-            knowledge['new_trucks'] = new_trucks_df.to_dict('records')
-            
-            # Load used trucks inventory
-            used_trucks_df = pd.read_csv(data_path / "used_trucks.csv")
-            knowledge['used_trucks'] = used_trucks_df.to_dict('records')
-            
-            # Load contact information
-            with open(data_path / "contact.txt", 'r', encoding='utf-8') as f:
-                knowledge['contact_info'] = f.read()
-            
-            # Load all dealer information
-            dealer_files = ['Dealer name stx.txt', 'Dealer names AKX.txt', 'dealer names KETTERER copy.txt']
-            knowledge['dealers'] = {}
-            for dealer_file in dealer_files:
-                try:
-                    with open(data_path / dealer_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if 'stx' in dealer_file.lower():
-                            knowledge['dealers']['STX'] = content
-                        elif 'akx' in dealer_file.lower():
-                            knowledge['dealers']['AKX'] = content
-                        elif 'ketterer' in dealer_file.lower():
-                            knowledge['dealers']['KETTERER'] = content
-                except Exception as e:
-                    print(f"Error loading {dealer_file}: {e}")
-            
-            # Load all remaining text files
-            text_files = ['new trucks detialed.txt', 'used trucks Details.txt']
-            knowledge['detailed_info'] = {}
-            for text_file in text_files:
-                try:
-                    with open(data_path / text_file, 'r', encoding='utf-8') as f:
-                        knowledge['detailed_info'][text_file] = f.read()
-                except:
-                    pass
-            
-            # Load legacy data if exists
-            try:
-                company_df = pd.read_csv(data_path / "company_data.csv")
-                knowledge['company'] = company_df.to_dict('records')
-            except:
-                pass
-                
-        except Exception as e:
-            print(f"Error loading knowledge base: {e}")
-            
-        return knowledge
+        """Knowledge base served from the shared in-memory inventory index"""
+        return inventory_index.current.knowledge_base()
+    
+    def process_message_stream(self, user_message: str, language: str = "en") -> Iterator[str]:
+        """Like process_message, but yields AI responses in chunks as they are generated"""
+        response = self.process_message(user_message, language, stream=True)
+        if isinstance(response, str):
+            yield response
+        else:
+            yield from response
     
-    def process_message(self, user_message: str, language: str = "en") -> str:
+    def process_message(self, user_message: str, language: str = "en", stream: bool = False) -> Union[str, Iterator[str]]:
         """Process user message and generate appropriate response"""
         
         # Handle greetings
@@ -295,6 +257,8 @@ class ChatbotEngine:
                 'user_preferences': user_prefs,
                 'conversation_history': conversation_context
             }
+            if stream:
+                return ai_service.generate_response_stream(user_message, context, language)
             return ai_service.generate_response(user_message, context, language)
         
         # Use AI for everything else
@@ -311,11 +275,24 @@ class ChatbotEngine:
         context = {
             'knowledge_base': self.knowledge_base,
             'user_message': user_message,
-            'conversation_history': conversation_context
+            'conversation_history': conversation_context,
+            'search_page': st.session_state.get('search_page')
         }
+        if stream:
+            return self._remember_search_page(ai_service.generate_response_stream(user_message, context, language), context)
         response = ai_service.generate_response(user_message, context, language)
+        # Remember where this search stopped so "show me more" can continue it
+        if context.get('search_page'):
+            st.session_state.search_page = context['search_page']
         
         return response
+    
+    def _remember_search_page(self, chunks: Iterator[str], context: Dict[str, Any]) -> Iterator[str]:
+        """Pass a streamed response through, then save where its search stopped"""
+        yield from chunks
+        if context.get('search_page'):
+            import streamlit as st
+            st.session_state.search_page = context['search_page']
 
 # Global chatbot engine instance
 chatbot_engine = ChatbotEngine()
\ No newline at end of file
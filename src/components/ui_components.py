@@ -385,12 +385,46 @@ class UIComponents:
         st.info(f"ℹ️ {message}")
     
     @staticmethod
-    def _render_bot_message_with_images(content: str):
+    def render_streaming_bot_message(placeholder, partial_content: str):
+        """Redraw the bot bubble in placeholder with the response received so far"""
+        UIComponents._render_bot_message_with_images(partial_content, placeholder=placeholder, partial=True)
+    
+    @staticmethod
+    def _complete_prefix(content: str) -> str:
+        """
+        The part of a partial response that renders the same as it will in the
+        final one: an image line still being written, an unclosed link or tag,
+        or an unpaired ** is held back until the rest of it arrives
+        """
+        import re
+        
+        cut = len(content)
+        last_line = content.rfind('\n') + 1
+        if 'Image:' in content[last_line:]:
+            cut = min(cut, last_line + content[last_line:].index('Image:'))
+        open_link = content.rfind('<a ')
+        if open_link > content.rfind('</a>'):
+            cut = min(cut, open_link)
+        open_tag = re.search(r'</?[a-zA-Z][^<>]*$', content)
+        if open_tag:
+            cut = min(cut, open_tag.start())
+        if content[:cut].count('**') % 2:
+            cut = content[:cut].rfind('**')
+        elif content[:cut].endswith('*'):
+            # Maybe the first half of a **
+            cut -= 1
+        return content[:cut]
+    
+    @staticmethod
+    def _render_bot_message_with_images(content: str, placeholder=None, partial: bool = False):
         """Render bot message with images inside one chat bubble"""
         import re
         
-        # Debug: Print first 200 chars to see what we're working with
-        print(f"DEBUG UI: Content preview: {content[:200]}...")
+        if partial:
+            content = UIComponents._complete_prefix(content)
+        else:
+            # Debug: Print first 200 chars to see what we're working with
+            print(f"DEBUG UI: Content preview: {content[:200]}...")
         
         # Process content to replace image URLs with actual images and remove ** formatting
         processed_content = content
@@ -400,15 +434,19 @@ class UIComponents:
         
         # Find image URLs
         image_urls = re.findall(r'Image: (https://[^\s\n,]+)', processed_content)
-        print(f"DEBUG UI: Found {len(image_urls)} images: {image_urls[:2]}")
+        if not partial:
+            print(f"DEBUG UI: Found {len(image_urls)} images: {image_urls[:2]}")
         
         # Replace image URLs with HTML img tags
         for img_url in image_urls:
             img_tag = f'<br><img src="{img_url.strip()}" style="max-width: 350px; border-radius: 8px; margin: 10px 0;" onerror="this.style.display=\'none\'"><br>'
             processed_content = processed_content.replace(f'Image: {img_url}', img_tag)
         
+        # Typing cursor while the response is still arriving
+        cursor = ' ▌' if partial else ''
+        
         # Render everything in one chat bubble with word wrapping
-        st.markdown(f"""
+        (placeholder or st).markdown(f"""
         <div style="
             background: linear-gradient(135deg, #ffffff, #f8fafc);
             color: #2c3e50;
@@ -421,7 +459,7 @@ class UIComponents:
             word-wrap: break-word;
             overflow-wrap: break-word;
         ">
-            <strong>🤖 Stephanie :</strong> {processed_content.replace(chr(10), '<br>')}
+            <strong>🤖 Stephanie :</strong> {processed_content.replace(chr(10), '<br>')}{cursor}
         </div>
         """, unsafe_allow_html=True)
 
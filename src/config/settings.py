@@ -61,6 +61,13 @@ class Settings(BaseSettings):
     ai_model: str = "gemini-2.5-flash"
     max_tokens: int = 300000
     temperature: float = 0.7
+    ai_max_concurrent_requests: int = 16  # Gemini calls in flight per process; further calls wait their turn
+    ai_request_timeout: float = 60.0  # seconds per Gemini call and per wait for a free slot (for streams: until each next chunk)
+    ai_max_retries: int = 2  # retries of a Gemini call after a transient error (503, 429, connection reset)
+    ai_circuit_failure_threshold: int = 5  # consecutive failed Gemini calls before answering from search results only
+    ai_circuit_reset_timeout: float = 30.0  # seconds before one call probes whether Gemini is back
+    prompt_cache_mode: str = "system_instruction"  # 'system_instruction', 'cached_content' (Gemini context cache) or 'local' (offline stand-in)
+    prompt_cache_ttl: int = 3600  # seconds cached system prompts live upstream before renewal
     
     # Chat Configuration
     max_chat_history: int = 5000
@@ -70,6 +77,15 @@ class Settings(BaseSettings):
     cache_ttl: int = 300  # 5 minutes
     max_cache_size: int = 5000
     
+    # Knowledge Base Configuration
+    data_reload_interval: float = 30.0  # seconds between data/ change checks, 0 disables hot reload
+    use_knowledge_snapshot: bool = True  # load/write data/knowledge.snapshot instead of parsing data/ on every cold start
+    knowledge_backend: str = "memory"  # 'memory', 'mmap' (data/knowledge.mmap shared by all workers) or 'sqlite' (data/knowledge.db)
+
+    # Prompt Context Configuration
+    context_token_budget: int = 1500  # estimated tokens of search results per prompt
+    context_max_results: int = 8  # ranked results fetched per turn; the token budget decides how many are used
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
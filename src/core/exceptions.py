@@ -20,4 +20,8 @@ class ValidationError(ChatbotError):
 
 class ConfigurationError(ChatbotError):
     """Configuration related errors"""
+    pass
+
+class CircuitOpenError(AIServiceError):
+    """Upstream calls skipped while the circuit breaker is open"""
     pass
\ No newline at end of file
@@ -25,10 +25,11 @@ class Language(str, Enum):
     NL = "nl"
 
 class Truck(BaseModel):
-    id: int
+    """Ingest schema for a canonical vehicle; price and year are missing for some scraped listings"""
+    id: str = Field(..., min_length=1)
     name: str = Field(..., min_length=1, max_length=200)
-    price: int = Field(..., gt=0)
-    year: int = Field(..., ge=2000, le=2030)
+    price: Optional[int] = Field(None, gt=0)
+    year: Optional[int] = Field(None, ge=2000, le=2030)
     condition: TruckCondition
     type: TruckType
     capacity: str
@@ -39,7 +40,7 @@ class Truck(BaseModel):
 
     @validator('price')
     def validate_price(cls, v):
-        if v <= 0:
+        if v is not None and v <= 0:
             raise ValueError('Price must be positive')
         return v
 
@@ -74,4 +75,32 @@ class CompanyInfo(BaseModel):
     email: str
     address: str
     hours: Dict[str, str]
-    services: List[str]
\ No newline at end of file
+    services: List[str]
+
+class VehicleDetail(BaseModel):
+    """Structured record parsed from one scraped vehicle detail page"""
+    url: str
+    title: str
+    name: str
+    brand: Optional[str] = None
+    chassis: Optional[str] = None
+    weight: Optional[str] = None
+    horses: Optional[int] = None
+    year: Optional[int] = None
+    mileage: Optional[int] = None
+    specs: Dict[str, str] = Field(default_factory=dict)
+    features: List[str] = Field(default_factory=list)
+    options: List[str] = Field(default_factory=list)
+    features_text: str = ""
+    description: str = ""
+    content: str = ""
+    word_count: int = 0
+
+class Dealer(BaseModel):
+    """One entry of a brand's dealer list"""
+    brand: str
+    name: str
+    address: str = ""
+    country: Optional[str] = None
+    countries: List[str] = Field(default_factory=list)
+    phone: str = ""
@@ -2,16 +2,53 @@
 AI Service using Google Gemini for intelligent responses
 """
 import google.generativeai as genai
-from typing import Optional, Dict, Any
+from google.api_core import exceptions as api_exceptions
+from typing import Optional, Dict, Any, Iterator
 from ..config.settings import get_settings
+from ..core.exceptions import CircuitOpenError
 from ..core.logger import app_logger
+from .circuit_breaker import CircuitBreaker
+from .fallback_responder import fallback_responder
+from .gemini_client import gemini_client
+from .language_manager import language_manager
+from .prompt_cache import prompt_cache
+from .response_cache import response_cache, response_key
 
 settings = get_settings()
 
+# Generate response with enhanced intelligence settings
+GENERATION_OPTIONS = {
+    'generation_config': genai.types.GenerationConfig(
+        max_output_tokens=4000,  # More tokens for detailed responses
+        temperature=0.3,  # Lower temperature for more focused, intelligent responses
+        top_p=0.8,  # Better quality control
+        top_k=40,  # More selective token choices
+    ),
+    'safety_settings': [
+        {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+        {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+        {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+        {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
+    ]
+}
+
+# Transient upstream errors worth retrying; a timeout already used the call's whole budget
+RETRYABLE_ERRORS = (
+    api_exceptions.ServiceUnavailable, api_exceptions.ResourceExhausted, api_exceptions.TooManyRequests,
+    api_exceptions.InternalServerError, ConnectionError,
+)
+
 class AIService:
     def __init__(self):
         self.api_key = settings.gemini_api_key
         self.model = None
+        self.breaker = CircuitBreaker(
+            'Gemini',
+            failure_threshold=settings.ai_circuit_failure_threshold,
+            reset_timeout=settings.ai_circuit_reset_timeout,
+            max_retries=settings.ai_max_retries,
+            retry_on=RETRYABLE_ERRORS,
+        )
         self._initialize_model()
     
     def _initialize_model(self):
@@ -31,7 +68,8 @@ class AIService:
     def generate_response(self, user_message: str, context: Dict[str, Any], language: str = "en") -> str:
         """Generate AI response using Gemini"""
         if not self.model:
-            return "AI service not available. Model failed to initialize."
+            app_logger.debug("AI model not initialized, answering from search results")
+            return fallback_responder.respond(user_message, context, language)
         
         try:
             # Create context-aware prompt
@@ -40,72 +78,134 @@ class AIService:
             print(f"DEBUG: Context keys: {list(context.keys())}")
             # This debug was moved to after search
             
-            # Generate response with enhanced intelligence settings
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=4000,  # More tokens for detailed responses
-                    temperature=0.3,  # Lower temperature for more focused, intelligent responses
-                    top_p=0.8,  # Better quality control
-                    top_k=40,  # More selective token choices
-                ),
-                safety_settings=[
-                    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
-                ]
+            # The prompt already holds the search results, language and trimmed history
+            key = response_key(settings.ai_model, language, prompt)
+            # Cached answers are served even while the breaker is open
+            result, cached = response_cache.get_or_generate(
+                key, lambda: self.breaker.call(lambda: self._call_model(prompt, language))
             )
-            
-            result = response.text.strip()
+            # Entries cached by a streamed call keep the model's surrounding whitespace
+            result = result.strip()
+            if cached:
+                app_logger.debug(f"AI response cache hit ({response_cache.stats()['hit_rate']} hit rate)")
             print(f"DEBUG: AI Response length: {len(result)} characters")
             print(f"DEBUG: AI Response preview: {result[:200]}...")
             return result
             
+        except CircuitOpenError:
+            app_logger.debug("AI circuit open, answering from search results")
+            return fallback_responder.respond(user_message, context, language)
         except Exception as e:
             print(f"DEBUG: AI Error: {str(e)}")
             app_logger.error(f"AI Service Error: {e}")
-            return f"AI Error: {str(e)[:100]}... Please check your API key and try again."
+            return fallback_responder.respond(user_message, context, language)
+    
+    def generate_response_stream(self, user_message: str, context: Dict[str, Any], language: str = "en") -> Iterator[str]:
+        """Generate AI response using Gemini, yielding the text in chunks as it is produced"""
+        if not self.model:
+            app_logger.debug("AI model not initialized, answering from search results")
+            yield fallback_responder.respond(user_message, context, language)
+            return
+        
+        received = False
+        try:
+            prompt = self._create_prompt(user_message, context, language)
+            app_logger.debug(f"Prompt length: {len(prompt)} (streaming)")
+            
+            key = response_key(settings.ai_model, language, prompt)
+            length = 0
+            stream = response_cache.stream(key, lambda: self.breaker.stream(lambda: self._stream_model(prompt, language)))
+            for chunk in stream:
+                if not received:
+                    # Strip leading whitespace the way generate_response does
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                    received = True
+                length += len(chunk)
+                yield chunk
+            app_logger.debug(f"AI Response length: {length} characters (streamed)")
+            
+        except Exception as e:
+            if isinstance(e, CircuitOpenError):
+                app_logger.debug("AI circuit open, answering from search results")
+            else:
+                app_logger.error(f"AI Service Error: {e}")
+            if received:
+                # Part of the answer is already on screen; say it broke off rather than replacing it
+                yield "\n\n" + language_manager.get_text("error_message", language)
+            else:
+                yield fallback_responder.respond(user_message, context, language)
+    
+    def _call_model(self, prompt: str, language: str) -> str:
+        """One upstream Gemini call; raises on failure so errors are never cached"""
+        response = gemini_client.generate(prompt_cache.model_for(language), prompt, **GENERATION_OPTIONS)
+        self._log_usage(response)
+        return response.text.strip()
+    
+    def _stream_model(self, prompt: str, language: str) -> Iterator[str]:
+        """One streamed upstream Gemini call, yielding text chunks as they arrive"""
+        chunk = None
+        for chunk in gemini_client.stream(prompt_cache.model_for(language), prompt, **GENERATION_OPTIONS):
+            # The last chunk may carry only the finish reason
+            if chunk.parts:
+                yield chunk.text
+        if chunk is not None:
+            self._log_usage(chunk)
+    
+    @staticmethod
+    def _log_usage(response):
+        """Input tokens Gemini billed for the turn, and how many of them came from the prompt cache"""
+        usage = getattr(response, 'usage_metadata', None)
+        if usage:
+            app_logger.debug(f"Input tokens: {usage.prompt_token_count} "
+                             f"({getattr(usage, 'cached_content_token_count', 0)} cached)")
     
     def _create_prompt(self, user_message: str, context: Dict[str, Any], language: str) -> str:
-        """Create context-aware prompt for Gemini"""
+        """Create the per-turn prompt: retrieved context, conversation and message"""
         
         search_context = "AVAILABLE TRUCKS:\n"
         
         try:
             # Smart search for relevant content
-            from ..utils.smart_search import search_knowledge
-            # Increase results for truck queries
-            max_results = 8 if any(word in user_message.lower() for word in ['truck', '5', 'suggest', 'list']) else 3
-            results = search_knowledge(user_message, max_results=max_results)
+            from ..utils.smart_search import search_knowledge_page, is_more_request
+            from ..utils.inventory_index import inventory_index
+            from ..utils.context_assembler import context_assembler
+            previous_page = context.get('search_page') or {}
+            if is_more_request(user_message, previous_page.get('query')):
+                # "Show me more": continue the previous search from where its last page ended
+                query, max_results = previous_page['query'], previous_page['page_size']
+                offset = previous_page['next_offset']
+            else:
+                # The token budget, not the result count, decides how much context goes in
+                query, offset = user_message, 0
+                max_results = settings.context_max_results
+            if offset is None:
+                results, next_offset = [], None
+                search_context += "NO MORE RESULTS: every matching item was already shown earlier in the conversation\n"
+            else:
+                results, next_offset = search_knowledge_page(query, page_size=max_results, offset=offset,
+                                                                  language=language)
             
             print(f"DEBUG: Found {len(results)} search results")
+            
+            assembled, consumed, tokens = context_assembler.assemble(query, results, inventory_index.current.vehicles)
+            search_context += assembled
+            if consumed < len(results):
+                # Results that didn't fit the budget start the next page
+                next_offset = offset + consumed
+            results = results[:consumed]
+            # The fallback responder answers from the same results if Gemini is unavailable
+            context['search_results'] = results
+            # Handed back to the chatbot engine, which keeps it in the session for the next message
+            context['search_page'] = {'query': query, 'page_size': max_results, 'next_offset': next_offset}
+            
+            app_logger.debug(f"Assembled {consumed} results into ~{tokens} tokens (budget {context_assembler.token_budget})")
             print(f"DEBUG: Truck results: {[r['type'] for r in results if r.get('type') == 'truck']}")
             print(f"DEBUG: Search context preview: {search_context[:500]}...")
-            
             for item in results:
                 if item.get('type') == 'truck':
-                    search_context += f"TRUCK: {item['title']}"
-                    search_context += f" | Capacity: {item.get('capacity', '')}"
-                    search_context += f" | Condition: {item.get('condition', '')}"
-                    if item.get('year'):
-                        search_context += f" | Year: {item['year']}"
-                    if item.get('mileage'):
-                        search_context += f" | Mileage: {item['mileage']}"
-                    if item.get('features'):
-                        search_context += f" | Features: {item['features']}"
-                    if item.get('image_url'):
-                        search_context += f" | Image: {item['image_url']}"
-                    if item.get('url'):
-                        search_context += f" | Details: {item['url']}"
-                    # Check if it's a tackbox
-                    if 'tackbox' in item['title'].lower():
-                        search_context += f" | TYPE: TACKBOX (storage equipment, not a truck)"
-                    search_context += "\n"
-                    
                     print(f"DEBUG AI: Truck {item['title']} - Image: {item.get('image_url', 'NO IMAGE')[:50]}...")
-                elif item.get('type') == 'dealer':
-                    search_context += f"DEALER: {item['title']}: {item['content']}\n"
                     
         except Exception as e:
             print(f"DEBUG: Search error: {e}")
@@ -114,145 +214,13 @@ class AIService:
         # ALWAYS respect user's language selection - NO auto-detection override
         print(f"DEBUG: Using user selected language: {language} (no auto-detection)")
         
-        # Language-specific instructions (expanded)
-        language_instructions = {
-            "en": "Respond in English",
-            "es": "Responde en español",
-            "fr": "Répondez en français", 
-            "it": "Rispondi in italiano",
-            "nl": "Antwoord in het Nederlands",
-            "da": "Svar på dansk",  # Danish
-            "de": "Antworte auf Deutsch",  # German
-            "sv": "Svara på svenska",  # Swedish
-            "no": "Svar på norsk",  # Norwegian 
-        }
-        
-        # Main prompt with explicit truck count
-        truck_count = len([r for r in results if r.get('type') == 'truck'])
-        
-        prompt = f"""
-        You are Stephanie, an exceptionally intelligent and knowledgeable sales assistant at Stephex Horse Trucks. You have deep expertise in horse transportation and can understand even vague or poorly worded questions.
-        
-        Available inventory:
-        {search_context}
-        
-        Your intelligence:
-        - SUPER INTELLIGENT: Understand vague, incomplete, or poorly worded questions
-        - READ BETWEEN THE LINES: Infer what users really mean, even if they don't express it clearly
-        - CONTEXT MASTER: Remember everything from the conversation and build on it intelligently
-        - PROBLEM SOLVER: Anticipate needs and provide solutions before being asked
-        - EXPERT INTERPRETER: Turn confusing questions into clear, helpful answers
-        - BOOKING GENIUS: Make appointment scheduling effortless, even with minimal info
-        
-        Your personality:
-        - Friendly and approachable, like chatting with a knowledgeable friend
-        - Match the user's energy level - if they're casual, be casual back
-        - Warm but not fake, genuine but not robotic
-        - EXTREMELY CONCISE - keep responses SHORT and to the point
-        - Maximum 2-3 sentences unless showing truck listings
-        - No fluff, no unnecessary words
-        - Show some personality - be human, not a corporate bot
-        - NEVER start with greetings - go directly to answering the question
-        
-        Guidelines:
-        - CRITICAL: {language_instructions.get(language, "Respond in English")} - DO NOT use any other language
-        - NEVER greet the customer - no "Hi", "Hello", "Hey there", "What's up" - jump straight into answering
-        - Start responses directly with the answer or information requested
-        - Mirror the user's communication style - if they're casual, be casual; if formal, be professional
-        - Avoid corporate speak but stay professional
-        - Be genuinely helpful with a touch of personality
-        - Show you're a real person who happens to know about trucks
-        
-        - SUPER INTELLIGENT RESPONSES:
-          * INTERPRET VAGUE QUESTIONS: "I need something for my horses" → Understand they want horse trucks, ask smart follow-up questions
-          * DECODE UNCLEAR REQUESTS: "What do you have?" → Intelligently determine if they want trucks, pricing, or company info based on context
-          * ANTICIPATE NEEDS: If someone asks about 2-horse trucks, proactively mention related accessories, financing, delivery
-          * EDUCATIONAL INTELLIGENCE: Adjust explanation depth based on user's apparent knowledge level
-          * CONTEXT BUILDING: Remember every detail mentioned and build comprehensive understanding
-          * SMART ASSUMPTIONS: If user says "I have 3 horses" → Suggest 4+ horse trucks for flexibility
-          * PROBLEM SOLVING: If user mentions budget constraints, suggest used trucks or financing options
-          * BOOKING INTELLIGENCE: Turn any scheduling hint into smooth appointment booking
-        
-        - CRITICAL FORMAT: For each truck/item, use this EXACT format:
-        **ITEM NAME HERE**
-        [Brief description of what this is - truck specs, condition, purpose]
-        Image: [exact_image_url_here]
-        Features: [features_here]
-        <a href='[exact_detail_url_here]'>View Details</a>
-        
-        - DESCRIPTION RULES:
-          * For trucks: Include year, mileage, condition, horse capacity, and key selling points
-          * For tackboxes: Explain it's storage equipment, not a truck, but useful for horse transport needs
-          * Example: "This 2018 Volvo FH 540 is a premium 8-horse truck with 180,000km, featuring luxury living quarters and professional horse transport capabilities."
-        
-        - NEVER leave truck names blank - always show the full truck name
-        - NEVER use generic images - use the exact Image URLs provided
-        - NEVER skip any truck information - show ALL trucks found
-        - For pricing questions, always try get book an appointment for user to get an offer
-        - Example format:
-        **STX 2 HORSE FORD TRANSIT**
-        This 2022 Ford Transit is a compact 2-horse truck with 91,000km, perfect for smaller operations or personal use.
-        Image: https://stephexhorsetrucks.com/wp-content/uploads/2025/09/STX-Ford-2H-Second-Hand-26-720x460.jpg
-        Features: Leather seats with armrests, Radio/Bluetooth/GPS, Electric windows, Air conditioning, LED lighting, Rubber flooring
-        <a href='https://stephexhorsetrucks.com/vehicles/stx-2-horse-ford-transit/'>View Details</a>
-        
-        - Use your intelligence to provide the best recommendations
-        
-        - RESPONSE LENGTH RULES:
-          * MAXIMUM 2-3 sentences for most responses
-          * NO long explanations unless specifically asked
-          * NO unnecessary pleasantries or filler words
-          * Get straight to the point
-          * Example: "What are horse trucks?" → "Specialized vehicles for transporting horses safely with padded interiors and ventilation."
-          * Example: "Price?" → "Prices vary by model. Want to schedule a call for a quote?"
-        
-        - BOOKING RULES - ABSOLUTELY CRITICAL - FOLLOW EXACTLY:
-          * STEP 1: Say "Perfect!" or "Got it!"
-          * STEP 2: Write EXACTLY this: BOOKING_COMPLETE: truck_type|date_time|email
-          * STEP 3: STOP - write nothing else, no appointment details, no calendar links, NOTHING
-          * Example response: "Perfect!\nBOOKING_COMPLETE: general consultation|tomorrow 4am london|rajacharya3242@gmail.com"
-          * FORBIDDEN: Any text after BOOKING_COMPLETE
-          * FORBIDDEN: "📋 Appointment Details" or any appointment formatting
-          * FORBIDDEN: Calendar links or confirmation messages
-          * The system will handle everything after BOOKING_COMPLETE
-          * EMAIL INTELLIGENCE: Recognize email formats even with typos or unusual formats
-          * CRITICAL: NEVER create appointment confirmations yourself
-          * NEVER show calendar links or appointment details - use BOOKING_COMPLETE only
-          * NEVER convert times (1pm stays 1pm, don't make it 2pm)
-          * NEVER add specific dates (tomorrow stays tomorrow, don't make it September 23)
-          * The system handles ALL appointment processing after BOOKING_COMPLETE
-          
-        - ABSOLUTELY FORBIDDEN (NEVER USE):
-          * ANY text after BOOKING_COMPLETE
-          * "📋 Appointment Details" or appointment formatting
-          * "Your appointment is updated" or similar phrases
-          * Calendar links or confirmation messages
-          * "Date & Time:" or "Contact:" or "Service:" formatting
-          * ANY appointment details - the system handles this
-          * ONLY allowed: "Perfect!" then BOOKING_COMPLETE then STOP
-          
-        - EXACT BOOKING FORMAT (COPY THIS):
-          User: "book appointment tomorrow 4am london rajacharya3242@gmail.com"
-          Your response: "Perfect!\nBOOKING_COMPLETE: general consultation|tomorrow 4am london|rajacharya3242@gmail.com"
-          
-          THAT'S IT - NO MORE TEXT ALLOWED AFTER BOOKING_COMPLETE
-          
-          * WRONG: Adding appointment details, calendar links, confirmations
-          * RIGHT: Just "Perfect!" + BOOKING_COMPLETE + STOP
-        
-        CONVERSATION CONTEXT & MEMORY:
-        {context.get('conversation_history', 'No previous conversation')}
-        
-        USER CONTEXT & INTELLIGENCE:
-        - Remember: User's name, email, phone, preferences, budget hints, truck needs
-        - Build on: Previous questions, interests shown, appointment history
-        - Anticipate: Next logical questions, related needs, follow-up services
-        - Context clues: User's language style, urgency level, experience with horses/trucks
-        
-        Current customer message: {user_message}
-        
-        Your response:
-        """ 
+        # Persona, format and booking rules are in the per-language system instruction
+        prompt = (
+            f"Available inventory:\n{search_context}\n"
+            f"CONVERSATION CONTEXT & MEMORY:\n{context.get('conversation_history', 'No previous conversation')}\n\n"
+            f"Current customer message: {user_message}\n\n"
+            f"Your response:"
+        )
         
         return prompt
     
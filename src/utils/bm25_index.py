@@ -0,0 +1,120 @@
+"""
+BM25 inverted index over the knowledge sources
+"""
+import math
+import re
+import heapq
+from collections import Counter
+from typing import List, Dict, Tuple, Optional, Iterable
+
+TOKEN_PATTERN = re.compile(r'[^\W_]+', re.UNICODE)
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'at', 'by', 'from',
+    'is', 'are', 'be', 'it', 'me', 'my', 'i', 'you', 'your', 'we', 'our', 'do', 'have', 'has',
+    'can', 'what', 'which', 'show', 'please', 'any', 'some', 'this', 'that', 'there'
+}
+
+
+def stem(token: str) -> str:
+    """Very light plural folding so 'horses' and 'horse' share a posting list"""
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed and plurals folded"""
+    return [stem(t) for t in TOKEN_PATTERN.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 with per-posting weights precomputed at build time"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.keys: List[str] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self._term_freqs: List[Counter] = []
+        self._matrix = None
+        self.vocabulary: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str, text: str, boost_text: str = '', boost: int = 3):
+        """Add a document; boost_text (e.g. a title) is counted `boost` times"""
+        tokens = tokenize(text) + tokenize(boost_text) * boost
+        self.keys.append(key)
+        self.doc_lengths.append(len(tokens))
+        self._term_freqs.append(Counter(tokens))
+
+    def build(self):
+        """Turn the added documents into weighted posting lists"""
+        n_docs = len(self.keys)
+        avg_length = (sum(self.doc_lengths) / n_docs) if n_docs else 0.0
+        raw: Dict[str, List[Tuple[int, int]]] = {}
+        for doc_idx, freqs in enumerate(self._term_freqs):
+            for term, tf in freqs.items():
+                raw.setdefault(term, []).append((doc_idx, tf))
+
+        self.postings = {}
+        for term, entries in raw.items():
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            weighted = []
+            for doc_idx, tf in entries:
+                norm = 1 - self.b + self.b * (self.doc_lengths[doc_idx] / avg_length if avg_length else 0)
+                weighted.append((doc_idx, idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)))
+            self.postings[term] = weighted
+        self._term_freqs = []
+        self._matrix = None
+        return self
+
+    def matrix(self):
+        """Sparse (terms x documents) matrix of the posting weights, built on first use"""
+        if self._matrix is None:
+            from scipy.sparse import csr_matrix
+            self.vocabulary = {term: row for row, term in enumerate(self.postings)}
+            rows, cols, weights = [], [], []
+            for term, entries in self.postings.items():
+                row = self.vocabulary[term]
+                for doc_idx, weight in entries:
+                    rows.append(row)
+                    cols.append(doc_idx)
+                    weights.append(weight)
+            self._matrix = csr_matrix(
+                (weights, (rows, cols)), shape=(len(self.vocabulary), len(self.keys)), dtype='float32'
+            )
+        return self._matrix
+
+    def query_matrix(self, term_lists: List[Iterable[str]]):
+        """Sparse (queries x terms) indicator matrix; unknown terms are dropped"""
+        from scipy.sparse import csr_matrix
+        self.matrix()
+        rows, cols = [], []
+        for row, terms in enumerate(term_lists):
+            for col in {self.vocabulary[t] for t in terms if t in self.vocabulary}:
+                rows.append(row)
+                cols.append(col)
+        return csr_matrix(
+            ([1.0] * len(rows), (rows, cols)), shape=(len(term_lists), len(self.vocabulary)), dtype='float32'
+        )
+
+    def score(self, terms: Iterable[str]) -> Dict[int, float]:
+        """Accumulate scores over the posting lists of the given (already tokenized) terms"""
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            for doc_idx, weight in self.postings.get(term, ()):
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + weight
+        return scores
+
+    def search(self, query: str, top_k: Optional[int] = None, extra_terms: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Documents matching the query as (key, score), best first"""
+        scores = self.score(list(tokenize(query)) + list(extra_terms))
+        if top_k is None:
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        else:
+            ranked = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self.keys[doc_idx], score) for doc_idx, score in ranked]
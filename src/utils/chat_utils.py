@@ -53,14 +53,15 @@ def simulate_typing(duration: float = 1.0):
     time.sleep(duration)
 
 def format_truck_info(truck_data: Dict[str, Any]) -> str:
-    """Format truck information for display"""
-    return f"""
-    **{truck_data.get('name', 'Unknown Truck')}**
-    - Price: ${truck_data.get('price', 'N/A'):,}
-    - Year: {truck_data.get('year', 'N/A')}
-    - Condition: {truck_data.get('condition', 'N/A')}
-    - Features: {', '.join(truck_data.get('features', []))}
-    """
+    """Format truck information for display; price and year are left out when the listing has none"""
+    lines = [f"**{truck_data.get('name') or 'Unknown Truck'}**"]
+    if truck_data.get('price'):
+        lines.append(f"- Price: ${truck_data['price']:,}")
+    if truck_data.get('year'):
+        lines.append(f"- Year: {truck_data['year']}")
+    lines.append(f"- Condition: {truck_data.get('condition') or 'N/A'}")
+    lines.append(f"- Features: {', '.join(truck_data.get('features') or [])}")
+    return "\n".join(lines)
 
 def extract_intent(user_message: str) -> str:
     """Simple intent extraction from user message"""
@@ -0,0 +1,143 @@
+"""
+Circuit breaker for upstream calls: jittered retries for transient errors,
+fail fast while the upstream is down, and single half-open probes to find
+out when it is back
+"""
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Type, TypeVar
+from ..core.exceptions import CircuitOpenError
+from ..core.logger import app_logger
+
+T = TypeVar('T')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Timeouts always count as upstream failures (asyncio's and futures' are distinct classes before Python 3.11)
+TIMEOUT_ERRORS = (TimeoutError, asyncio.TimeoutError, concurrent.futures.TimeoutError)
+
+
+class CircuitBreaker:
+    """
+    Counts consecutive failed calls; after `failure_threshold` of them the
+    circuit opens and calls raise CircuitOpenError without touching the
+    upstream. After `reset_timeout` seconds one caller is let through as a
+    half-open probe: success closes the circuit, failure opens it again.
+    Errors in `retry_on` are retried up to `max_retries` times with full
+    jitter backoff before the call counts as failed. Only those transient
+    errors and timeouts count: a rejected request or a bad API key says
+    nothing about whether the upstream is up, so it is raised untouched.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 max_retries: int = 2, backoff: float = 0.5, max_backoff: float = 4.0,
+                 retry_on: Tuple[Type[BaseException], ...] = ()):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on = retry_on
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _admit(self) -> bool:
+        """Whether a call may go upstream, and if so whether it is the half-open probe"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit is open, skipping the call")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                app_logger.info(f"{self.name} circuit closed, upstream recovered")
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def _end_probe(self):
+        # The probe ended without a verdict (a non-transient error, or the caller went away)
+        with self._lock:
+            self._probing = False
+
+    def _is_failure(self, error: BaseException) -> bool:
+        return isinstance(error, self.retry_on + TIMEOUT_ERRORS)
+
+    def record_failure(self, error: BaseException):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    app_logger.warning(f"{self.name} circuit opened after {self.failures} failures: {error}")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def _delay(self, attempt: int) -> float:
+        # Full jitter: spreads the retries of many sessions over the whole window
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def call(self, func: Callable[[], T]) -> T:
+        """func() through the breaker; raises CircuitOpenError while open"""
+        probe = self._admit()
+        # A probe gets one attempt, so a still-failing upstream isn't hammered
+        retries = 0 if probe else self.max_retries
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    result = func()
+                except Exception as e:
+                    if attempt < retries and isinstance(e, self.retry_on):
+                        time.sleep(self._delay(attempt))
+                        continue
+                    if self._is_failure(e):
+                        self.record_failure(e)
+                    raise
+                self.record_success()
+                return result
+        finally:
+            if probe:
+                self._end_probe()
+
+    def stream(self, open_stream: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """
+        Chunks of open_stream() through the breaker. Retries only happen
+        before the first chunk arrives; a stream that breaks later counts as
+        a failure but is not restarted, since its start was already shown.
+        """
+        def first_chunk() -> Tuple[Optional[T], Iterator[T], bool]:
+            chunks = iter(open_stream())
+            for chunk in chunks:
+                return chunk, chunks, True
+            return None, chunks, False
+
+        chunk, chunks, has_chunk = self.call(first_chunk)
+        if not has_chunk:
+            return
+        yield chunk
+        try:
+            yield from chunks
+        except Exception as e:
+            if self._is_failure(e):
+                self.record_failure(e)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {'state': self.state, 'failures': self.failures, 'rejected': self.rejected}
@@ -0,0 +1,115 @@
+"""
+Token-budgeted prompt context: ranked search results become context blocks
+(truck cards, dealer records, contact passages and the detail-page passage
+that answers the question), and the best non-redundant ones that fit the
+budget go into the prompt
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from ..config.settings import get_settings
+from .bm25_index import tokenize
+from .boilerplate import estimate_tokens
+from .semantic_index import vehicle_passages
+
+settings = get_settings()
+
+# Blocks sharing at least this share of their terms with a kept block add nothing new
+MAX_OVERLAP = 0.8
+
+
+def truck_card(item: Dict[str, Any]) -> str:
+    """One TRUCK line with every field the answer format asks for"""
+    card = f"TRUCK: {item['title']}"
+    card += f" | Capacity: {item.get('capacity', '')}"
+    card += f" | Condition: {item.get('condition', '')}"
+    if item.get('year'):
+        card += f" | Year: {item['year']}"
+    if item.get('mileage'):
+        card += f" | Mileage: {item['mileage']}"
+    if item.get('features'):
+        card += f" | Features: {item['features']}"
+    if item.get('image_url'):
+        card += f" | Image: {item['image_url']}"
+    if item.get('url'):
+        card += f" | Details: {item['url']}"
+    # Check if it's a tackbox
+    if 'tackbox' in item['title'].lower():
+        card += " | TYPE: TACKBOX (storage equipment, not a truck)"
+    return card + "\n"
+
+
+def _overlap(terms: Set[str], other: Set[str]) -> float:
+    union = len(terms | other)
+    return len(terms & other) / union if union else 1.0
+
+
+class ContextAssembler:
+    """
+    Walks the ranked results in order and keeps each block while it fits the
+    remaining token budget, so prompt size per turn is bounded no matter how
+    long the matched documents are
+    """
+
+    def __init__(self, token_budget: int):
+        self.token_budget = token_budget
+
+    def _detail_passage(self, item: Dict[str, Any], card: str, query_terms: Set[str], vehicles) -> Optional[str]:
+        """The vehicle's detail-page passage with the most query terms the card doesn't already cover"""
+        vehicle = vehicles.get(item.get('id')) if vehicles is not None and item.get('id') else None
+        missing = query_terms - set(tokenize(card))
+        if vehicle is None or not missing:
+            return None
+        best, best_hits = None, 0
+        # The first passage is the name/spec header, which the card already shows
+        for _, passage in vehicle_passages(vehicle)[1:]:
+            hits = len(missing & set(tokenize(passage)))
+            if hits > best_hits:
+                best, best_hits = passage, hits
+        return f"  DETAILS: {best}\n" if best else None
+
+    def _blocks(self, item: Dict[str, Any], query_terms: Set[str], vehicles) -> List[Tuple[str, bool]]:
+        """(text, deduplicate) blocks for one result; truck cards are distinct vehicles and never deduplicated"""
+        if item.get('type') == 'truck':
+            card = truck_card(item)
+            passage = self._detail_passage(item, card, query_terms, vehicles)
+            return [(card, False)] + ([(passage, True)] if passage else [])
+        if item.get('type') == 'dealer':
+            return [(f"DEALER: {item['title']}: {item['content']}\n", True)]
+        if item.get('type') == 'contact':
+            return [(f"CONTACT: {item['content']}\n", True)]
+        return []
+
+    def assemble(self, query: str, results: Iterable[Dict[str, Any]], vehicles=None) -> Tuple[str, int, int]:
+        """
+        Context text for the best results that fit the budget, how many
+        results it consumed (kept or dropped as redundant) and its estimated
+        tokens. Stops at the first result that no longer fits, so a follow-up
+        page can continue from there.
+        """
+        query_terms = set(tokenize(query))
+        remaining = self.token_budget
+        parts: List[str] = []
+        kept_terms: List[Set[str]] = []
+        results = list(results)
+        for consumed, item in enumerate(results):
+            blocks = []
+            for text, deduplicate in self._blocks(item, query_terms, vehicles):
+                terms = set(tokenize(text))
+                if deduplicate and any(_overlap(terms, seen) >= MAX_OVERLAP for seen in kept_terms):
+                    continue
+                blocks.append((text, terms))
+            cost = sum(estimate_tokens(text) for text, _ in blocks)
+            if cost > remaining and len(blocks) > 1:
+                # A truck card may still fit without its optional details passage
+                blocks, cost = blocks[:1], estimate_tokens(blocks[0][0])
+            # The first result always goes in, so every page makes progress
+            if cost > remaining and parts:
+                return ''.join(parts), consumed, self.token_budget - remaining
+            for text, terms in blocks:
+                parts.append(text)
+                kept_terms.append(terms)
+            remaining -= cost
+        return ''.join(parts), len(results), self.token_budget - remaining
+
+
+# Global instance
+context_assembler = ContextAssembler(settings.context_token_budget)
@@ -0,0 +1,72 @@
+"""
+Background watcher that hot-reloads the inventory index when data/ changes
+"""
+import hashlib
+import threading
+from typing import Dict, Tuple, Optional, List
+from ..core.logger import app_logger
+
+
+class DataWatcher:
+    """
+    Polls the source files under data/. A change in mtime or size triggers a
+    content hash; only files whose hash differs from the live snapshot are
+    re-parsed, and the rebuilt index is swapped in by LiveInventoryIndex.reload
+    """
+
+    def __init__(self, live_index, interval: float = 30.0):
+        self.live_index = live_index
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Empty on start so the first check hashes everything against the live snapshot
+        self._stats: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    def _stat_files(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        from .inventory_index import SOURCE_FILES
+        stats = {}
+        for file_name in SOURCE_FILES:
+            try:
+                st = (self.live_index.data_path / file_name).stat()
+                stats[file_name] = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                stats[file_name] = None
+        return stats
+
+    def _content_hash(self, file_name: str) -> Optional[str]:
+        try:
+            return hashlib.sha1((self.live_index.data_path / file_name).read_bytes()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def changed_files(self) -> List[str]:
+        """Files whose content differs from the snapshot currently being served"""
+        stats = self._stat_files()
+        touched = [name for name, stat in stats.items() if stat != self._stats.get(name)]
+        self._stats = stats
+        fingerprints = self.live_index.current.fingerprints
+        return [name for name in touched if self._content_hash(name) != fingerprints.get(name)]
+
+    def check_once(self) -> bool:
+        """Reload the affected sources if anything changed; returns True if a new index was swapped in"""
+        changed = self.changed_files()
+        if not changed:
+            return False
+        app_logger.info(f"Data change detected in {changed}, rebuilding inventory index")
+        return self.live_index.reload(changed_files=changed)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_once()
+            except Exception as e:
+                app_logger.error(f"Data watcher error: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+            self._thread.start()
+            app_logger.info(f"Watching data/ for changes every {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
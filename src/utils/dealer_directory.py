@@ -0,0 +1,153 @@
+"""
+Dealer lists parsed into records with brand and country indexes
+"""
+import re
+from typing import List, Dict, Optional, Iterable
+from ..core.models import Dealer
+
+# Canonical country name -> spellings seen in the dealer files and in user queries
+COUNTRY_ALIASES = {
+    'Belgium': ['belgium', 'belgique', 'belgië', 'belgie'],
+    'Denmark': ['denmark', 'danmark'],
+    'France': ['france', 'francia', 'frankrijk'],
+    'Germany': ['germany', 'deutschland', 'alemania', 'allemagne', 'germania', 'duitsland'],
+    'Netherlands': ['netherlands', 'holland', 'nederland', 'the netherlands', 'pays-bas', 'países bajos', 'paesi bassi'],
+    'United Kingdom': ['united kingdom', 'uk', 'england', 'britain', 'great britain', 'scotland', 'wales', 'northern ireland', 'reino unido', 'royaume-uni', 'regno unito'],
+    'Ireland': ['ireland', 'irlanda', 'irlande', 'ierland'],
+    'Italy': ['italy', 'italia', 'italie', 'italië'],
+    'Norway': ['norway', 'norge', 'noruega', 'norvège', 'noorwegen'],
+    'Sweden': ['sweden', 'sverige', 'suecia', 'suède', 'zweden'],
+}
+
+# Used when the address was cut off before the country
+PHONE_PREFIXES = {
+    '+32': 'Belgium', '+45': 'Denmark', '+33': 'France', '+49': 'Germany', '+31': 'Netherlands',
+    '+44': 'United Kingdom', '+353': 'Ireland', '+39': 'Italy', '+47': 'Norway', '+46': 'Sweden',
+}
+
+MARKERS = re.compile('[✏️\U0001f4c5↑‪-‮]')
+HEADER_PATTERN = re.compile(r'^(#.*|DEALER-LIST.*|NAME,?)$')
+INDEX_PATTERN = re.compile(r'^#?\d+$')
+PHONE_PATTERN = re.compile(r'^(\+|00)[\d\s\-()]{6,}$')
+
+_ALIAS_PATTERNS = [
+    (re.compile(r'(?<![\w-])' + re.escape(alias) + r'(?![\w-])'), country)
+    for country, aliases in COUNTRY_ALIASES.items() for alias in sorted(aliases, key=len, reverse=True)
+]
+
+
+def find_countries(text: str) -> List[str]:
+    """Canonical countries mentioned in free text, in order of appearance"""
+    text = text.lower()
+    found = sorted(
+        (match.start(), country)
+        for pattern, country in _ALIAS_PATTERNS for match in pattern.finditer(text)
+    )
+    countries: List[str] = []
+    for _, country in found:
+        if country not in countries:
+            countries.append(country)
+    return countries
+
+
+def _country_from_address(address: str) -> List[str]:
+    countries = find_countries(address.rstrip('.'))
+    if countries:
+        return countries
+    # Truncated tails such as 'United Kingd...' or 'Ge...'
+    tail = address.rstrip('.').rsplit(',', 1)[-1].strip().lower()
+    if len(tail) >= 2 and address.endswith('...'):
+        for country, aliases in COUNTRY_ALIASES.items():
+            if any(alias.startswith(tail) for alias in aliases):
+                return [country]
+    return []
+
+
+def _country_from_phone(phone: str) -> Optional[str]:
+    number = re.sub(r'[^\d+]', '', phone)
+    if number.startswith('00'):
+        number = '+' + number[2:]
+    for prefix in sorted(PHONE_PREFIXES, key=len, reverse=True):
+        if number.startswith(prefix):
+            return PHONE_PREFIXES[prefix]
+    return None
+
+
+def parse_dealer_file(brand: str, text: str) -> List[Dealer]:
+    """
+    Parse one scraped dealer list. Entries are name / address / phone lines
+    separated by index numbers; entries can interleave (two names followed by
+    their address and phone pairs), so each address or phone goes to the
+    oldest entry still missing one.
+    """
+    entries: List[Dict[str, str]] = []
+    for raw_line in text.splitlines():
+        line = MARKERS.sub('', raw_line).strip()
+        if not line or HEADER_PATTERN.match(line) or INDEX_PATTERN.match(line):
+            continue
+        if PHONE_PATTERN.match(line):
+            field = 'phone'
+        elif ',' in line or line.endswith('...'):
+            field = 'address'
+        else:
+            entries.append({'name': line})
+            continue
+        pending = next((entry for entry in entries if field not in entry), None)
+        if pending is not None:
+            pending[field] = line
+
+    dealers = []
+    for entry in entries:
+        address, phone = entry.get('address', ''), entry.get('phone', '')
+        countries = _country_from_address(address)
+        if not countries and _country_from_phone(phone):
+            countries = [_country_from_phone(phone)]
+        dealers.append(Dealer(
+            brand=brand, name=entry['name'], address=address,
+            country=countries[0] if countries else None, countries=countries, phone=phone
+        ))
+    return dealers
+
+
+def format_dealer(dealer: Dealer) -> str:
+    return f"{dealer.name} ({dealer.brand}): {dealer.address} - Phone: {dealer.phone}"
+
+
+class DealerDirectory:
+    """All dealer records with brand -> dealers and country -> dealers lookups"""
+
+    def __init__(self, dealers: Iterable[Dealer] = ()):
+        self.dealers: List[Dealer] = list(dealers)
+        self.by_brand: Dict[str, List[Dealer]] = {}
+        self.by_country: Dict[str, List[Dealer]] = {}
+        for dealer in self.dealers:
+            self.by_brand.setdefault(dealer.brand, []).append(dealer)
+            for country in dealer.countries:
+                self.by_country.setdefault(country, []).append(dealer)
+
+    @classmethod
+    def from_texts(cls, texts_by_brand: Dict[str, str]) -> 'DealerDirectory':
+        return cls(dealer for brand, text in texts_by_brand.items() for dealer in parse_dealer_file(brand, text))
+
+    def lookup(self, countries: Iterable[str] = (), brands: Iterable[str] = ()) -> List[Dealer]:
+        """Dealers in any of the countries and of any of the brands (an empty filter matches all)"""
+        countries, brands = list(countries), [brand.upper() for brand in brands]
+        if countries:
+            matches = [dealer for country in countries for dealer in self.by_country.get(country, [])]
+            if brands:
+                matches = [dealer for dealer in matches if dealer.brand in brands]
+        else:
+            matches = [dealer for brand in brands for dealer in self.by_brand.get(brand, [])]
+        unique: List[Dealer] = []
+        for dealer in matches:
+            if not any(dealer is seen for seen in unique):
+                unique.append(dealer)
+        return unique
+
+    def in_country(self, country: str) -> List[Dealer]:
+        countries = find_countries(country)
+        return self.by_country.get(countries[0], []) if countries else []
+
+    def for_brand(self, brand: str) -> List[Dealer]:
+        return self.by_brand.get(brand.upper(), [])
+
@@ -0,0 +1,124 @@
+"""
+Ingest step for the scraped vehicle detail pages (URL, Title, Content, Word Count)
+"""
+import re
+import sys
+from typing import List, Dict, Optional
+from ..core.models import VehicleDetail
+
+SPEC_LABELS = [
+    'Brand', 'Chassis', 'Weight', 'Gearbox', 'Side Ramp', 'Pop-Outs', 'Push-up',
+    'Horses', 'Cabin', 'Version', 'Living', 'Year', 'Mileage'
+]
+SPEC_PATTERN = re.compile(r'\b(' + '|'.join(re.escape(label) for label in SPEC_LABELS) + r'):\s*')
+
+# Section headings inside the feature list on the vehicle pages
+SECTION_PATTERN = re.compile(r'\b(?:Horse Area|Living Area|Bathroom Area|Cabin Area|Equipment|Cabin)\b')
+
+# A new list item starts where a capitalised word follows a lowercase word, digit or bracket
+ITEM_BOUNDARY = re.compile(r'(?<=[a-z0-9)]) (?=[A-Z][a-z])')
+
+TITLE_NOISE = re.compile(r'^FOR SALE I (?:Second-Hand )?| I Stephex Horsetrucks$| - Stephex Horsetrucks$')
+
+OFFER_MARKER = ' GET YOUR OFFER'
+SHARE_MARKER = ' Share:'
+
+
+def normalize_key(text: str) -> str:
+    """Lookup key for truck names: lowercase, unified dashes, single spaces"""
+    text = str(text).lower().replace('–', '-').replace('—', '-')
+    return ' '.join(text.split())
+
+
+def clean_title(title: str) -> str:
+    """Strip the 'FOR SALE I' / '- Stephex Horsetrucks' decoration from a page title"""
+    return TITLE_NOISE.sub('', str(title).strip()).strip()
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    digits = ''.join(filter(str.isdigit, value or ''))
+    return int(digits) if digits else None
+
+
+def _split_items(text: str) -> List[str]:
+    """Split a run-together feature list into individual items"""
+    items = []
+    for section in SECTION_PATTERN.split(text):
+        for item in ITEM_BOUNDARY.split(section.strip()):
+            item = item.strip(' -')
+            if item:
+                # The same feature names recur on most pages
+                items.append(sys.intern(item))
+    return items
+
+
+def parse_detail_page(url: str, title: str, content: str, word_count: str = '') -> Optional[VehicleDetail]:
+    """Parse one scraped page into a structured vehicle record"""
+    brand_pos = content.find(' Brand:')
+    if brand_pos == -1:
+        return None
+
+    back_pos = content.rfind('Back ', 0, brand_pos)
+    name = content[back_pos + 5:brand_pos].strip() if back_pos != -1 else clean_title(title)
+
+    offer_pos = content.find(OFFER_MARKER, brand_pos)
+    if offer_pos == -1:
+        offer_pos = len(content)
+    share_pos = content.find(SHARE_MARKER, offer_pos)
+    if share_pos == -1:
+        share_pos = len(content)
+
+    body = content[brand_pos:offer_pos]
+    features_text = ''
+    features_pos = body.find(' Features ')
+    if features_pos != -1:
+        features_text = body[features_pos + len(' Features '):].strip()
+        body = body[:features_pos]
+
+    specs: Dict[str, str] = {}
+    matches = list(SPEC_PATTERN.finditer(body))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(body)
+        value = body[match.end():end].strip()
+        if value:
+            specs[match.group(1)] = value
+
+    options: List[str] = []
+    description = ''
+    tail = content[offer_pos + len(OFFER_MARKER):share_pos].strip()
+    if tail.startswith('Options '):
+        options = _split_items(tail[len('Options '):])
+    else:
+        description = tail
+
+    return VehicleDetail(
+        url=url.strip(),
+        title=clean_title(title),
+        name=name,
+        brand=specs.get('Brand'),
+        chassis=specs.get('Chassis'),
+        weight=specs.get('Weight'),
+        horses=_parse_int(specs.get('Horses')),
+        year=_parse_int(specs.get('Year')),
+        mileage=_parse_int(specs.get('Mileage')),
+        specs=specs,
+        features=_split_items(features_text),
+        options=options,
+        features_text=features_text,
+        description=description,
+        content=content,
+        word_count=_parse_int(word_count) or 0
+    )
+
+
+def parse_detail_file(text: str) -> List[VehicleDetail]:
+    """Parse a tab-separated scrape file, skipping header and malformed lines"""
+    records = []
+    for line in text.splitlines():
+        fields = line.split('\t')
+        if len(fields) < 3 or not fields[0].startswith('http'):
+            continue
+        record = parse_detail_page(*fields[:4])
+        if record:
+            records.append(record)
+    return records
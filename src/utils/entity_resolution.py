@@ -0,0 +1,196 @@
+"""
+Entity resolution across inventory sources: one canonical ID per vehicle plus an alias table
+"""
+import re
+from typing import List, Dict, Any, Tuple, Optional
+from ..core.models import VehicleDetail
+from .detail_parser import normalize_key
+
+SOURCE_TRUCKS = 'trucks.csv'
+SOURCE_NEW = 'new_trucks.csv'
+SOURCE_USED = 'used_trucks.csv'
+
+NAME_NOISE = re.compile(r'^for sale i |second-hand |[()&,]')
+TRAILING_QUALIFIER = re.compile(r'\s*\([^)]*\)\s*$')
+HORSE_COUNT = re.compile(r'(\d+)\s*-?\s*horses?\b', re.IGNORECASE)
+
+
+def canonical_key(name: str) -> str:
+    """Name key that is stable across the spelling variants used in data/"""
+    key = NAME_NOISE.sub(' ', normalize_key(name))
+    key = re.sub(r'\bhorses\b', 'horse', key)
+    return ' '.join(key.split())
+
+
+def canonical_id(name: str) -> str:
+    """URL-safe canonical vehicle ID derived from the preferred name"""
+    return re.sub(r'[^a-z0-9]+', '-', canonical_key(name)).strip('-')
+
+
+def _base_key(name: str) -> str:
+    """Name key without a trailing '(Single Cabin)'-style qualifier, used as a weak alias"""
+    return canonical_key(TRAILING_QUALIFIER.sub('', str(name)))
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def _source_records(trucks, new_trucks, used_trucks, details) -> List[Tuple[str, str, str, Any]]:
+    """Flatten every source into (source, name, url, record) tuples"""
+    records = []
+    for row in trucks:
+        records.append((SOURCE_TRUCKS, str(row.get('name', '')), str(row.get('url', '')), row))
+    for row in used_trucks:
+        records.append((SOURCE_USED, str(row.get('News__item-button-visible', '')), str(row.get('News__item URL', '')), row))
+    for row in new_trucks:
+        records.append((SOURCE_NEW, str(row.get('Name', '')), '', row))
+    for source, detail in details:
+        records.append((source, detail.name, detail.url, detail))
+    return [r for r in records if r[1].strip()]
+
+
+def _first(values: List[Any]) -> Any:
+    for value in values:
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    """Integer value of a source cell; None when it is empty or not a number (e.g. '2024/25')"""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _merge(group: List[Tuple[str, str, str, Any]]) -> Dict[str, Any]:
+    """Merge every source record of one vehicle into a single canonical record"""
+    by_source: Dict[str, List[Any]] = {}
+    for source, _, _, record in group:
+        by_source.setdefault(source, []).append(record)
+
+    table = by_source.get(SOURCE_TRUCKS, [])
+    used = by_source.get(SOURCE_USED, [])
+    new = by_source.get(SOURCE_NEW, [])
+    details: List[VehicleDetail] = [r for s, _, _, r in group if isinstance(r, VehicleDetail)]
+    detail_sources = {s for s, _, _, r in group if isinstance(r, VehicleDetail)}
+
+    name = _first(
+        [r.get('name') for r in table]
+        + [r.get('News__item-button-visible') for r in used]
+        + [d.name for d in details]
+        + [r.get('Name') for r in new]
+    )
+
+    condition = _first([r.get('condition') for r in table])
+    if not condition:
+        is_used = used or any('used' in s.lower() for s in detail_sources)
+        condition = 'Used' if is_used else 'New'
+
+    horses = _int_or_none(_first([d.horses for d in details] + [r.get('Horses') for r in new]))
+    if not horses:
+        match = HORSE_COUNT.search(name or '')
+        horses = int(match.group(1)) if match else None
+
+    capacity = _first([r.get('capacity') for r in table])
+    if not capacity and horses:
+        capacity = f"{horses} horses"
+
+    year = _first([d.year for d in details] + [r.get('Year') for r in new])
+
+    return {
+        'name': name,
+        'condition': condition,
+        'price': _first([r.get('price') for r in table]),
+        'capacity': capacity or '',
+        'horses': horses,
+        'brand': _first([r.get('Brand') for r in new] + [d.brand for d in details]),
+        'chassis': _first([r.get('Chassis') for r in new] + [d.chassis for d in details]),
+        'weight': _first([r.get('Weight') for r in new] + [d.weight for d in details]),
+        'year': _int_or_none(year),
+        'mileage': _first([d.mileage for d in details]),
+        'features': str(_first([r.get('Features') for r in new] + [d.features_text for d in details]) or ''),
+        'options': str(_first([r.get('Options') for r in new] + [', '.join(d.options) for d in details]) or ''),
+        'description': _first([d.description for d in details]) or '',
+        'image_url': _first([r.get('image_url') for r in table] + [r.get('Image') for r in used]) or '',
+        'url': _first([r.get('url') for r in table] + [r.get('News__item URL') for r in used] + [d.url for d in details]) or '',
+        'sources': sorted({source for source, _, _, _ in group}),
+        'aliases': sorted({n for _, n, _, _ in group})
+    }
+
+
+def resolve_vehicles(
+    trucks: List[Dict[str, Any]],
+    new_trucks: List[Dict[str, Any]],
+    used_trucks: List[Dict[str, Any]],
+    details: List[Tuple[str, VehicleDetail]]
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """Group source records into vehicles; returns (id -> vehicle, alias -> id)"""
+    records = _source_records(trucks, new_trucks, used_trucks, details)
+    uf = _UnionFind(len(records))
+
+    # Strong aliases: identical URL or identical canonical name
+    first_seen: Dict[str, int] = {}
+    for i, (_, name, url, _) in enumerate(records):
+        for key in ('name:' + canonical_key(name), 'url:' + url if url else None):
+            if key is None:
+                continue
+            if key in first_seen:
+                uf.union(first_seen[key], i)
+            else:
+                first_seen[key] = i
+
+    # Weak aliases: "(Single Cabin)"-style variants join the base listing if one exists
+    for i, (_, name, _, _) in enumerate(records):
+        base = 'name:' + _base_key(name)
+        if base != 'name:' + canonical_key(name) and base in first_seen:
+            uf.union(first_seen[base], i)
+
+    groups: Dict[int, List[Tuple[str, str, str, Any]]] = {}
+    for i, record in enumerate(records):
+        groups.setdefault(uf.find(i), []).append(record)
+
+    vehicles: Dict[str, Dict[str, Any]] = {}
+    aliases: Dict[str, str] = {}
+    for group in groups.values():
+        vehicle = _merge(group)
+        vehicle_id = canonical_id(vehicle['name'])
+        suffix = 2
+        while vehicle_id in vehicles:
+            vehicle_id = f"{canonical_id(vehicle['name'])}-{suffix}"
+            suffix += 1
+        vehicle['id'] = vehicle_id
+        vehicles[vehicle_id] = vehicle
+        for _, name, url, _ in group:
+            aliases.setdefault(canonical_key(name), vehicle_id)
+            if url:
+                aliases.setdefault(url, vehicle_id)
+
+    return vehicles, aliases
+
+
+def lookup_vehicle(
+    vehicles: Dict[str, Dict[str, Any]],
+    aliases: Dict[str, str],
+    name: str = '',
+    url: str = ''
+) -> Optional[Dict[str, Any]]:
+    """Hash lookup of a vehicle by any known URL or name variant"""
+    vehicle_id = aliases.get(url) if url else None
+    if vehicle_id is None and name:
+        vehicle_id = aliases.get(canonical_key(name))
+    return vehicles.get(vehicle_id) if vehicle_id else None
@@ -0,0 +1,237 @@
+"""
+Typed facet columns with precomputed bitmaps for structured truck filters
+"""
+import re
+import bisect
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+
+CURRENT_YEAR = 2025
+
+# Chassis makes recognised in chassis fields, truck names and queries
+MAKES = ['scania', 'volvo', 'mercedes', 'renault', 'ford', 'iveco', 'man', 'daf']
+
+# Upper bounds (tonnes) of the licence-driven weight classes
+WEIGHT_CLASSES = [3.5, 7.5, 12.0, 18.0, 26.0, 44.0]
+
+NUMBER = r'(\d+(?:[.,]\d+)?)'
+TONNES = r'\s*(?:t|ton|tons|tonne|tonnes)\b'
+HORSES_PATTERN = re.compile(r'\b(\d+)\s*-?\s*horses?\b')
+WEIGHT_MAX_PATTERN = re.compile(r'\b(?:under|below|less than|max(?:imum)?|up to|at most)\s*' + NUMBER + TONNES)
+WEIGHT_MIN_PATTERN = re.compile(r'\b(?:over|above|more than|at least|min(?:imum)?)\s*' + NUMBER + TONNES)
+WEIGHT_BARE_PATTERN = re.compile(r'\b' + NUMBER + TONNES)
+YEAR_MIN_PATTERNS = [
+    (re.compile(r'\b(?:from|since)\s+((?:19|20)\d{2})\b'), 0),
+    (re.compile(r'\b((?:19|20)\d{2})\s*(?:or newer|or later|and newer|and later|onwards|\+)'), 0),
+    (re.compile(r'\b(?:after|newer than)\s+((?:19|20)\d{2})\b'), 1),
+]
+YEAR_MAX_PATTERNS = [
+    (re.compile(r'\b((?:19|20)\d{2})\s*(?:or older|or earlier|and older)'), 0),
+    (re.compile(r'\b(?:before|older than)\s+((?:19|20)\d{2})\b'), -1),
+]
+YEAR_PATTERN = re.compile(r'\b((?:19|20)\d{2})\b')
+AGE_PATTERN = re.compile(r'(\d+)\s*years?\s*old')
+USED_TERMS = ['used', '2nd hand', 'second hand', 'pre-owned', 'second-hand']
+NEW_PATTERN = re.compile(r'\bbrand new\b|\bnew (?:\d+[- ]?horses? )?(?:truck|horsebox|vehicle|van)s?\b')
+
+
+def parse_weight(value: Any) -> Optional[float]:
+    """'3,5T' -> 3.5, '26T' -> 26.0"""
+    match = re.search(NUMBER, str(value or ''))
+    return float(match.group(1).replace(',', '.')) if match else None
+
+
+def weight_class(tonnes: Optional[float]) -> Optional[float]:
+    """Smallest licence class that a vehicle of this weight falls into"""
+    if tonnes is None:
+        return None
+    index = bisect.bisect_left(WEIGHT_CLASSES, tonnes)
+    return WEIGHT_CLASSES[index] if index < len(WEIGHT_CLASSES) else tonnes
+
+
+def vehicle_make(vehicle) -> Optional[str]:
+    text = f"{vehicle.chassis or ''} {vehicle.name}".lower()
+    words = set(re.findall(r'[a-z]+', text))
+    return next((make for make in MAKES if make in words), None)
+
+
+def vehicle_brand(vehicle) -> Optional[str]:
+    source = str(vehicle.brand or vehicle.name or '').split()
+    return source[0].lower() if source else None
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first"""
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+class FacetIndex:
+    """
+    Per-value bitmaps (Python ints, bit i = vehicle position i) for the
+    categorical facets, and sorted distinct values with cumulative bitmaps for
+    the range facets, so any filter combination is a handful of AND/OR ops
+    """
+
+    CATEGORICAL = ('condition', 'horses', 'brand', 'make', 'chassis')
+    RANGES = ('year', 'weight')
+
+    def __init__(self, vehicles: Iterable):
+        self.ids: List[str] = []
+        self.values: Dict[str, Dict[Any, int]] = {facet: {} for facet in self.CATEGORICAL}
+        self.range_values: Dict[str, List[float]] = {}
+        self.range_cumulative: Dict[str, List[int]] = {}
+        self.missing: Dict[str, int] = {facet: 0 for facet in self.RANGES}
+
+        columns: Dict[str, List] = {facet: [] for facet in self.RANGES}
+        for position, vehicle in enumerate(vehicles):
+            self.ids.append(vehicle.id)
+            bit = 1 << position
+            condition = 'used' if vehicle.is_used else 'new'
+            chassis = (vehicle.chassis or '').lower() or None
+            for facet, value in (('condition', condition), ('horses', vehicle.horses),
+                                 ('brand', vehicle_brand(vehicle)), ('make', vehicle_make(vehicle)),
+                                 ('chassis', chassis)):
+                if value is not None:
+                    self.values[facet][value] = self.values[facet].get(value, 0) | bit
+            columns['year'].append(float(vehicle.year) if vehicle.year else None)
+            columns['weight'].append(weight_class(parse_weight(vehicle.weight)))
+
+        for facet, column in columns.items():
+            by_value: Dict[float, int] = {}
+            for position, value in enumerate(column):
+                if value is None:
+                    self.missing[facet] |= 1 << position
+                else:
+                    by_value[value] = by_value.get(value, 0) | (1 << position)
+            distinct = sorted(by_value)
+            cumulative, running = [], 0
+            for value in distinct:
+                running |= by_value[value]
+                cumulative.append(running)
+            self.range_values[facet] = distinct
+            self.range_cumulative[facet] = cumulative
+
+        self.positions = {vehicle_id: position for position, vehicle_id in enumerate(self.ids)}
+        self.all = (1 << len(self.ids)) - 1
+
+    def equals(self, facet: str, values: Iterable[Any]) -> int:
+        bitmap = 0
+        for value in values:
+            bitmap |= self.values[facet].get(value, 0)
+        return bitmap
+
+    def range(self, facet: str, low: Optional[float] = None, high: Optional[float] = None) -> int:
+        """Bitmap of vehicles with low <= value <= high (either bound optional)"""
+        distinct, cumulative = self.range_values[facet], self.range_cumulative[facet]
+        hi_idx = bisect.bisect_right(distinct, high) if high is not None else len(distinct)
+        lo_idx = bisect.bisect_left(distinct, low) if low is not None else 0
+        if hi_idx <= lo_idx:
+            return 0
+        upper = cumulative[hi_idx - 1]
+        return upper & ~cumulative[lo_idx - 1] if lo_idx > 0 else upper
+
+    def select(self, facets: Dict[str, Any]) -> Optional[int]:
+        """AND together every requested facet; None when the query has no facet constraints"""
+        if not facets:
+            return None
+        bitmap = self.all
+        for facet in ('condition', 'brand', 'make', 'chassis'):
+            if facet in facets:
+                bitmap &= self.equals(facet, facets[facet])
+        if 'horses' in facets:
+            exact = self.equals('horses', [facets['horses']])
+            if not exact & bitmap:
+                # Nobody has exactly that many stalls: offer the next sizes up instead
+                exact = 0
+                for horses, horse_bits in self.values['horses'].items():
+                    if horses >= facets['horses']:
+                        exact |= horse_bits
+            bitmap &= exact
+        if 'year_min' in facets or 'year_max' in facets:
+            years = self.range('year', facets.get('year_min'), facets.get('year_max'))
+            if facets.get('year_allow_unknown'):
+                years |= self.missing['year']
+            bitmap &= years
+        if 'weight_min' in facets or 'weight_max' in facets:
+            bitmap &= self.range('weight', facets.get('weight_min'), facets.get('weight_max'))
+        return bitmap
+
+    def contains(self, bitmap: Optional[int], vehicle_id: str) -> bool:
+        """True if the vehicle is in the bitmap; a None bitmap matches everything"""
+        return bitmap is None or bool(bitmap >> self.positions[vehicle_id] & 1)
+
+    def selected_ids(self, bitmap: int) -> List[str]:
+        return [self.ids[position] for position in iter_bits(bitmap)]
+
+    def to_mask(self, bitmap: Optional[int]):
+        """Boolean NumPy array over vehicle positions, for the batch search path"""
+        import numpy as np
+        if bitmap is None:
+            return np.ones(len(self.ids), dtype=bool)
+        raw = np.frombuffer(bitmap.to_bytes(len(self.ids) // 8 + 1, 'little'), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder='little')[:len(self.ids)].astype(bool)
+
+
+def parse_facets(query: str, brands: Iterable[str] = (), chassis: Iterable[str] = ()) -> Dict[str, Any]:
+    """Structured filters found in a (lowercased) query"""
+    facets: Dict[str, Any] = {}
+    words = set(re.findall(r'[a-z]+', query))
+
+    if any(term in query for term in USED_TERMS):
+        facets['condition'] = ['used']
+    elif NEW_PATTERN.search(query):
+        facets['condition'] = ['new']
+
+    match = HORSES_PATTERN.search(query)
+    if match:
+        facets['horses'] = int(match.group(1))
+
+    for pattern, key in ((WEIGHT_MAX_PATTERN, 'weight_max'), (WEIGHT_MIN_PATTERN, 'weight_min')):
+        match = pattern.search(query)
+        if match:
+            facets[key] = float(match.group(1).replace(',', '.'))
+    if 'weight_max' not in facets and 'weight_min' not in facets:
+        match = WEIGHT_BARE_PATTERN.search(query)
+        if match:
+            facets['weight_max'] = float(match.group(1).replace(',', '.'))
+
+    for pattern, offset in YEAR_MIN_PATTERNS:
+        match = pattern.search(query)
+        if match:
+            facets['year_min'] = int(match.group(1)) + offset
+            break
+    for pattern, offset in YEAR_MAX_PATTERNS:
+        match = pattern.search(query)
+        if match:
+            facets['year_max'] = int(match.group(1)) + offset
+            break
+    if 'year_min' not in facets and 'year_max' not in facets:
+        match = YEAR_PATTERN.search(query)
+        if match:
+            facets['year_min'] = facets['year_max'] = int(match.group(1))
+
+    # "N years old" keeps vehicles with an unknown year, like the original age filter
+    match = AGE_PATTERN.search(query)
+    if match and 'year_min' not in facets:
+        facets['year_min'] = CURRENT_YEAR - int(match.group(1))
+        facets['year_allow_unknown'] = True
+
+    # "recent second-hand" queries: used and 2023 or newer
+    if ('second' in query or 'used' in query) and ('year' in query or 'old' in query):
+        facets['condition'] = ['used']
+        facets['year_min'] = max(facets.get('year_min', 2023), 2023)
+        facets.pop('year_allow_unknown', None)
+
+    found_brands = [brand for brand in brands if brand in words]
+    if found_brands:
+        facets['brand'] = found_brands
+    found_makes = [make for make in MAKES if make in words]
+    if found_makes:
+        facets['make'] = found_makes
+    found_chassis = [value for value in chassis if len(value.split()) > 1 and value in query]
+    if found_chassis:
+        facets['chassis'] = found_chassis
+
+    return facets
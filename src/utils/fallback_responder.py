@@ -0,0 +1,67 @@
+"""
+Templated answers built straight from search results, used when the AI model
+is unavailable so customers still get the matching trucks, dealers and
+contact details in their language
+"""
+from typing import Any, Dict, List, Optional
+from ..config.settings import get_settings
+from ..core.logger import app_logger
+from .language_manager import language_manager
+
+settings = get_settings()
+
+# Searched for when nothing matches, so the reply always says how to reach the team
+CONTACT_QUERY = "contact phone email"
+
+
+class FallbackResponder:
+    """Renders search results in the same card format the AI answers use"""
+
+    def __init__(self, max_results: int = 8):
+        self.max_results = max_results
+
+    def _search(self, query: str, max_results: int, language: str) -> List[Dict[str, Any]]:
+        from .smart_search import search_knowledge
+        try:
+            return search_knowledge(query, max_results=max_results, language=language)
+        except Exception as e:
+            app_logger.warning(f"Fallback search error: {e}")
+            return []
+
+    def _render(self, item: Dict[str, Any], language: str) -> Optional[str]:
+        if item.get('type') == 'truck':
+            specs = [item.get('capacity'), item.get('condition'), item.get('year')]
+            if item.get('mileage'):
+                specs.append(f"{item['mileage']} km")
+            lines = [f"**{item['title']}**", ' · '.join(str(spec) for spec in specs if spec)]
+            if item.get('image_url'):
+                lines.append(f"Image: {item['image_url']}")
+            if item.get('features'):
+                lines.append(f"Features: {item['features'][:200]}")
+            if item.get('url'):
+                lines.append(f"<a href='{item['url']}'>{language_manager.get_text('view_details', language)}</a>")
+            return '\n'.join(lines)
+        if item.get('type') == 'dealer':
+            return f"**{item['title']}**\n{item['content']}"
+        if item.get('type') == 'contact':
+            return item['content']
+        return None
+
+    def respond(self, user_message: str, context: Dict[str, Any], language: str = "en") -> str:
+        """
+        An answer from the results the prompt was built from (or a fresh
+        search when there are none), else the company contact details
+        """
+        results = context.get('search_results')
+        if results is None:
+            results = self._search(user_message, self.max_results, language)
+        blocks = [block for block in (self._render(item, language) for item in results[:self.max_results]) if block]
+        if blocks:
+            return language_manager.get_text('fallback_intro', language) + "\n\n" + "\n\n".join(blocks)
+
+        contact = [self._render(item, language) for item in self._search(CONTACT_QUERY, 1, language)]
+        return "\n\n".join([language_manager.get_text('fallback_no_results', language)] + [c for c in contact if c])
+
+
+# Global instance
+fallback_responder = FallbackResponder(max_results=settings.context_max_results)
@@ -0,0 +1,100 @@
+"""
+Character-trigram index for typo-tolerant lookup of truck names, brands and chassis
+"""
+import re
+from typing import List, Dict, Set, Tuple, Iterable, Container
+
+WORD_PATTERN = re.compile(r'[^\W_]+', re.UNICODE)
+MIN_WORD_LENGTH = 4
+MIN_SIMILARITY = 0.45
+
+
+def trigrams(word: str) -> Set[str]:
+    """Trigrams of a word padded so that its first and last letters weigh in too"""
+    padded = f"$${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def index_words(text: str) -> Set[str]:
+    """Distinct words of a text long enough to be matched fuzzily"""
+    return {word for word in WORD_PATTERN.findall(str(text).lower())
+            if len(word) >= MIN_WORD_LENGTH and not word.isdigit()}
+
+
+def vehicle_name_text(vehicle) -> str:
+    """Names, brand and chassis of a vehicle record, the text the name index covers"""
+    names = [vehicle.name, vehicle.brand, vehicle.chassis] + list(vehicle.aliases)
+    return ' '.join(str(name) for name in names if name)
+
+
+class TrigramIndex:
+    """
+    Maps every word of the indexed names to the keys that contain it, and every
+    trigram to the words that contain it. A misspelled query word is matched to
+    vocabulary words by Dice similarity of their trigram sets.
+    """
+
+    def __init__(self):
+        self.words: List[str] = []
+        self.word_ids: Dict[str, int] = {}
+        self.word_keys: List[Set[str]] = []
+        self.word_trigrams: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+
+    def add(self, key: str, text: str):
+        for word in index_words(text):
+            word_id = self.word_ids.get(word)
+            if word_id is None:
+                word_id = self.word_ids[word] = len(self.words)
+                self.words.append(word)
+                self.word_keys.append(set())
+                grams = trigrams(word)
+                self.word_trigrams.append(len(grams))
+                for gram in grams:
+                    self.postings.setdefault(gram, []).append(word_id)
+            self.word_keys[word_id].add(key)
+
+    def similar_words(self, word: str, min_similarity: float = MIN_SIMILARITY) -> List[Tuple[str, float]]:
+        """Vocabulary words close to `word`, best first"""
+        grams = trigrams(word)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for word_id in self.postings.get(gram, ()):
+                shared[word_id] = shared.get(word_id, 0) + 1
+        matches = []
+        for word_id, count in shared.items():
+            similarity = 2 * count / (len(grams) + self.word_trigrams[word_id])
+            if similarity >= min_similarity:
+                matches.append((self.words[word_id], similarity))
+        matches.sort(key=lambda item: item[1], reverse=True)
+        return matches
+
+    def keys_for(self, word: str) -> Iterable[str]:
+        """Keys whose text contains a vocabulary word"""
+        return self.word_keys[self.word_ids[word]]
+
+    def search(self, query: str, known_words: Container[str] = ()) -> List[Tuple[str, float]]:
+        """
+        Keys ranked by the summed similarity of their best match per query word.
+        Words already in the vocabulary (or in `known_words`) are exact matches
+        for the regular search and are skipped here.
+        """
+        scores: Dict[str, float] = {}
+        for word in set(WORD_PATTERN.findall(str(query).lower())):
+            if len(word) < MIN_WORD_LENGTH or word.isdigit() or word in self.word_ids or word in known_words:
+                continue
+            best: Dict[str, float] = {}
+            for match, similarity in self.similar_words(word):
+                for key in self.keys_for(match):
+                    best[key] = max(best.get(key, 0.0), similarity)
+            for key, similarity in best.items():
+                scores[key] = scores.get(key, 0.0) + similarity
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def build_name_index(vehicles: Iterable) -> TrigramIndex:
+    """Trigram index over the names, brands and chassis of the canonical vehicle records"""
+    index = TrigramIndex()
+    for vehicle in vehicles:
+        index.add(vehicle.id, vehicle_name_text(vehicle))
+    return index
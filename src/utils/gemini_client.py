@@ -0,0 +1,135 @@
+"""
+Asyncio Gemini client: every call runs on one event loop in a dedicated
+thread, so all sessions share the SDK's persistent async channel, and a
+process-wide semaphore caps how many calls are in flight
+"""
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, Dict, Iterator, Optional
+from ..config.settings import get_settings
+
+settings = get_settings()
+
+# Marks the end of a streamed response on the chunk queue
+_END = object()
+
+
+class AsyncGeminiClient:
+    """
+    Runs Gemini calls as coroutines on a background event loop. Session
+    threads submit work and wait on a future instead of each holding its own
+    blocking HTTP call, and calls beyond max_concurrent queue on the loop
+    until a slot frees up.
+    """
+
+    def __init__(self, max_concurrent: int = 16, timeout: float = 60.0):
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.in_flight = 0
+        self.queued = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='gemini-client', daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        """Schedule a coroutine on the client loop; the returned future can be waited on from any thread"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    async def _acquire(self):
+        # Created on the loop thread, the only place it is used
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self.queued += 1
+        try:
+            # A call that gets no slot within the timeout fails instead of queueing forever
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No free Gemini slot within {self.timeout}s ({self.max_concurrent} calls in flight)")
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def generate_async(self, model, prompt: Any, **options) -> Any:
+        """model.generate_content_async within a concurrency slot and the request timeout"""
+        await self._acquire()
+        try:
+            return await asyncio.wait_for(model.generate_content_async(prompt, **options), self.timeout)
+        finally:
+            self._release()
+
+    async def _stream_into(self, model, prompt: Any, options: Dict[str, Any], chunks: queue.Queue):
+        try:
+            await self._acquire()
+            try:
+                response = await asyncio.wait_for(
+                    model.generate_content_async(prompt, stream=True, **options), self.timeout
+                )
+                async for chunk in response:
+                    chunks.put((chunk, None))
+            finally:
+                self._release()
+        except BaseException as e:
+            chunks.put((None, e))
+            raise
+        chunks.put((_END, None))
+
+    def generate(self, model, prompt: Any, **options) -> Any:
+        """
+        Blocking wrapper around generate_async for session threads. The slot
+        wait and the call each get the timeout, so the thread waits at most
+        twice that; a call given up on is cancelled on the loop.
+        """
+        future = self.submit(self.generate_async(model, prompt, **options))
+        try:
+            return future.result(timeout=2 * self.timeout)
+        except FutureTimeoutError:
+            if future.done():
+                # The call itself timed out on the loop
+                raise
+            future.cancel()
+            raise TimeoutError(f"No response from Gemini within {2 * self.timeout}s")
+
+    def stream(self, model, prompt: Any, **options) -> Iterator[Any]:
+        """
+        Streamed response chunks for a session thread. The call keeps its
+        concurrency slot until the stream ends, and is cancelled if the reader
+        stops early or no chunk arrives within the timeout.
+        """
+        chunks: queue.Queue = queue.Queue()
+        future = self.submit(self._stream_into(model, prompt, options, chunks))
+        try:
+            while True:
+                try:
+                    chunk, error = chunks.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No response chunk from Gemini within {self.timeout}s")
+                if error is not None:
+                    raise error
+                if chunk is _END:
+                    return
+                yield chunk
+        finally:
+            future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'in_flight': self.in_flight, 'queued': self.queued, 'max_concurrent': self.max_concurrent}
+
+
+# Global Gemini client
+gemini_client = AsyncGeminiClient(
+    max_concurrent=settings.ai_max_concurrent_requests, timeout=settings.ai_request_timeout
+)
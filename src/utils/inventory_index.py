@@ -0,0 +1,367 @@
+"""
+In-memory inventory index shared by the chatbot engine and smart search
+"""
+import io
+import hashlib
+import threading
+import pandas as pd
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from ..core.logger import app_logger
+from ..config.settings import get_settings
+from ..core.models import VehicleDetail
+from .detail_parser import parse_detail_file, normalize_key
+from .entity_resolution import resolve_vehicles, lookup_vehicle
+from .bm25_index import BM25Index
+from .facet_index import FacetIndex
+from .dealer_directory import DealerDirectory, format_dealer
+from .fuzzy_match import TrigramIndex, build_name_index
+from .semantic_index import SemanticIndex, build_semantic_index, paragraph_passages
+from .boilerplate import strip_page_boilerplate
+from .vehicle_records import VehicleRecord, CsvTable, build_records
+
+settings = get_settings()
+
+DATA_PATH = Path(__file__).parent.parent.parent / "data"
+SNAPSHOT_FILE = 'knowledge.snapshot'
+SQLITE_FILE = 'knowledge.db'
+MAPPED_FILE = 'knowledge.mmap'
+
+DEALER_FILES = {
+    'STX': 'Dealer name stx.txt',
+    'AKX': 'Dealer names AKX.txt',
+    'KETTERER': 'dealer names KETTERER copy.txt'
+}
+DETAIL_FILES = ['new trucks detialed.txt', 'used trucks Details.txt']
+CSV_SEPARATORS = {
+    'trucks.csv': ',',
+    'new_trucks.csv': ',',
+    'used_trucks.csv': '\t',
+    'company_data.csv': ','
+}
+OPTIONAL_FILES = {'company_data.csv'}
+SOURCE_FILES = list(CSV_SEPARATORS) + ['contact.txt'] + list(DEALER_FILES.values()) + DETAIL_FILES
+
+
+class InventoryIndex:
+    """
+    Immutable snapshot of every data file, parsed once and served from memory.
+    A reload builds a new snapshot, re-parsing only the files listed in
+    changed_files and reusing the parsed sources of `previous` for the rest.
+    """
+
+    def __init__(self, data_path: Path = DATA_PATH, previous: Optional['InventoryIndex'] = None,
+                 changed_files: Optional[Iterable[str]] = None):
+        self.data_path = Path(data_path)
+        self.trucks: Iterable[Dict[str, Any]] = []
+        self.new_trucks: Iterable[Dict[str, Any]] = []
+        self.used_trucks: Iterable[Dict[str, Any]] = []
+        self.company: Iterable[Dict[str, Any]] = []
+        self.contact_info = ""
+        self.dealers: Dict[str, str] = {}
+        self.dealer_directory = DealerDirectory()
+        self.detailed_info: Dict[str, str] = {}
+        self.boilerplate_reports: Dict[str, Dict[str, Any]] = {}
+        self.details_by_url: Dict[str, VehicleDetail] = {}
+        self.details_by_name: Dict[str, VehicleDetail] = {}
+        self.vehicles: Dict[str, VehicleRecord] = {}
+        self.aliases: Dict[str, str] = {}
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.bm25 = BM25Index()
+        self.facets = FacetIndex([])
+        self.name_index = TrigramIndex()
+        self.semantic = SemanticIndex()
+        self.fingerprints: Dict[str, Optional[str]] = {}
+        self.load_errors: List[str] = []
+        self.version = ""
+        self._parsed: Dict[str, Any] = {}
+        self.load(previous, set(changed_files) if changed_files is not None else None)
+
+    def load(self, previous: Optional['InventoryIndex'] = None, changed_files: Optional[set] = None):
+        """Parse the source files from data/ and build the derived indexes"""
+        for file_name in SOURCE_FILES:
+            if previous is not None and changed_files is not None and file_name not in changed_files \
+                    and file_name in previous.fingerprints:
+                self._parsed[file_name] = previous._parsed.get(file_name)
+                self.fingerprints[file_name] = previous.fingerprints[file_name]
+            else:
+                self._parsed[file_name], self.fingerprints[file_name] = self._parse_source(file_name)
+
+        self.version = hashlib.sha1(
+            '|'.join(f"{name}:{self.fingerprints[name]}" for name in sorted(self.fingerprints)).encode()
+        ).hexdigest()[:16]
+
+        try:
+            self.trucks = self._parsed['trucks.csv'] or []
+            self.new_trucks = self._parsed['new_trucks.csv'] or []
+            self.used_trucks = self._parsed['used_trucks.csv'] or []
+            self.contact_info = self._parsed['contact.txt'] or ""
+            self.company = self._parsed['company_data.csv'] or []
+            self.dealers = {
+                brand: self._parsed[dealer_file]
+                for brand, dealer_file in DEALER_FILES.items() if self._parsed[dealer_file] is not None
+            }
+            self.dealer_directory = DealerDirectory.from_texts(self.dealers)
+
+            self.detailed_info = {}
+            self.boilerplate_reports = {}
+            self.details_by_url = {}
+            self.details_by_name = {}
+            details = []
+            for text_file in DETAIL_FILES:
+                if self._parsed[text_file] is None:
+                    continue
+                self.detailed_info[text_file], parsed_details, self.boilerplate_reports[text_file] = self._parsed[text_file]
+                for detail in parsed_details:
+                    details.append((text_file, detail))
+                    self.details_by_url[detail.url] = detail
+                    self.details_by_name[normalize_key(detail.name)] = detail
+                    self.details_by_name.setdefault(normalize_key(detail.title), detail)
+
+            # Entity resolution: one canonical record per vehicle across all files
+            vehicles, aliases = resolve_vehicles(
+                self.trucks, self.new_trucks, self.used_trucks, details
+            )
+            self.vehicles = build_records(vehicles)
+            self.aliases = {alias: vehicle_id for alias, vehicle_id in aliases.items() if vehicle_id in self.vehicles}
+
+            self._build_search_index()
+
+            app_logger.info(
+                f"Inventory index {self.version} loaded: {len(self.trucks)} trucks, "
+                f"{len(self.new_trucks)} new, {len(self.used_trucks)} used, "
+                f"{len(self.details_by_url)} detail pages, {len(self.vehicles)} unique vehicles, "
+                f"{len(self.dealer_directory.dealers)} dealers"
+            )
+        except Exception as e:
+            self.load_errors.append(f"index build: {e}")
+            app_logger.error(f"Error loading inventory index: {e}")
+
+    def _parse_source(self, file_name: str):
+        """Read and parse one source file; returns (parsed value, content hash)"""
+        path = self.data_path / file_name
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            if file_name not in OPTIONAL_FILES:
+                self.load_errors.append(f"{file_name}: missing")
+                app_logger.error(f"Error loading {file_name}: file not found")
+            return None, None
+
+        fingerprint = hashlib.sha1(raw).hexdigest()
+        try:
+            if file_name in CSV_SEPARATORS:
+                df = pd.read_csv(io.BytesIO(raw), sep=CSV_SEPARATORS[file_name])
+                return CsvTable.from_frame(df.fillna('')), fingerprint
+            text = raw.decode('utf-8')
+            if file_name in DETAIL_FILES:
+                return self._parse_detail_source(file_name, text), fingerprint
+            return text, fingerprint
+        except Exception as e:
+            self.load_errors.append(f"{file_name}: {e}")
+            app_logger.error(f"Error loading {file_name}: {e}")
+            return None, fingerprint
+
+    def _parse_detail_source(self, file_name: str, text: str):
+        """Parse the detail pages from the raw scrape, then keep only their page-specific text"""
+        records = parse_detail_file(text)
+        cleaned_text, cleaned_by_url, report = strip_page_boilerplate(text)
+        for record in records:
+            record.content = cleaned_by_url.get(record.url, record.content)
+        app_logger.info(
+            f"{file_name}: stripped {report['bytes_saved']} of {report['bytes_before']} bytes "
+            f"(~{report['tokens_saved']} tokens) of site boilerplate from {report['pages']} pages"
+        )
+        return cleaned_text, records, report
+
+    def search_documents(self) -> Iterable[Tuple[str, Dict[str, Any], str, str]]:
+        """(key, document, text, boost text) for every searchable vehicle, dealer record and the contact text"""
+        for vehicle_id, vehicle in self.vehicles.items():
+            yield (f"truck:{vehicle_id}", {'type': 'truck', 'ref': vehicle_id, 'title': vehicle.name},
+                   vehicle_document_text(vehicle), vehicle.name)
+
+        for position, dealer in enumerate(self.dealer_directory.dealers):
+            document = {'type': 'dealer', 'ref': position, 'title': dealer_title(dealer), 'content': format_dealer(dealer)}
+            yield (f"dealer:{position}", document, f"{format_dealer(dealer)} {' '.join(dealer.countries)}",
+                   f'{dealer.brand} dealer')
+
+        # Contact and company text is searched (and handed to the prompt) passage by passage
+        for position, passage in enumerate(paragraph_passages(self.contact_info)):
+            key = f"contact:{position}"
+            document = {'type': 'contact', 'ref': key, 'title': 'Contact Information', 'content': passage}
+            yield key, document, passage, 'contact company information'
+
+    def _build_search_index(self):
+        """Build the BM25 index over vehicles (incl. their detail pages), dealer records and contact text"""
+        documents: Dict[str, Dict[str, Any]] = {}
+        bm25 = BM25Index()
+
+        for key, document, text, boost_text in self.search_documents():
+            documents[key] = document
+            bm25.add(key, text, boost_text=boost_text)
+
+        self.documents = documents
+        self.bm25 = bm25.build()
+        # Same vehicle order as the truck documents, so facet bit i is BM25 document i
+        self.facets = FacetIndex(self.vehicles.values())
+        self.name_index = build_name_index(self.vehicles.values())
+        self.semantic = build_semantic_index(self.vehicles.values())
+
+    def find_detail(self, name: str = '', url: str = '') -> Optional[VehicleDetail]:
+        """Parsed detail page for a truck, by URL first and then by name"""
+        if url and url in self.details_by_url:
+            return self.details_by_url[url]
+        return self.details_by_name.get(normalize_key(name)) if name else None
+
+    def vehicle_for(self, name: str = '', url: str = '') -> Optional[VehicleRecord]:
+        """Canonical vehicle record for any name or URL variant seen at ingest"""
+        return lookup_vehicle(self.vehicles, self.aliases, name=name, url=url)
+
+    def knowledge_base(self) -> Dict[str, Any]:
+        """Knowledge base dict in the shape the chatbot engine passes to the AI service"""
+        knowledge = {
+            'new_trucks': self.new_trucks,
+            'used_trucks': self.used_trucks,
+            'contact_info': self.contact_info,
+            'dealers': self.dealers,
+            'detailed_info': self.detailed_info
+        }
+        if self.company:
+            knowledge['company'] = self.company
+        return knowledge
+
+
+def vehicle_document_text(vehicle: VehicleRecord) -> str:
+    """Searchable text for a canonical vehicle: names, specs, condition and detail-page text"""
+    terms = ['vehicle']
+    if vehicle.horses:
+        terms.append('truck horsebox horse transport')
+    if vehicle.is_used:
+        terms.append('used second hand pre-owned')
+    else:
+        terms.append('new')
+    parts = list(vehicle.aliases) + terms + [
+        str(value or '')
+        for value in (vehicle.brand, vehicle.chassis, vehicle.capacity, vehicle.weight, vehicle.year,
+                      vehicle.features, vehicle.options, vehicle.description)
+    ]
+    return ' '.join(parts)
+
+
+def dealer_title(dealer) -> str:
+    return f"{dealer.brand} Dealer - {dealer.country}" if dealer.country else f"{dealer.brand} Dealer"
+
+
+class LiveInventoryIndex:
+    """
+    Holds the current InventoryIndex snapshot. Reloads build a complete new
+    snapshot off to the side and publish it with a single reference swap, so
+    readers are never blocked and never see a half-built index. Callers that
+    read several attributes should take `current` once and use that snapshot.
+    """
+
+    def __init__(self, data_path: Path = DATA_PATH, snapshot_path: Optional[Path] = None, mapped: bool = False):
+        self.data_path = Path(data_path)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        # Serve the memory-mapped snapshot shared by every worker instead of a private copy
+        self.mapped = mapped
+        self._current = self._load_initial()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+
+    def _load_initial(self) -> InventoryIndex:
+        """Start from the knowledge snapshot when it matches data/, otherwise build and snapshot"""
+        if self.mapped and self.snapshot_path is not None:
+            return self._load_shared()
+        if self.snapshot_path is not None:
+            snapshot = self._load_snapshot()
+            if snapshot is not None:
+                return snapshot
+        return self._save_snapshot(InventoryIndex(self.data_path))
+
+    def _load_snapshot(self):
+        if self.mapped:
+            from .mapped_snapshot import load_mapped_snapshot
+            return load_mapped_snapshot(self.snapshot_path, self.data_path)
+        from .knowledge_snapshot import load_snapshot
+        return load_snapshot(self.snapshot_path, self.data_path)
+
+    def _save_snapshot(self, index: InventoryIndex):
+        """Snapshot a freshly built index; returns the index to serve (the mapped file when mapped)"""
+        if self.snapshot_path is None or index.load_errors:
+            return index
+        try:
+            if self.mapped:
+                from .mapped_snapshot import write_mapped_snapshot
+                write_mapped_snapshot(index, self.snapshot_path)
+                return self._load_snapshot() or index
+            from .knowledge_snapshot import write_snapshot
+            write_snapshot(index, self.snapshot_path)
+        except Exception as e:
+            # A read-only data/ only costs the next process a rebuild
+            app_logger.warning(f"Could not write knowledge snapshot {self.snapshot_path}: {e}")
+        return index
+
+    def _load_shared(self):
+        """
+        The mapped snapshot of the current data/. Workers take turns on a
+        lock file: the first to find the file stale builds and writes it
+        (temp file + rename), the others then find it up to date and only map it.
+        """
+        from .knowledge_snapshot import file_lock
+        with file_lock(self.snapshot_path.with_name(self.snapshot_path.name + '.lock')):
+            snapshot = self._load_snapshot()
+            if snapshot is not None:
+                return snapshot
+            return self._save_snapshot(InventoryIndex(self.data_path))
+
+    @property
+    def current(self) -> InventoryIndex:
+        return self._current
+
+    @property
+    def version(self) -> str:
+        return self._current.version
+
+    def reload(self, changed_files: Optional[Iterable[str]] = None) -> bool:
+        """Rebuild from data/ (only changed_files if given) and swap in the result"""
+        with self._reload_lock:
+            previous = self._current
+            if self.mapped and self.snapshot_path is not None:
+                snapshot = self._load_shared()
+            else:
+                # Only a parsed InventoryIndex has sources to reuse; snapshots loaded from disk re-parse everything
+                snapshot = InventoryIndex(self.data_path, previous=previous if isinstance(previous, InventoryIndex) else None,
+                                          changed_files=changed_files)
+            if snapshot.load_errors:
+                app_logger.error(f"Inventory reload rejected, keeping {previous.version}: {snapshot.load_errors}")
+                return False
+            if snapshot.version == previous.version:
+                return False
+            # Readers still holding previous keep it (and its file mapping) alive until they finish
+            self._current = snapshot if self.mapped else self._save_snapshot(snapshot)
+            app_logger.info(f"Inventory index swapped {previous.version} -> {snapshot.version}")
+            return True
+
+    def start_watching(self, interval: float):
+        """Start the background data/ watcher once per process (interval <= 0 disables it)"""
+        if interval <= 0 or self._watcher is not None:
+            return
+        from .data_watcher import DataWatcher
+        self._watcher = DataWatcher(self, interval)
+        self._watcher.start()
+
+    def __getattr__(self, name):
+        # Single-attribute reads go to the current snapshot
+        return getattr(self._current, name)
+
+
+# Global inventory index: the SQLite store, the shared mapped snapshot, or in memory from the knowledge snapshot
+# or built once per process
+if settings.knowledge_backend == 'sqlite':
+    from .sqlite_store import SqliteKnowledgeStore
+    inventory_index = SqliteKnowledgeStore(DATA_PATH / SQLITE_FILE)
+elif settings.knowledge_backend == 'mmap':
+    inventory_index = LiveInventoryIndex(snapshot_path=DATA_PATH / MAPPED_FILE, mapped=True)
+else:
+    inventory_index = LiveInventoryIndex(snapshot_path=DATA_PATH / SNAPSHOT_FILE if settings.use_knowledge_snapshot else None)
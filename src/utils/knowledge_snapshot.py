@@ -0,0 +1,197 @@
+"""
+Versioned binary snapshot of a built InventoryIndex, for fast cold starts.
+
+The file is a fixed magic, a length-prefixed JSON header and the pickled
+index. The header records the snapshot format, a hash of the code that
+shapes the index and the content hash of every source file, so a process
+can tell from the header alone whether the snapshot still matches data/.
+Snapshots are trusted local build artifacts: only load files this app wrote.
+
+    python -m src.utils.knowledge_snapshot --data data --output data/knowledge.snapshot
+    python -m src.utils.knowledge_snapshot --mapped   # memory-mapped layout, see mapped_snapshot
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional
+from ..core.logger import app_logger
+from .inventory_index import InventoryIndex, DATA_PATH, SNAPSHOT_FILE, MAPPED_FILE, SOURCE_FILES
+
+MAGIC = b'TRUCKKB\x00'
+# Bump when the file layout itself changes; code changes are caught by code_hash()
+SNAPSHOT_FORMAT = 1
+# Modules whose classes end up in the pickle or decide what the index contains, relative to src/utils
+INDEX_MODULES = [
+    'inventory_index.py', 'vehicle_records.py', 'detail_parser.py', 'entity_resolution.py', 'bm25_index.py',
+    'facet_index.py', 'dealer_directory.py', 'fuzzy_match.py', 'boilerplate.py', 'semantic_index.py',
+    '../core/models.py',
+]
+HEADER_LENGTH = struct.Struct('<I')
+
+
+def code_hash() -> str:
+    """Hash of the index-building modules, so a deploy with new code never loads an old snapshot"""
+    digest = hashlib.sha1()
+    for module in INDEX_MODULES:
+        digest.update((Path(__file__).parent / module).read_bytes())
+    digest.update(f"{sys.version_info.major}.{sys.version_info.minor}".encode())
+    return digest.hexdigest()[:16]
+
+
+def source_fingerprints(data_path: Path) -> Dict[str, Optional[str]]:
+    """Content hash of every source file, None for missing ones (same scheme as InventoryIndex)"""
+    fingerprints = {}
+    for file_name in SOURCE_FILES:
+        try:
+            fingerprints[file_name] = hashlib.sha1((Path(data_path) / file_name).read_bytes()).hexdigest()
+        except FileNotFoundError:
+            fingerprints[file_name] = None
+    return fingerprints
+
+
+def atomic_write(path: Path, write: Callable[[BinaryIO], None]):
+    """Write via a temp file + rename so readers never see a partial file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            write(out)
+        # Readable by every worker process, like the data files themselves
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock on a lock file shared by every worker process on the host, so one of them writes at a time"""
+    try:
+        import fcntl
+    except ImportError:
+        # No flock (Windows): one process per host there, the thread lock of the caller is enough
+        yield
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def write_snapshot(index: InventoryIndex, path: Path) -> Path:
+    """Write the index atomically so readers never see a partial snapshot"""
+    path = Path(path)
+    header = json.dumps({
+        'format': SNAPSHOT_FORMAT,
+        'code': code_hash(),
+        'version': index.version,
+        'fingerprints': index.fingerprints,
+        'created': datetime.now().isoformat(timespec='seconds'),
+    }).encode('utf-8')
+
+    def write_pickle(out):
+        out.write(MAGIC)
+        out.write(HEADER_LENGTH.pack(len(header)))
+        out.write(header)
+        pickle.dump(index, out, protocol=pickle.HIGHEST_PROTOCOL)
+    atomic_write(path, write_pickle)
+    return path
+
+
+def read_header(path: Path, magic: bytes = MAGIC) -> Optional[Dict[str, Any]]:
+    """The snapshot's JSON header, or None if the file is missing or not a snapshot"""
+    try:
+        with open(path, 'rb') as snapshot:
+            if snapshot.read(len(magic)) != magic:
+                return None
+            (length,) = HEADER_LENGTH.unpack(snapshot.read(HEADER_LENGTH.size))
+            return json.loads(snapshot.read(length))
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def load_snapshot(path: Path, data_path: Path = DATA_PATH) -> Optional[InventoryIndex]:
+    """The snapshotted index if it was built from the current data/ by the current code, else None"""
+    path = Path(path)
+    header = read_header(path)
+    if header is None:
+        return None
+    if header.get('format') != SNAPSHOT_FORMAT or header.get('code') != code_hash():
+        app_logger.info(f"Knowledge snapshot {path.name} was built by other code, rebuilding")
+        return None
+    if header.get('fingerprints') != source_fingerprints(data_path):
+        app_logger.info(f"Knowledge snapshot {path.name} is out of date with {data_path}, rebuilding")
+        return None
+
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as snapshot:
+            snapshot.seek(len(MAGIC))
+            (length,) = HEADER_LENGTH.unpack(snapshot.read(HEADER_LENGTH.size))
+            snapshot.seek(length, os.SEEK_CUR)
+            # Unpickling allocates millions of objects; collector passes over them are pure overhead
+            gc.disable()
+            try:
+                index = pickle.load(snapshot)
+            finally:
+                gc.enable()
+    except Exception as e:
+        app_logger.error(f"Error reading knowledge snapshot {path}: {e}")
+        return None
+    if not isinstance(index, InventoryIndex) or index.version != header['version']:
+        return None
+
+    # The snapshot may have been built elsewhere (e.g. at image build time)
+    index.data_path = Path(data_path)
+    app_logger.info(
+        f"Inventory index {index.version} loaded from snapshot in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile data/ into a knowledge snapshot')
+    parser.add_argument('--data', type=Path, default=DATA_PATH)
+    parser.add_argument('--output', type=Path, help=f'default: <data>/{SNAPSHOT_FILE} (or {MAPPED_FILE})')
+    parser.add_argument('--mapped', action='store_true', help='write the memory-mapped layout')
+    parser.add_argument('--check', action='store_true', help='only report whether the snapshot is current')
+    args = parser.parse_args()
+    output = args.output or args.data / (MAPPED_FILE if args.mapped else SNAPSHOT_FILE)
+    if args.mapped:
+        from .mapped_snapshot import load_mapped_snapshot as load, write_mapped_snapshot as write
+    else:
+        load, write = load_snapshot, write_snapshot
+
+    if args.check:
+        current = load(output, args.data) is not None
+        print(f"{output}: {'up to date' if current else 'missing or stale'}")
+        sys.exit(0 if current else 1)
+
+    started = time.perf_counter()
+    index = InventoryIndex(args.data)
+    if index.load_errors:
+        print(f"Not writing a snapshot, the index has load errors: {index.load_errors}", file=sys.stderr)
+        sys.exit(1)
+    write(index, output)
+    print(f"Wrote {output} ({output.stat().st_size / 2**20:.1f} MB, index {index.version}) "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -26,7 +26,10 @@ class LanguageManager:
                 "new_trucks": "New Trucks",
                 "used_trucks": "Used Trucks",
                 "financing": "Financing Options",
-                "contact": "Contact Us"
+                "contact": "Contact Us",
+                "fallback_intro": "Our assistant is briefly unavailable, but here is what matches your question:",
+                "fallback_no_results": "Our assistant is briefly unavailable. Please try again in a moment, or reach our team directly:",
+                "view_details": "View Details"
             },
             "es": {
                 "welcome": "¡Bienvenido a Stephex Horse Trucks! ¿Cómo puedo ayudarte hoy?",
@@ -43,7 +46,10 @@ class LanguageManager:
                 "new_trucks": "Camiones Nuevos",
                 "used_trucks": "Camiones Usados",
                 "financing": "Opciones de Financiamiento",
-                "contact": "Contáctanos"
+                "contact": "Contáctanos",
+                "fallback_intro": "Nuestro asistente no está disponible en este momento, pero esto es lo que coincide con tu pregunta:",
+                "fallback_no_results": "Nuestro asistente no está disponible en este momento. Inténtalo de nuevo en unos instantes o contacta directamente con nuestro equipo:",
+                "view_details": "Ver Detalles"
             },
             "fr": {
                 "welcome": "Bienvenue chez Stephex Horse Trucks! Comment puis-je vous aider aujourd'hui?",
@@ -60,7 +66,10 @@ class LanguageManager:
                 "new_trucks": "Nouveaux Camions",
                 "used_trucks": "Camions d'Occasion",
                 "financing": "Options de Financement",
-                "contact": "Nous Contacter"
+                "contact": "Nous Contacter",
+                "fallback_intro": "Notre assistant est momentanément indisponible, mais voici ce qui correspond à votre question :",
+                "fallback_no_results": "Notre assistant est momentanément indisponible. Réessayez dans un instant ou contactez directement notre équipe :",
+                "view_details": "Voir les Détails"
             },
             "it": {
                 "welcome": "Benvenuto da Stephex Horse Trucks! Come posso aiutarti oggi?",
@@ -77,7 +86,10 @@ class LanguageManager:
                 "new_trucks": "Camion Nuovi",
                 "used_trucks": "Camion Usati",
                 "financing": "Opzioni di Finanziamento",
-                "contact": "Contattaci"
+                "contact": "Contattaci",
+                "fallback_intro": "Il nostro assistente è momentaneamente non disponibile, ma ecco cosa corrisponde alla tua domanda:",
+                "fallback_no_results": "Il nostro assistente è momentaneamente non disponibile. Riprova tra poco o contatta direttamente il nostro team:",
+                "view_details": "Vedi Dettagli"
             },
             "nl": {
                 "welcome": "Welkom bij Stephex Horse Trucks! Hoe kan ik je vandaag helpen?",
@@ -94,7 +106,10 @@ class LanguageManager:
                 "new_trucks": "Nieuwe Vrachtwagens",
                 "used_trucks": "Gebruikte Vrachtwagens",
                 "financing": "Financieringsopties",
-                "contact": "Contact"
+                "contact": "Contact",
+                "fallback_intro": "Onze assistent is even niet beschikbaar, maar dit past bij je vraag:",
+                "fallback_no_results": "Onze assistent is even niet beschikbaar. Probeer het zo opnieuw of neem direct contact op met ons team:",
+                "view_details": "Bekijk Details"
             }
         }
     
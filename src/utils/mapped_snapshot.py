@@ -0,0 +1,589 @@
+"""
+Memory-mapped knowledge snapshot: every index and record column stored as a
+fixed-width array or a packed string heap in one file that worker processes
+map read-only. The OS page cache keeps a single copy per host, and a worker
+only decodes the strings and rows a query actually touches.
+
+The file is a magic, a length-prefixed JSON header (the pickle snapshot's
+validity fields plus the array table and the small tables such as dealers)
+and the arrays, each 64-byte aligned.
+
+    python -m src.utils.knowledge_snapshot --mapped
+"""
+import json
+import mmap
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from ..core.logger import app_logger
+from ..core.models import Dealer
+from .bm25_index import BM25Index
+from .dealer_directory import DealerDirectory
+from .facet_index import vehicle_brand, vehicle_make, weight_class, parse_weight
+from .fuzzy_match import TrigramIndex
+from .inventory_index import InventoryIndex, DATA_PATH
+from .knowledge_snapshot import HEADER_LENGTH, atomic_write, code_hash, read_header, source_fingerprints
+from .semantic_index import SemanticIndex
+from .vehicle_records import VehicleRecord
+
+MAGIC = b'TRUCKMM\x00'
+# Bump when the array layout changes; code changes are caught by code_hash()
+MAPPED_FORMAT = 1
+ALIGNMENT = 64
+NULL_INT = -2 ** 63
+INT_FIELDS = ('price', 'horses', 'year', 'mileage')
+TUPLE_FIELDS = ('sources', 'aliases')
+TEXT_FIELDS = tuple(name for name in VehicleRecord.__dataclass_fields__
+                    if name not in INT_FIELDS + TUPLE_FIELDS)
+DOC_TYPES = ['truck', 'dealer', 'contact']
+# Facets stored as codes into a small per-facet vocabulary kept in the header
+CODED_FACETS = ('condition', 'brand', 'make', 'chassis')
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class StringHeap:
+    """
+    Strings packed as one UTF-8 blob plus an offsets array, decoded on
+    access. With a slots array (open addressing on crc32) it also finds the
+    position of a string without any per-process dict.
+    """
+
+    def __init__(self, blob, offsets, slots=None):
+        # memoryviews index to plain ints and bytes, several times faster than NumPy scalars
+        self.blob = memoryview(blob)
+        self.offsets = memoryview(offsets)
+        self.slots = memoryview(slots) if slots is not None else None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position: int) -> str:
+        return str(self.blob[self.offsets[position]:self.offsets[position + 1]], 'utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[position] for position in range(len(self)))
+
+    def position(self, value: str) -> int:
+        """Position of a string, -1 if absent"""
+        encoded = value.encode('utf-8')
+        slots, offsets = self.slots, self.offsets
+        mask = len(slots) - 1
+        slot = zlib.crc32(encoded) & mask
+        while True:
+            position = slots[slot]
+            if position < 0 or self.blob[offsets[position]:offsets[position + 1]] == encoded:
+                return position
+            slot = (slot + 1) & mask
+
+
+class Positions:
+    """Read-only str -> position mapping over a hashed StringHeap, in place of a dict"""
+
+    def __init__(self, heap: StringHeap):
+        self.heap = heap
+
+    def __contains__(self, value) -> bool:
+        return isinstance(value, str) and self.heap.position(value) >= 0
+
+    def __getitem__(self, value: str) -> int:
+        position = self.heap.position(value)
+        if position < 0:
+            raise KeyError(value)
+        return position
+
+    def get(self, value: str, default=None):
+        position = self.heap.position(value)
+        return default if position < 0 else position
+
+
+class IntColumn:
+    """Fixed-width integer array read back as Python ints"""
+
+    def __init__(self, array):
+        self.array = array
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __getitem__(self, position: int) -> int:
+        return int(self.array[position])
+
+
+class KeyedLists:
+    """String key -> slice of one or more value arrays (CSR layout), in place of a dict of lists"""
+
+    def __init__(self, keys: StringHeap, offsets, *columns):
+        self.keys = keys
+        self.offsets = offsets
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self.keys.position(key) >= 0
+
+    def get(self, key: str, default=None):
+        position = self.keys.position(key)
+        if position < 0:
+            return default
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        if len(self.columns) == 1:
+            return self.columns[0][start:end].tolist()
+        return list(zip(*(column[start:end].tolist() for column in self.columns)))
+
+
+class BucketTable:
+    """LSH bucket code -> passage ids, as sorted codes plus CSR slices"""
+
+    def __init__(self, codes, offsets, ids):
+        self.codes = codes
+        self.offsets = offsets
+        self.ids = ids
+
+    def get(self, code: int, default=None):
+        import numpy as np
+        position = int(np.searchsorted(self.codes, code))
+        if position < len(self.codes) and self.codes[position] == code:
+            return self.ids[self.offsets[position]:self.offsets[position + 1]]
+        return default
+
+
+class SnapshotWriter:
+    """Collects named arrays and string heaps, then lays them out in one file"""
+
+    def __init__(self):
+        self.arrays: Dict[str, Any] = {}
+
+    def array(self, name: str, values, dtype):
+        import numpy as np
+        self.arrays[name] = np.ascontiguousarray(np.asarray(values, dtype=dtype))
+
+    def strings(self, name: str, values: Iterable[str], hashed: bool = False):
+        import numpy as np
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        self.arrays[f'{name}.blob'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        self.arrays[f'{name}.offsets'] = offsets
+        if hashed:
+            # Load factor <= 0.5 keeps probe sequences short
+            size = 1 << max(3, (2 * len(encoded) - 1).bit_length())
+            slots, mask = [-1] * size, size - 1
+            for position, value in enumerate(encoded):
+                slot = zlib.crc32(value) & mask
+                while slots[slot] != -1:
+                    slot = (slot + 1) & mask
+                slots[slot] = position
+            self.arrays[f'{name}.slots'] = np.array(slots, dtype=np.int64)
+
+    def lists(self, name: str, lists: Iterable[Iterable[Any]], dtype):
+        """CSR layout of a sequence of lists: {name}.offsets and {name}.values"""
+        offsets, values = [0], []
+        for entries in lists:
+            values.extend(entries)
+            offsets.append(len(values))
+        self.array(f'{name}.offsets', offsets, 'int64')
+        self.array(f'{name}.values', values, dtype)
+
+    def write(self, path: Path, header: Dict[str, Any]):
+        table, offset = {}, 0
+        for name, array in self.arrays.items():
+            offset = _aligned(offset)
+            table[name] = [array.dtype.str, list(array.shape), offset]
+            offset += array.nbytes
+        encoded = json.dumps(dict(header, arrays=table)).encode('utf-8')
+        data_start = _aligned(len(MAGIC) + HEADER_LENGTH.size + len(encoded))
+
+        def write_layout(out):
+            out.write(MAGIC)
+            out.write(HEADER_LENGTH.pack(len(encoded)))
+            out.write(encoded)
+            for name, array in self.arrays.items():
+                out.write(b'\0' * (data_start + table[name][2] - out.tell()))
+                out.write(array.tobytes())
+        atomic_write(path, write_layout)
+
+
+class SnapshotReader:
+    """Zero-copy NumPy views into a mapped snapshot file"""
+
+    def __init__(self, buffer: mmap.mmap, header: Dict[str, Any], data_start: int):
+        self.buffer = buffer
+        self.header = header
+        self.data_start = data_start
+
+    def array(self, name: str):
+        import numpy as np
+        dtype, shape, offset = self.header['arrays'][name]
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape)) if shape else 1
+        return np.frombuffer(self.buffer, dtype=dtype, count=count, offset=self.data_start + offset).reshape(shape)
+
+    def strings(self, name: str) -> StringHeap:
+        slots = self.array(f'{name}.slots') if f'{name}.slots' in self.header['arrays'] else None
+        return StringHeap(self.array(f'{name}.blob'), self.array(f'{name}.offsets'), slots)
+
+
+class MappedVehicles:
+    """Read-only mapping of vehicle id -> VehicleRecord, rebuilt from the columns on access"""
+
+    def __init__(self, reader: SnapshotReader, ids: StringHeap):
+        self.ids = ids
+        self.text = reader.strings('text')
+        self.columns = {name: memoryview(reader.array(f'vehicle.{name}')) for name in TEXT_FIELDS + INT_FIELDS + TUPLE_FIELDS}
+
+    def record(self, position: int) -> VehicleRecord:
+        values: Dict[str, Any] = {}
+        for name in TEXT_FIELDS:
+            text_id = self.columns[name][position]
+            values[name] = self.text[text_id] if text_id >= 0 else None
+        for name in INT_FIELDS:
+            value = self.columns[name][position]
+            values[name] = None if value == NULL_INT else value
+        for name in TUPLE_FIELDS:
+            values[name] = tuple(json.loads(self.text[self.columns[name][position]]))
+        return VehicleRecord(**values)
+
+    def __getitem__(self, vehicle_id: str) -> VehicleRecord:
+        position = self.ids.position(vehicle_id)
+        if position < 0:
+            raise KeyError(vehicle_id)
+        return self.record(position)
+
+    def get(self, vehicle_id: str, default=None) -> Optional[VehicleRecord]:
+        position = self.ids.position(vehicle_id)
+        return default if position < 0 else self.record(position)
+
+    def __contains__(self, vehicle_id) -> bool:
+        return isinstance(vehicle_id, str) and self.ids.position(vehicle_id) >= 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def values(self) -> Iterator[VehicleRecord]:
+        return (self.record(position) for position in range(len(self.ids)))
+
+    def items(self) -> Iterator:
+        return ((self.ids[position], self.record(position)) for position in range(len(self.ids)))
+
+
+class MappedDocuments:
+    """Read-only mapping of document key -> document dict"""
+
+    def __init__(self, reader: SnapshotReader, keys: StringHeap):
+        self.keys = keys
+        self.text = reader.strings('text')
+        self.types = memoryview(reader.array('document.type'))
+        self.refs = memoryview(reader.array('document.ref'))
+        self.titles = memoryview(reader.array('document.title'))
+        self.contents = memoryview(reader.array('document.content'))
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        position = self.keys.position(key)
+        if position < 0:
+            raise KeyError(key)
+        doc_type = DOC_TYPES[self.types[position]]
+        ref = self.text[self.refs[position]]
+        document = {'type': doc_type, 'ref': int(ref) if doc_type == 'dealer' else ref,
+                    'title': self.text[self.titles[position]]}
+        content = self.contents[position]
+        if content >= 0:
+            document['content'] = self.text[content]
+        return document
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self.keys.position(key) >= 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class MappedBM25(BM25Index):
+    """BM25Index whose document keys and posting lists live in the mapped file"""
+
+    def __init__(self, reader: SnapshotReader):
+        super().__init__()
+        self.keys = reader.strings('bm25.keys')
+        self.postings = KeyedLists(reader.strings('bm25.terms'), reader.array('bm25.postings.offsets'),
+                                   reader.array('bm25.postings.docs'), reader.array('bm25.postings.weights'))
+
+    def matrix(self):
+        """Sparse (terms x documents) matrix straight from the posting arrays"""
+        if self._matrix is None:
+            from scipy.sparse import csr_matrix
+            self.vocabulary = {term: row for row, term in enumerate(self.postings.keys)}
+            offsets, (docs, weights) = self.postings.offsets, self.postings.columns
+            self._matrix = csr_matrix((weights.astype('float32'), docs, offsets),
+                                      shape=(len(self.vocabulary), len(self.keys)))
+        return self._matrix
+
+
+class MappedFacets:
+    """
+    The FacetIndex interface over per-vehicle facet columns: each filter is a
+    vectorized comparison, packed into the same bitmap ints at query time
+    """
+
+    def __init__(self, reader: SnapshotReader, ids: StringHeap):
+        import numpy as np
+        self.ids = ids
+        self.positions = Positions(ids)
+        self.codes = {facet: reader.array(f'facet.{facet}') for facet in CODED_FACETS}
+        self.horses = reader.array('facet.horses')
+        self.ranges = {facet: reader.array(f'facet.{facet}') for facet in ('year', 'weight')}
+        vocabulary = reader.header['facet_values']
+        self.values: Dict[str, Dict[Any, int]] = {
+            facet: {value: code for code, value in enumerate(vocabulary[facet])} for facet in CODED_FACETS
+        }
+        self.values['horses'] = {int(horses): horses for horses in np.unique(self.horses[self.horses != NULL_INT])}
+
+    @property
+    def all(self) -> int:
+        return (1 << len(self.ids)) - 1
+
+    def _range(self, facet: str, low: Optional[float], high: Optional[float]):
+        import numpy as np
+        column = self.ranges[facet]
+        mask = ~np.isnan(column)
+        if low is not None:
+            mask &= column >= low
+        if high is not None:
+            mask &= column <= high
+        return mask
+
+    def select(self, facets: Dict[str, Any]) -> Optional[int]:
+        """AND together every requested facet; None when the query has no facet constraints"""
+        import numpy as np
+        if not facets:
+            return None
+        mask = np.ones(len(self.ids), dtype=bool)
+        for facet in CODED_FACETS:
+            if facet in facets:
+                codes = [self.values[facet][value] for value in facets[facet] if value in self.values[facet]]
+                mask &= np.isin(self.codes[facet], codes)
+        if 'horses' in facets:
+            exact = self.horses == facets['horses']
+            if not (exact & mask).any():
+                # Nobody has exactly that many stalls: offer the next sizes up instead
+                exact = (self.horses >= facets['horses']) & (self.horses != NULL_INT)
+            mask &= exact
+        if 'year_min' in facets or 'year_max' in facets:
+            years = self._range('year', facets.get('year_min'), facets.get('year_max'))
+            if facets.get('year_allow_unknown'):
+                years |= np.isnan(self.ranges['year'])
+            mask &= years
+        if 'weight_min' in facets or 'weight_max' in facets:
+            mask &= self._range('weight', facets.get('weight_min'), facets.get('weight_max'))
+        return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+    def contains(self, bitmap: Optional[int], vehicle_id: str) -> bool:
+        """True if the vehicle is in the bitmap; a None bitmap matches everything"""
+        return bitmap is None or bool(bitmap >> self.positions[vehicle_id] & 1)
+
+    def to_mask(self, bitmap: Optional[int]):
+        """Boolean NumPy array over vehicle positions, for the batch search path"""
+        import numpy as np
+        if bitmap is None:
+            return np.ones(len(self.ids), dtype=bool)
+        raw = np.frombuffer(bitmap.to_bytes(len(self.ids) // 8 + 1, 'little'), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder='little')[:len(self.ids)].astype(bool)
+
+    def selected_ids(self, bitmap: int) -> Iterator[str]:
+        import numpy as np
+        return (self.ids[position] for position in np.flatnonzero(self.to_mask(bitmap)).tolist())
+
+
+class MappedNameIndex(TrigramIndex):
+    """TrigramIndex whose vocabulary, trigram postings and word -> vehicle lists are mapped arrays"""
+
+    def __init__(self, reader: SnapshotReader, ids: StringHeap):
+        super().__init__()
+        self.vehicle_ids = ids
+        self.words = reader.strings('name.words')
+        self.word_ids = Positions(self.words)
+        self.word_trigrams = IntColumn(reader.array('name.word_trigrams'))
+        self.postings = KeyedLists(reader.strings('name.trigrams'), reader.array('name.postings.offsets'),
+                                   reader.array('name.postings.values'))
+        self.key_offsets = reader.array('name.keys.offsets')
+        self.key_positions = reader.array('name.keys.values')
+
+    def keys_for(self, word: str) -> Iterable[str]:
+        word_id = self.word_ids[word]
+        positions = self.key_positions[self.key_offsets[word_id]:self.key_offsets[word_id + 1]]
+        return [self.vehicle_ids[position] for position in positions.tolist()]
+
+
+class MappedSemanticIndex(SemanticIndex):
+    """SemanticIndex with its embeddings, LSA components and LSH tables mapped from the file"""
+
+    def __init__(self, reader: SnapshotReader):
+        super().__init__()
+        if not reader.header['semantic']:
+            return
+        self.keys = reader.strings('semantic.keys')
+        for name in ('passage_keys', 'features', 'idf', 'components', 'embeddings'):
+            setattr(self, name, reader.array(f'semantic.{name}'))
+        if reader.header['semantic_tables']:
+            self.hyperplanes = reader.array('semantic.hyperplanes')
+            self.tables = [
+                BucketTable(reader.array(f'semantic.table{table}.codes'), reader.array(f'semantic.table{table}.offsets'),
+                            reader.array(f'semantic.table{table}.ids'))
+                for table in range(reader.header['semantic_tables'])
+            ]
+
+
+class MappedInventoryIndex:
+    """
+    Read-only InventoryIndex served from a mapped snapshot: the same search
+    attributes, with nothing parsed or copied into the worker's heap
+    """
+
+    def __init__(self, buffer: mmap.mmap, header: Dict[str, Any], data_start: int, data_path: Path):
+        reader = SnapshotReader(buffer, header, data_start)
+        # The mapping is released with the last view into it, once no request still reads this index
+        self._buffer = buffer
+        self.data_path = Path(data_path)
+        self.version = header['version']
+        self.fingerprints = header['fingerprints']
+        self.load_errors: List[str] = []
+        self.contact_info = header['contact_info']
+        self.dealers: Dict[str, str] = header['dealers']
+        self.dealer_directory = DealerDirectory(Dealer(**dealer) for dealer in header['dealer_records'])
+        ids = reader.strings('vehicle.ids')
+        self.vehicles = MappedVehicles(reader, ids)
+        self.bm25 = MappedBM25(reader)
+        self.documents = MappedDocuments(reader, self.bm25.keys)
+        self.facets = MappedFacets(reader, ids)
+        self.name_index = MappedNameIndex(reader, ids)
+        self.semantic = MappedSemanticIndex(reader)
+
+    def knowledge_base(self) -> Dict[str, Any]:
+        """Knowledge base dict for the AI service context; inventory rows stay in the mapped file"""
+        return {'contact_info': self.contact_info, 'dealers': self.dealers, 'vehicle_count': len(self.vehicles)}
+
+
+def write_mapped_snapshot(index: InventoryIndex, path: Path) -> Path:
+    """Lay an InventoryIndex out as mappable arrays and write it atomically"""
+    import numpy as np
+    writer = SnapshotWriter()
+    text: Dict[str, int] = {}
+
+    def text_id(value: Optional[str]) -> int:
+        # Repeated values (brands, conditions, chassis) are stored once
+        return -1 if value is None else text.setdefault(str(value), len(text))
+
+    vehicles = list(index.vehicles.values())
+    writer.strings('vehicle.ids', [vehicle.id for vehicle in vehicles], hashed=True)
+    for name in TEXT_FIELDS:
+        writer.array(f'vehicle.{name}', [text_id(getattr(vehicle, name)) for vehicle in vehicles], 'int64')
+    for name in INT_FIELDS:
+        writer.array(f'vehicle.{name}', [NULL_INT if getattr(vehicle, name) is None else getattr(vehicle, name)
+                                         for vehicle in vehicles], 'int64')
+    for name in TUPLE_FIELDS:
+        writer.array(f'vehicle.{name}', [text_id(json.dumps(list(getattr(vehicle, name)))) for vehicle in vehicles], 'int64')
+
+    facet_values: Dict[str, List[str]] = {facet: [] for facet in CODED_FACETS}
+    facet_codes: Dict[str, Dict[str, int]] = {facet: {} for facet in CODED_FACETS}
+    columns: Dict[str, List[int]] = {facet: [] for facet in CODED_FACETS}
+    for vehicle in vehicles:
+        for facet, value in (('condition', 'used' if vehicle.is_used else 'new'), ('brand', vehicle_brand(vehicle)),
+                             ('make', vehicle_make(vehicle)), ('chassis', (vehicle.chassis or '').lower() or None)):
+            if value is not None and value not in facet_codes[facet]:
+                facet_codes[facet][value] = len(facet_values[facet])
+                facet_values[facet].append(value)
+            columns[facet].append(-1 if value is None else facet_codes[facet][value])
+    for facet in CODED_FACETS:
+        writer.array(f'facet.{facet}', columns[facet], 'int32')
+    writer.array('facet.horses', [NULL_INT if vehicle.horses is None else vehicle.horses for vehicle in vehicles], 'int64')
+    writer.array('facet.year', [float(vehicle.year) if vehicle.year else np.nan for vehicle in vehicles], 'float64')
+    writer.array('facet.weight', [np.nan if (tonnes := weight_class(parse_weight(vehicle.weight))) is None else tonnes
+                                  for vehicle in vehicles], 'float64')
+
+    bm25 = index.bm25
+    writer.strings('bm25.keys', bm25.keys, hashed=True)
+    writer.strings('bm25.terms', bm25.postings, hashed=True)
+    writer.array('bm25.postings.offsets', np.cumsum([0] + [len(entries) for entries in bm25.postings.values()]), 'int64')
+    writer.array('bm25.postings.docs', [doc_idx for entries in bm25.postings.values() for doc_idx, _ in entries], 'int32')
+    # float64 so scores (and so rankings) match the in-memory index exactly
+    writer.array('bm25.postings.weights', [weight for entries in bm25.postings.values() for _, weight in entries], 'float64')
+
+    documents = [index.documents[key] for key in bm25.keys]
+    writer.array('document.type', [DOC_TYPES.index(document['type']) for document in documents], 'uint8')
+    writer.array('document.ref', [text_id(str(document['ref'])) for document in documents], 'int64')
+    writer.array('document.title', [text_id(document['title']) for document in documents], 'int64')
+    writer.array('document.content', [text_id(document.get('content')) for document in documents], 'int64')
+
+    names = index.name_index
+    positions = {vehicle.id: position for position, vehicle in enumerate(vehicles)}
+    writer.strings('name.words', names.words, hashed=True)
+    writer.array('name.word_trigrams', names.word_trigrams, 'int32')
+    writer.strings('name.trigrams', names.postings, hashed=True)
+    writer.lists('name.postings', names.postings.values(), 'int32')
+    writer.lists('name.keys', ([positions[key] for key in keys] for keys in names.word_keys), 'int32')
+
+    semantic = index.semantic
+    if semantic.components is not None:
+        writer.strings('semantic.keys', semantic.keys)
+        for name in ('passage_keys', 'features', 'idf', 'components', 'embeddings'):
+            value = getattr(semantic, name)
+            writer.array(f'semantic.{name}', value, value.dtype)
+        if semantic.tables:
+            writer.array('semantic.hyperplanes', semantic.hyperplanes, semantic.hyperplanes.dtype)
+        for number, table in enumerate(semantic.tables):
+            codes = sorted(table)
+            writer.array(f'semantic.table{number}.codes', codes, 'int64')
+            writer.array(f'semantic.table{number}.offsets', np.cumsum([0] + [len(table[code]) for code in codes]), 'int64')
+            writer.array(f'semantic.table{number}.ids', np.concatenate([table[code] for code in codes]), 'int64')
+
+    # Written last: every text_id() above has been assigned by now
+    writer.strings('text', text)
+    writer.write(path, {
+        'format': MAPPED_FORMAT,
+        'code': code_hash(),
+        'version': index.version,
+        'fingerprints': index.fingerprints,
+        'contact_info': index.contact_info,
+        'dealers': index.dealers,
+        'dealer_records': [dealer.model_dump() for dealer in index.dealer_directory.dealers],
+        'facet_values': facet_values,
+        'semantic': semantic.components is not None,
+        'semantic_tables': len(semantic.tables),
+    })
+    return Path(path)
+
+
+def load_mapped_snapshot(path: Path, data_path: Path = DATA_PATH) -> Optional[MappedInventoryIndex]:
+    """Map the snapshot if it was built from the current data/ by the current code, else None"""
+    path = Path(path)
+    header = read_header(path, magic=MAGIC)
+    if header is None:
+        return None
+    if header.get('format') != MAPPED_FORMAT or header.get('code') != code_hash():
+        app_logger.info(f"Mapped snapshot {path.name} was built by other code, rebuilding")
+        return None
+    if header.get('fingerprints') != source_fingerprints(data_path):
+        app_logger.info(f"Mapped snapshot {path.name} is out of date with {data_path}, rebuilding")
+        return None
+
+    try:
+        with open(path, 'rb') as snapshot:
+            snapshot.seek(len(MAGIC))
+            (length,) = HEADER_LENGTH.unpack(snapshot.read(HEADER_LENGTH.size))
+            # The mapping stays valid after the file is closed, or replaced by a newer snapshot
+            buffer = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        index = MappedInventoryIndex(buffer, header, _aligned(len(MAGIC) + HEADER_LENGTH.size + length), data_path)
+    except Exception as e:
+        app_logger.error(f"Error mapping knowledge snapshot {path}: {e}")
+        return None
+    app_logger.info(f"Inventory index {index.version} mapped from {path.name}")
+    return index
@@ -0,0 +1,293 @@
+"""
+The invariant part of the Gemini prompt (persona, answer format, booking
+rules), compiled once per language into a system instruction and optionally
+stored upstream as cached content, so each turn only sends the retrieved
+context, the conversation and the message
+"""
+import hashlib
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import google.generativeai as genai
+from ..config.settings import get_settings
+from ..core.logger import app_logger
+from .boilerplate import estimate_tokens
+
+settings = get_settings()
+
+# Language-specific instructions (expanded)
+LANGUAGE_INSTRUCTIONS = {
+    "en": "Respond in English",
+    "es": "Responde en español",
+    "fr": "Répondez en français",
+    "it": "Rispondi in italiano",
+    "nl": "Antwoord in het Nederlands",
+    "da": "Svar på dansk",  # Danish
+    "de": "Antworte auf Deutsch",  # German
+    "sv": "Svara på svenska",  # Swedish
+    "no": "Svar på norsk",  # Norwegian
+}
+
+# Cached content is renewed this long before it expires upstream
+RENEW_MARGIN = timedelta(seconds=60)
+
+SYSTEM_PROMPT = """\
+You are Stephanie, an exceptionally intelligent and knowledgeable sales assistant at Stephex Horse Trucks. You have deep expertise in horse transportation and can understand even vague or poorly worded questions.
+
+Your intelligence:
+- SUPER INTELLIGENT: Understand vague, incomplete, or poorly worded questions
+- READ BETWEEN THE LINES: Infer what users really mean, even if they don't express it clearly
+- CONTEXT MASTER: Remember everything from the conversation and build on it intelligently
+- PROBLEM SOLVER: Anticipate needs and provide solutions before being asked
+- EXPERT INTERPRETER: Turn confusing questions into clear, helpful answers
+- BOOKING GENIUS: Make appointment scheduling effortless, even with minimal info
+
+Your personality:
+- Friendly and approachable, like chatting with a knowledgeable friend
+- Match the user's energy level - if they're casual, be casual back
+- Warm but not fake, genuine but not robotic
+- EXTREMELY CONCISE - keep responses SHORT and to the point
+- Maximum 2-3 sentences unless showing truck listings
+- No fluff, no unnecessary words
+- Show some personality - be human, not a corporate bot
+- NEVER start with greetings - go directly to answering the question
+
+Guidelines:
+- CRITICAL: {language_instruction} - DO NOT use any other language
+- NEVER greet the customer - no "Hi", "Hello", "Hey there", "What's up" - jump straight into answering
+- Start responses directly with the answer or information requested
+- Mirror the user's communication style - if they're casual, be casual; if formal, be professional
+- Avoid corporate speak but stay professional
+- Be genuinely helpful with a touch of personality
+- Show you're a real person who happens to know about trucks
+
+- SUPER INTELLIGENT RESPONSES:
+  * INTERPRET VAGUE QUESTIONS: "I need something for my horses" → Understand they want horse trucks, ask smart follow-up questions
+  * DECODE UNCLEAR REQUESTS: "What do you have?" → Intelligently determine if they want trucks, pricing, or company info based on context
+  * ANTICIPATE NEEDS: If someone asks about 2-horse trucks, proactively mention related accessories, financing, delivery
+  * EDUCATIONAL INTELLIGENCE: Adjust explanation depth based on user's apparent knowledge level
+  * CONTEXT BUILDING: Remember every detail mentioned and build comprehensive understanding
+  * SMART ASSUMPTIONS: If user says "I have 3 horses" → Suggest 4+ horse trucks for flexibility
+  * PROBLEM SOLVING: If user mentions budget constraints, suggest used trucks or financing options
+  * BOOKING INTELLIGENCE: Turn any scheduling hint into smooth appointment booking
+
+- CRITICAL FORMAT: For each truck/item, use this EXACT format:
+**ITEM NAME HERE**
+[Brief description of what this is - truck specs, condition, purpose]
+Image: [exact_image_url_here]
+Features: [features_here]
+<a href='[exact_detail_url_here]'>View Details</a>
+
+- DESCRIPTION RULES:
+  * For trucks: Include year, mileage, condition, horse capacity, and key selling points
+  * For tackboxes: Explain it's storage equipment, not a truck, but useful for horse transport needs
+  * Example: "This 2018 Volvo FH 540 is a premium 8-horse truck with 180,000km, featuring luxury living quarters and professional horse transport capabilities."
+
+- NEVER leave truck names blank - always show the full truck name
+- NEVER use generic images - use the exact Image URLs provided
+- NEVER skip any truck information - show ALL trucks found
+- For pricing questions, always try get book an appointment for user to get an offer
+- Example format:
+**STX 2 HORSE FORD TRANSIT**
+This 2022 Ford Transit is a compact 2-horse truck with 91,000km, perfect for smaller operations or personal use.
+Image: https://stephexhorsetrucks.com/wp-content/uploads/2025/09/STX-Ford-2H-Second-Hand-26-720x460.jpg
+Features: Leather seats with armrests, Radio/Bluetooth/GPS, Electric windows, Air conditioning, LED lighting, Rubber flooring
+<a href='https://stephexhorsetrucks.com/vehicles/stx-2-horse-ford-transit/'>View Details</a>
+
+- Use your intelligence to provide the best recommendations
+
+- RESPONSE LENGTH RULES:
+  * MAXIMUM 2-3 sentences for most responses
+  * NO long explanations unless specifically asked
+  * NO unnecessary pleasantries or filler words
+  * Get straight to the point
+  * Example: "What are horse trucks?" → "Specialized vehicles for transporting horses safely with padded interiors and ventilation."
+  * Example: "Price?" → "Prices vary by model. Want to schedule a call for a quote?"
+
+- BOOKING RULES - ABSOLUTELY CRITICAL - FOLLOW EXACTLY:
+  * STEP 1: Say "Perfect!" or "Got it!"
+  * STEP 2: Write EXACTLY this: BOOKING_COMPLETE: truck_type|date_time|email
+  * STEP 3: STOP - write nothing else, no appointment details, no calendar links, NOTHING
+  * Example response: "Perfect!\nBOOKING_COMPLETE: general consultation|tomorrow 4am london|rajacharya3242@gmail.com"
+  * FORBIDDEN: Any text after BOOKING_COMPLETE
+  * FORBIDDEN: "📋 Appointment Details" or any appointment formatting
+  * FORBIDDEN: Calendar links or confirmation messages
+  * The system will handle everything after BOOKING_COMPLETE
+  * EMAIL INTELLIGENCE: Recognize email formats even with typos or unusual formats
+  * CRITICAL: NEVER create appointment confirmations yourself
+  * NEVER show calendar links or appointment details - use BOOKING_COMPLETE only
+  * NEVER convert times (1pm stays 1pm, don't make it 2pm)
+  * NEVER add specific dates (tomorrow stays tomorrow, don't make it September 23)
+  * The system handles ALL appointment processing after BOOKING_COMPLETE
+
+- ABSOLUTELY FORBIDDEN (NEVER USE):
+  * ANY text after BOOKING_COMPLETE
+  * "📋 Appointment Details" or appointment formatting
+  * "Your appointment is updated" or similar phrases
+  * Calendar links or confirmation messages
+  * "Date & Time:" or "Contact:" or "Service:" formatting
+  * ANY appointment details - the system handles this
+  * ONLY allowed: "Perfect!" then BOOKING_COMPLETE then STOP
+
+- EXACT BOOKING FORMAT (COPY THIS):
+  User: "book appointment tomorrow 4am london rajacharya3242@gmail.com"
+  Your response: "Perfect!\nBOOKING_COMPLETE: general consultation|tomorrow 4am london|rajacharya3242@gmail.com"
+
+  THAT'S IT - NO MORE TEXT ALLOWED AFTER BOOKING_COMPLETE
+
+  * WRONG: Adding appointment details, calendar links, confirmations
+  * RIGHT: Just "Perfect!" + BOOKING_COMPLETE + STOP
+
+USER CONTEXT & INTELLIGENCE:
+- Remember: User's name, email, phone, preferences, budget hints, truck needs
+- Build on: Previous questions, interests shown, appointment history
+- Anticipate: Next logical questions, related needs, follow-up services
+- Context clues: User's language style, urgency level, experience with horses/trucks
+
+"""
+
+
+@lru_cache(maxsize=None)
+def system_instruction(language: str) -> str:
+    """The system instruction for one language, built once per process"""
+    return SYSTEM_PROMPT.format(language_instruction=LANGUAGE_INSTRUCTIONS.get(language, "Respond in English"))
+
+
+@dataclass
+class LocalCachedContent:
+    """What the local stand-in keeps for one cached prompt, shaped like genai.caching.CachedContent"""
+    name: str
+    model: str
+    system_instruction: str
+    expire_time: datetime
+
+
+class LocalContentCache:
+    """
+    Offline stand-in for the Gemini caching API. Entries live in this
+    process and the bound model carries the instruction as a plain system
+    instruction, so prompt caching can be exercised without network access.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, LocalCachedContent] = {}
+
+    def create(self, model: str, system_instruction: str, ttl: timedelta) -> LocalCachedContent:
+        digest = hashlib.sha1(f"{model}\0{system_instruction}".encode('utf-8')).hexdigest()[:16]
+        cached = LocalCachedContent(
+            name=f"cachedContents/local-{digest}",
+            model=model,
+            system_instruction=system_instruction,
+            expire_time=datetime.now(timezone.utc) + ttl,
+        )
+        self.entries[cached.name] = cached
+        return cached
+
+    def bind(self, cached: LocalCachedContent) -> genai.GenerativeModel:
+        if cached.name not in self.entries or cached.expire_time <= datetime.now(timezone.utc):
+            raise KeyError(f"Cached content {cached.name} expired or was deleted")
+        return genai.GenerativeModel(cached.model, system_instruction=cached.system_instruction)
+
+
+class GeminiContentCache:
+    """Server-side cached content through genai.caching"""
+
+    def create(self, model: str, system_instruction: str, ttl: timedelta):
+        return genai.caching.CachedContent.create(
+            model=f"models/{model}", display_name="stephanie-system-prompt",
+            system_instruction=system_instruction, ttl=ttl,
+        )
+
+    def bind(self, cached) -> genai.GenerativeModel:
+        return genai.GenerativeModel.from_cached_content(cached)
+
+
+class _Build:
+    """One compile of a language's model that concurrent callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[Tuple[genai.GenerativeModel, Optional[datetime]]] = None
+        self.error: Optional[BaseException] = None
+
+
+class PromptCache:
+    """
+    One model per language with the system instruction compiled in. In
+    'cached_content' and 'local' mode the instruction is stored in the
+    content cache and renewed before it expires; if the upstream cache
+    refuses it (e.g. below the minimum cacheable size) the model falls back
+    to a plain system instruction until the next renewal.
+    """
+
+    def __init__(self, model_name: str, mode: str = "system_instruction", ttl: float = 3600):
+        self.model_name = model_name
+        self.mode = mode
+        self.ttl = timedelta(seconds=ttl)
+        self.content_cache = {'cached_content': GeminiContentCache, 'local': LocalContentCache}.get(mode, lambda: None)()
+        self._models: Dict[str, Tuple[genai.GenerativeModel, Optional[datetime]]] = {}
+        self._builds: Dict[str, _Build] = {}
+        self._lock = threading.Lock()
+
+    def model_for(self, language: str) -> genai.GenerativeModel:
+        """
+        The model for language, compiling or renewing its cached prompt when
+        needed. The upstream create runs outside the lock, once per language:
+        concurrent callers wait for it, or keep the previous model while it
+        has not expired yet.
+        """
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._models.get(language)
+            if entry and (entry[1] is None or entry[1] - RENEW_MARGIN > now):
+                return entry[0]
+            build = self._builds.get(language)
+            leader = build is None
+            if leader:
+                build = self._builds[language] = _Build()
+            elif entry and entry[1] > now:
+                # Another caller is renewing it; the current one is still valid
+                return entry[0]
+
+        if not leader:
+            build.done.wait()
+            if build.error is not None:
+                raise build.error
+            return build.entry[0]
+        try:
+            build.entry = self._compile(language)
+        except BaseException as e:
+            build.error = e
+            raise
+        finally:
+            with self._lock:
+                if build.error is None:
+                    self._models[language] = build.entry
+                del self._builds[language]
+            build.done.set()
+        return build.entry[0]
+
+    def _compile(self, language: str) -> Tuple[genai.GenerativeModel, Optional[datetime]]:
+        instruction = system_instruction(language)
+        if self.content_cache is not None:
+            try:
+                cached = self.content_cache.create(self.model_name, instruction, self.ttl)
+                app_logger.info(
+                    f"Cached system prompt for '{language}' as {cached.name} (~{estimate_tokens(instruction)} tokens)"
+                )
+                return self.content_cache.bind(cached), cached.expire_time
+            except Exception as e:
+                app_logger.warning(f"Prompt caching failed for '{language}', sending it as system instruction: {e}")
+                model = genai.GenerativeModel(self.model_name, system_instruction=instruction)
+                return model, datetime.now(timezone.utc) + self.ttl
+        return genai.GenerativeModel(self.model_name, system_instruction=instruction), None
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+# Global prompt cache
+prompt_cache = PromptCache(settings.ai_model, mode=settings.prompt_cache_mode, ttl=settings.prompt_cache_ttl)
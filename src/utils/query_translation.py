@@ -0,0 +1,163 @@
+"""
+Per-language synonym and stemming tables that rewrite Spanish, French,
+Italian and Dutch query terms to the English search vocabulary
+"""
+import re
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from ..config.settings import SUPPORTED_LANGUAGES
+
+# Query term -> canonical English search terms. Inflections are covered by
+# the language's stemmer, so only one form per word is strictly needed;
+# multi-word and elided entries are matched as whole phrases. Canonical terms
+# are the ones the search pipeline keys on: 'used' and 'brand new' for the
+# condition facet, 'horses' and 'tonnes' for the capacity and weight facets,
+# 'under'/'over'/'from' for ranges, and the dealer/company query words.
+SYNONYMS: Dict[str, Dict[str, str]] = {
+    'es': {
+        'camión': 'truck', 'camiones': 'truck', 'vehículo': 'vehicle', 'caballo': 'horses',
+        'usado': 'used', 'usada': 'used', 'de segunda mano': 'used', 'segunda mano': 'used',
+        'de ocasión': 'used', 'seminuevo': 'used', 'nuevo': 'brand new', 'nueva': 'brand new',
+        'disponible': 'available', 'concesionario': 'dealer', 'distribuidor': 'dealer',
+        'contacto': 'contact', 'teléfono': 'phone', 'dirección': 'address', 'oficina': 'office',
+        'dónde': 'where', 'donde': 'where', 'empresa': 'company', 'compañía': 'company', 'historia': 'history',
+        'horario': 'opening hours', 'precio': 'price', 'tonelada': 'tonnes', 'menos de': 'under',
+        'hasta': 'under', 'más de': 'over', 'desde': 'from', 'a partir de': 'from', 'lista': 'list',
+        'recomienda': 'suggest', 'sugerir': 'suggest', 'muéstrame': 'show me', 'enséñame': 'show me',
+        'tengo': 'i have',
+    },
+    'fr': {
+        'camion': 'truck', 'véhicule': 'vehicle', 'cheval': 'horses', 'chevaux': 'horses',
+        "d'occasion": 'used', 'occasion': 'used', 'usagé': 'used', 'seconde main': 'used',
+        'neuf': 'brand new', 'neuve': 'brand new', 'nouveau': 'brand new', 'nouvelle': 'brand new',
+        'disponible': 'available', 'concessionnaire': 'dealer', 'revendeur': 'dealer',
+        'distributeur': 'dealer', 'téléphone': 'phone', 'adresse': 'address', 'bureau': 'office',
+        'où': 'where', 'entreprise': 'company', 'société': 'company', 'histoire': 'history',
+        'horaires': 'opening hours', 'prix': 'price', 'moins de': 'under', "jusqu'à": 'under',
+        'plus de': 'over', 'depuis': 'from', 'à partir de': 'from', 'liste': 'list',
+        'suggérer': 'suggest', 'proposez': 'suggest', 'montrez': 'show', 'montre': 'show',
+        'moi': 'me', "j'ai": 'i have',
+    },
+    'it': {
+        'camion': 'truck', 'veicolo': 'vehicle', 'cavallo': 'horses', 'usato': 'used',
+        'di seconda mano': 'used', 'seconda mano': 'used', "d'occasione": 'used', 'occasione': 'used',
+        'nuovo': 'brand new', 'disponibile': 'available', 'concessionario': 'dealer',
+        'rivenditore': 'dealer', 'contatto': 'contact', 'telefono': 'phone', 'indirizzo': 'address',
+        'ufficio': 'office', 'dove': 'where', 'azienda': 'company', 'società': 'company',
+        'storia': 'history', 'orari': 'opening hours', 'prezzo': 'price', 'tonnellata': 'tonnes',
+        'meno di': 'under', 'fino a': 'under', 'più di': 'over', 'dal': 'from', 'a partire dal': 'from',
+        'elenco': 'list', 'suggerisci': 'suggest', 'consiglia': 'suggest', 'mostrami': 'show me',
+        'fammi vedere': 'show me', 'ho': 'i have',
+    },
+    'nl': {
+        'vrachtwagen': 'truck', 'paardenwagen': 'horsebox truck', 'paardenvrachtwagen': 'horsebox truck',
+        'voertuig': 'vehicle', 'paard': 'horses', 'gebruikt': 'used', 'gebruikte': 'used',
+        'tweedehands': 'used', 'occasie': 'used', 'nieuw': 'brand new', 'beschikbaar': 'available',
+        'beschikbare': 'available', 'verdeler': 'dealer', 'telefoon': 'phone', 'adres': 'address',
+        'kantoor': 'office', 'waar': 'where', 'bedrijf': 'company', 'geschiedenis': 'history',
+        'openingstijden': 'opening hours', 'openingsuren': 'opening hours', 'prijs': 'price',
+        'minder dan': 'under', 'meer dan': 'over', 'vanaf': 'from', 'lijst': 'list',
+        'toon me': 'show me', 'toon': 'show', 'laat zien': 'show', 'ik heb': 'i have',
+    },
+}
+
+WORD_PATTERN = re.compile(r'[^\W\d_]+', re.UNICODE)
+VOWELS = set('aeiou')
+
+
+def fold_accents(text: str) -> str:
+    """'camión' -> 'camion', 'società' -> 'societa'"""
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def _stem_es(word: str) -> str:
+    if len(word) > 4 and word.endswith('es') and word[-3] not in VOWELS:
+        return word[:-2]
+    return word[:-1] if len(word) > 3 and word.endswith('s') else word
+
+
+def _stem_fr(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word[-1] in 'sx' else word
+
+
+def _stem_it(word: str) -> str:
+    # Italian inflects on the final vowel: usato/usati/usata/usate
+    return word[:-1] if len(word) > 4 and word[-1] in VOWELS else word
+
+
+def _stem_nl(word: str) -> str:
+    if len(word) > 4 and word.endswith('s'):
+        word = word[:-1]
+    if len(word) > 5 and word.endswith('en'):
+        word = word[:-2]
+    return word[:-1] if len(word) > 4 and word.endswith('e') else word
+
+
+STEMMERS: Dict[str, Callable[[str], str]] = {'es': _stem_es, 'fr': _stem_fr, 'it': _stem_it, 'nl': _stem_nl}
+
+
+class _LanguageTables:
+    """Phrase table, stemmed word tables and the one regex pass over a query for a set of languages"""
+
+    def __init__(self, languages: Iterable[str]):
+        self.phrases: Dict[str, str] = {}
+        self.words: List[Tuple[Callable[[str], str], Dict[str, str]]] = []
+        for language in languages:
+            stemmer, table = STEMMERS[language], {}
+            for term, canonical in SYNONYMS[language].items():
+                if WORD_PATTERN.fullmatch(term):
+                    table[stemmer(fold_accents(term))] = canonical
+                else:
+                    self.phrases[term] = canonical
+                    self.phrases[fold_accents(term)] = canonical
+            self.words.append((stemmer, table))
+
+        phrases = sorted(self.phrases, key=len, reverse=True)
+        alternatives = [r'(?<!\w)' + re.escape(phrase) + r'(?!\w)' for phrase in phrases]
+        self.pattern = re.compile('|'.join(alternatives + [WORD_PATTERN.pattern]), re.UNICODE)
+
+    def _replace(self, match: 're.Match') -> str:
+        text = match.group(0)
+        canonical = self.phrases.get(text)
+        if canonical is not None:
+            return canonical
+        folded = fold_accents(text)
+        for stemmer, table in self.words:
+            canonical = table.get(stemmer(folded))
+            if canonical is not None:
+                return canonical
+        return text
+
+    def translate(self, query: str) -> str:
+        return self.pattern.sub(self._replace, query)
+
+
+class QueryTranslator:
+    """
+    Compiled tables per language. A single regex pass over the query replaces
+    known phrases verbatim and looks every other word up, accent-folded and
+    stemmed, in the session language's table only: words such as French
+    'occasion' or Italian 'dove' are English words too and must not be
+    rewritten in an English session. Queries of unknown language go through
+    every table. Unknown words are left untouched.
+    """
+
+    def __init__(self, languages: Iterable[str]):
+        self.languages: List[str] = [language for language in languages if language in SYNONYMS]
+        self.tables: Dict[Optional[str], _LanguageTables] = {
+            language: _LanguageTables([language]) for language in self.languages
+        }
+        self.tables[None] = _LanguageTables(self.languages)
+
+    def translate(self, query: str, language: Optional[str] = None) -> str:
+        """
+        Lowercased query with every known term of the session language (of
+        any supported language when None) replaced by its English search term
+        """
+        query = query.lower().replace('’', "'")
+        tables = self.tables.get(language)
+        return tables.translate(query) if tables is not None else query
+
+
+# Global translator for the UI languages
+query_translator = QueryTranslator(SUPPORTED_LANGUAGES)
@@ -0,0 +1,170 @@
+"""
+Bounded LRU/TTL cache of AI responses with single-flight coalescing of
+identical in-flight requests, for whole and streamed responses
+"""
+import hashlib
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from ..config.settings import get_settings
+
+settings = get_settings()
+
+
+def response_key(*parts: str) -> str:
+    """Hash of everything that shapes a response (model, language, assembled prompt)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = str(part).encode('utf-8')
+        # Length prefixes keep ('ab', 'c') and ('a', 'bc') apart
+        digest.update(len(encoded).to_bytes(8, 'little'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class _Flight:
+    """One upstream call that identical concurrent requests wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """
+    LRU cache of generated responses keyed by response_key(). Entries expire
+    after `ttl` seconds. While a key is being generated, other callers asking
+    for the same key wait for that call instead of starting their own.
+    """
+
+    def __init__(self, max_size: int = 5000, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _store(self, key: str, response: str):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _join(self, key: str) -> Tuple[Optional[str], Optional[_Flight], bool]:
+        """The cached response, or the flight for key and whether this caller leads it"""
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                self.hits += 1
+                return cached, None, False
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return None, flight, False
+            flight = self._flights[key] = _Flight()
+            self.misses += 1
+            return None, flight, True
+
+    def _land(self, key: str, flight: _Flight):
+        """Cache a successful result and release everyone waiting on the flight"""
+        with self._lock:
+            if flight.error is None:
+                self._store(key, flight.result)
+            del self._flights[key]
+        flight.done.set()
+
+    @staticmethod
+    def _wait(flight: _Flight) -> str:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def get_or_generate(self, key: str, generate: Callable[[], str]) -> Tuple[str, bool]:
+        """
+        The cached response for key, or the one generate() returns, plus
+        whether it came from the cache or another caller's call. Errors are
+        never cached: they reach every waiting caller and the next request
+        tries again.
+        """
+        cached, flight, leader = self._join(key)
+        if cached is not None:
+            return cached, True
+        if not leader:
+            return self._wait(flight), True
+        try:
+            flight.result = generate()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight)
+        return flight.result, False
+
+    def stream(self, key: str, generate: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """
+        Like get_or_generate for a response produced in chunks: the leader
+        passes chunks through as they arrive and caches the joined text once
+        the stream completes; cache hits and coalesced callers get the whole
+        response as one chunk. A stream abandoned half way is not cached.
+        """
+        cached, flight, leader = self._join(key)
+        if cached is not None:
+            yield cached
+            return
+        if not leader:
+            yield self._wait(flight)
+            return
+        chunks: List[str] = []
+        try:
+            for chunk in generate():
+                chunks.append(chunk)
+                yield chunk
+            flight.result = ''.join(chunks)
+        except GeneratorExit:
+            # The reader went away; waiters still need an error rather than a partial answer
+            flight.error = RuntimeError("Streamed response was abandoned before it completed")
+            raise
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'size': len(self._entries),
+            'in_flight': len(self._flights),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'hit_rate': round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0
+        }
+
+
+# Global AI response cache
+response_cache = ResponseCache(max_size=settings.max_cache_size, ttl=settings.cache_ttl)
@@ -0,0 +1,88 @@
+"""
+Bounded LRU/TTL cache for search results, tagged with the inventory index version
+"""
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from ..config.settings import get_settings
+
+settings = get_settings()
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation so trivial variants share an entry"""
+    return re.sub(r'\s+', ' ', str(query).lower()).strip().rstrip('?!.').strip()
+
+
+class SearchCache:
+    """
+    LRU cache of search results keyed by (normalized query, max_results,
+    query language).
+    Entries expire after `ttl` seconds, and every entry belongs to one index
+    version: the first lookup against a new version drops the whole cache.
+    """
+
+    def __init__(self, max_size: int = 5000, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Tuple[str, int, Optional[str]], Tuple[float, List[Dict[str, Any]]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version: str):
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def get(self, version: str, query: str, max_results: int,
+            language: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        key = (normalize_query(query), max_results, language)
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Callers may annotate the result dicts, so hand out copies
+            return [dict(result) for result in entry[1]]
+
+    def put(self, version: str, query: str, max_results: int, results: List[Dict[str, Any]],
+            language: Optional[str] = None):
+        if self.max_size <= 0:
+            return
+        key = (normalize_query(query), max_results, language)
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (time.monotonic(), [dict(result) for result in results])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'version': self.version,
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Global search result cache
+search_cache = SearchCache(max_size=settings.max_cache_size, ttl=settings.cache_ttl)
@@ -0,0 +1,236 @@
+"""
+Offline semantic retrieval: hashed TF-IDF vectors reduced with LSA and served
+from a random-hyperplane LSH index
+"""
+import math
+import re
+import zlib
+from typing import List, Dict, Tuple, Iterable
+from .bm25_index import tokenize
+
+N_FEATURES = 2 ** 16
+N_COMPONENTS = 64
+# LSA is fitted on a sample of passages so the build stays bounded on big inventories
+MAX_FIT_PASSAGES = 20000
+POWER_ITERATIONS = 2
+PASSAGE_WORDS = 80
+N_TABLES = 12
+BUCKET_SIZE = 64
+# Below this many passages an exact scan is cheaper than the LSH lookup
+EXACT_SEARCH_LIMIT = 4096
+
+
+def hash_terms(text: str) -> Dict[int, float]:
+    """Signed hashed term counts (crc32, stable across processes) for one text"""
+    counts: Dict[int, float] = {}
+    for term in tokenize(text):
+        digest = zlib.crc32(term.encode('utf-8'))
+        feature = digest % N_FEATURES
+        counts[feature] = counts.get(feature, 0.0) + (1.0 if digest & 0x80000000 else -1.0)
+    # Colliding terms of opposite sign cancel out
+    return {feature: count for feature, count in counts.items() if count}
+
+
+def split_passages(text: str, max_words: int = PASSAGE_WORDS) -> List[str]:
+    """Consecutive windows of at most max_words words"""
+    words = str(text or '').split()
+    return [' '.join(words[start:start + max_words]) for start in range(0, len(words), max_words)]
+
+
+def paragraph_passages(text: str, max_words: int = PASSAGE_WORDS) -> List[str]:
+    """Blank-line separated paragraphs packed into passages of at most max_words words; longer ones are windowed"""
+    passages: List[str] = []
+    current: List[str] = []
+    current_words = 0
+    for paragraph in re.split(r'\n\s*\n', str(text or '')):
+        paragraph = paragraph.strip()
+        words = len(paragraph.split())
+        if not words:
+            continue
+        if current and current_words + words > max_words:
+            passages.append('\n\n'.join(current))
+            current, current_words = [], 0
+        if words > max_words:
+            passages.extend(split_passages(paragraph, max_words))
+            continue
+        current.append(paragraph)
+        current_words += words
+    if current:
+        passages.append('\n\n'.join(current))
+    return passages
+
+
+class SemanticIndex:
+    """
+    Passages are hashed into a fixed-width sparse term space, weighted by IDF
+    and projected onto the top LSA components (randomized SVD in NumPy), so
+    passages that share vocabulary with related words end up close together.
+    Unit-length embeddings are bucketed by the sign pattern of random
+    hyperplanes in several tables; a query only scores the passages in its own
+    and neighbouring buckets, which stays roughly constant as the corpus grows.
+    """
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.passage_keys = None
+        # Sorted hashed features seen at build time; idf and components have one row per feature
+        self.features = None
+        self.idf = None
+        self.components = None
+        self.embeddings = None
+        self.hyperplanes = None
+        self.tables: List[Dict[int, 'object']] = []
+
+    def __len__(self) -> int:
+        return 0 if self.passage_keys is None else len(self.passage_keys)
+
+    def build(self, passages: Iterable[Tuple[str, str]], seed: int = 0) -> 'SemanticIndex':
+        """Fit and index (key, passage text) pairs; a key may own several passages"""
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        key_ids: Dict[str, int] = {}
+        owners, indptr, indices, values = [], [0], [], []
+        for key, text in passages:
+            counts = hash_terms(text)
+            if not counts:
+                continue
+            if key not in key_ids:
+                key_ids[key] = len(self.keys)
+                self.keys.append(key)
+            owners.append(key_ids[key])
+            indices.extend(counts)
+            values.extend(counts.values())
+            indptr.append(len(indices))
+        if len(owners) < 2:
+            return self
+
+        matrix = csr_matrix((np.array(values, dtype=np.float32), indices, indptr),
+                            shape=(len(owners), N_FEATURES))
+        # Sublinear TF keeps long feature lists from dominating, IDF mutes the words every truck has
+        matrix.data = np.sign(matrix.data) * (1 + np.log(np.abs(matrix.data)))
+        # Only the hashed features that occur are kept, as matrix columns and component rows
+        self.features, columns = np.unique(matrix.indices, return_inverse=True)
+        matrix = csr_matrix((matrix.data, columns, matrix.indptr), shape=(len(owners), len(self.features)))
+        doc_freq = np.bincount(columns, minlength=len(self.features))
+        self.idf = np.log((1 + len(owners)) / (1 + doc_freq)).astype(np.float32) + 1
+        matrix = matrix.multiply(self.idf[None, :]).tocsr()
+
+        rng = np.random.default_rng(seed)
+        fit = matrix
+        if matrix.shape[0] > MAX_FIT_PASSAGES:
+            fit = matrix[np.sort(rng.choice(matrix.shape[0], MAX_FIT_PASSAGES, replace=False))]
+        self.components = self._lsa_components(fit, rng)
+        self.embeddings = _normalize(np.asarray(matrix @ self.components, dtype=np.float32)).astype(np.float16)
+        self.passage_keys = np.array(owners, dtype=np.int32)
+
+        if len(owners) > EXACT_SEARCH_LIMIT:
+            n_bits = min(20, max(1, round(math.log2(len(owners) / BUCKET_SIZE))))
+            self.hyperplanes = rng.standard_normal((N_TABLES, n_bits, self.components.shape[1])).astype(np.float32)
+            self.tables = [_buckets(codes) for codes in self._codes(self.embeddings.astype(np.float32))]
+        return self
+
+    @staticmethod
+    def _lsa_components(matrix, rng):
+        """Top right singular vectors of a (passages x features) matrix, by randomized SVD"""
+        import numpy as np
+        rank = min(N_COMPONENTS + 10, *matrix.shape)
+        sample = matrix @ rng.standard_normal((matrix.shape[1], rank), dtype=np.float32)
+        for _ in range(POWER_ITERATIONS):
+            sample, _ = np.linalg.qr(sample)
+            sample = matrix @ (matrix.T @ sample)
+        basis, _ = np.linalg.qr(sample)
+        projected = np.asarray((matrix.T @ basis).T)
+        _, _, vt = np.linalg.svd(projected, full_matrices=False)
+        return vt[:min(N_COMPONENTS, rank)].T.astype(np.float32)
+
+    def _codes(self, embeddings):
+        """Per-table integer bucket codes, one bit per hyperplane"""
+        import numpy as np
+        weights = 1 << np.arange(self.hyperplanes.shape[1], dtype=np.int64)
+        return [((embeddings @ planes.T) > 0).astype(np.int64) @ weights for planes in self.hyperplanes]
+
+    def embed(self, text: str):
+        """Unit-length LSA embedding of a query, or None if none of its terms are known"""
+        import numpy as np
+        counts = hash_terms(text)
+        if self.components is None or not counts:
+            return None
+        features = np.fromiter(counts, dtype=np.int64)
+        weights = np.fromiter(counts.values(), dtype=np.float32)
+        rows = np.minimum(np.searchsorted(self.features, features), len(self.features) - 1)
+        known = self.features[rows] == features
+        if not known.any():
+            return None
+        rows, weights = rows[known], weights[known]
+        weights = np.sign(weights) * (1 + np.log(np.abs(weights))) * self.idf[rows]
+        vector = weights @ self.components[rows]
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    def _candidates(self, vector):
+        """Passage ids in the query's bucket and the buckets one bit away, across all tables"""
+        import numpy as np
+        found = []
+        for table, code in zip(self.tables, self._codes(vector[None, :])):
+            code = int(code[0])
+            for probe in [code] + [code ^ (1 << bit) for bit in range(self.hyperplanes.shape[1])]:
+                bucket = table.get(probe)
+                if bucket is not None:
+                    found.append(bucket)
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def search(self, query: str, top_k: int = 10, min_similarity: float = 0.0) -> List[Tuple[str, float]]:
+        """Keys of the passages closest to the query as (key, cosine similarity), best first"""
+        import numpy as np
+        vector = self.embed(query)
+        if vector is None:
+            return []
+        if self.tables:
+            candidates = self._candidates(vector)
+            similarities = self.embeddings[candidates].astype(np.float32) @ vector
+        else:
+            candidates = None
+            similarities = self.embeddings.astype(np.float32) @ vector
+
+        best: Dict[int, float] = {}
+        for position in np.argsort(-similarities):
+            similarity = float(similarities[position])
+            if similarity < min_similarity or len(best) >= top_k:
+                break
+            passage = candidates[position] if candidates is not None else position
+            key_id = int(self.passage_keys[passage])
+            # A key's score is its best passage
+            if key_id not in best:
+                best[key_id] = similarity
+        return [(self.keys[key_id], round(similarity, 4)) for key_id, similarity in best.items()]
+
+
+def _normalize(vectors):
+    import numpy as np
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def _buckets(codes) -> Dict[int, 'object']:
+    """Bucket code -> array of the passage ids with that code"""
+    import numpy as np
+    order = np.argsort(codes, kind='stable')
+    values, starts = np.unique(codes[order], return_index=True)
+    return {int(value): bucket for value, bucket in zip(values, np.split(order, starts[1:]))}
+
+
+def vehicle_passages(vehicle) -> List[Tuple[str, str]]:
+    """(vehicle id, passage) pairs: a header with name and specs, then the detail-page text in windows"""
+    condition = 'used second hand' if vehicle.is_used else 'new'
+    header = ' '.join(str(value) for value in (
+        vehicle.name, vehicle.brand, vehicle.chassis, vehicle.capacity, vehicle.weight, vehicle.year, condition
+    ) if value)
+    body = ' '.join(str(value) for value in (vehicle.features, vehicle.options, vehicle.description) if value)
+    return [(vehicle.id, header)] + [(vehicle.id, passage) for passage in split_passages(body)]
+
+
+def build_semantic_index(vehicles: Iterable) -> SemanticIndex:
+    """Semantic index over the passages of the canonical vehicle records"""
+    return SemanticIndex().build(passage for vehicle in vehicles for passage in vehicle_passages(vehicle))
@@ -1,284 +1,381 @@
-import pandas as pd
-from pathlib import Path
-
-def search_knowledge(query, max_results=8):
-    """Smart search through comprehensive knowledge base"""
-    data_path = Path(__file__).parent.parent.parent / "data"
-    results = []
-    keywords = query.lower().split()
-    current_year = 2025
-    
+import re
+import heapq
+from operator import itemgetter
+from .inventory_index import inventory_index, dealer_title
+from .facet_index import parse_facets
+from .dealer_directory import find_countries, format_dealer
+from .bm25_index import stem
+from .search_cache import search_cache, normalize_query
+from .query_translation import query_translator
+from ..core.logger import app_logger
+
+USED_TERMS = ['used', '2nd hand', 'second hand', 'pre-owned', 'second-hand']
+DEALER_TERMS = ['contact', 'phone', 'email', 'address', 'office', 'location', 'where', 'dealer', 'uk', 'germany', 'france', 'netherlands', 'belgium', 'manufacture', 'built', 'vehicles', 'experience', 'employees', 'years', 'company', 'about', 'history']
+COMPANY_TERMS = ['contact', 'phone', 'email', 'address', 'info', 'office', 'location', 'where', 'manufacture', 'built', 'vehicles', 'experience', 'employees', 'years', 'company', 'about', 'history']
+GENERAL_TERMS = ['truck', 'suggest', 'list', '5', 'available', 'used', 'second']
+
+DEFAULT_USED_IMAGE = 'https://stephexhorsetrucks.com/wp-content/uploads/2021/02/STX-Trucks_donderdag_©Jeroen-Willems_WEB_127-1400x820-1-720x460.jpg'
+DEFAULT_DETAIL_URL = 'https://stephexhorsetrucks.com/contact'
+DEFAULT_USED_FEATURES = "Second-hand truck in excellent condition"
+FACET_MATCH_SCORE = 0.5
+DEALER_COUNTRY_SCORE = 10
+# Added to contact passages matched by company/contact queries, above every inventory hit
+COMPANY_PASSAGE_SCORE = 100
+# Scale of a fuzzy name match (similarity 0-1 per misspelled word), comparable to a BM25 name hit
+FUZZY_MATCH_WEIGHT = 4.0
+# Scale of a semantic match (cosine similarity of LSA passage embeddings), and the
+# weakest similarity and number of vehicles taken from the semantic index per query
+SEMANTIC_MATCH_WEIGHT = 3.0
+MIN_SEMANTIC_SIMILARITY = 0.4
+SEMANTIC_TOP_K = 10
+# Ranked results kept per query for paging; later pages slice this window
+PAGE_WINDOW = 40
+MORE_WORDS = {'more', 'next', 'other', 'others', 'another', 'más', 'mas', 'otros', 'otras', 'plus', 'autres',
+              'altri', 'altre', 'meer', 'andere', 'mehr', 'weitere'}
+FOLLOW_UP_FILLER = {'show', 'me', 'us', 'give', 'see', 'some', 'any', 'the', 'a', 'please', 'can', 'you', 'i',
+                    'want', 'to', 'like', 'would', 'of', 'them', 'those', 'these', 'ones', 'results', 'options'}
+
+def _truck_result(vehicle, score):
+    """Result dict for a canonical vehicle in the shape the AI prompt expects"""
+    if vehicle.is_used:
+        features = vehicle.features[:600] if len(vehicle.features) > 50 else DEFAULT_USED_FEATURES
+        image_url = vehicle.image_url or DEFAULT_USED_IMAGE
+        url = vehicle.url or DEFAULT_DETAIL_URL
+    else:
+        features = vehicle.features[:300]
+        image_url = vehicle.image_url
+        url = vehicle.url
+    return {
+        'id': vehicle.id,
+        'score': score,
+        'type': 'truck',
+        'title': vehicle.name,
+        'capacity': vehicle.capacity,
+        'condition': vehicle.condition,
+        'year': vehicle.year,
+        'mileage': vehicle.mileage,
+        'features': features,
+        'image_url': image_url,
+        'url': url
+    }
+
+def _plan_query(query, index, language=None):
+    """Query flags and facet filters shared by the single and batch search paths"""
+    # Spanish, French, Italian and Dutch terms of the session language become the English search vocabulary
+    query_lower = query_translator.translate(query, language)
+
+    # Normalize query - map synonyms
+    query_normalized = query_lower
+    is_used_query = any(term in query_normalized for term in USED_TERMS)
+    if is_used_query:
+        query_normalized += ' used second-hand'
+
+    # Condition, capacity, year, weight, brand and chassis filters as one bitmap
+    facets = parse_facets(query_lower, brands=index.facets.values['brand'], chassis=index.facets.values['chassis'])
+
+    # Countries and brands named in the query are answered straight from the dealer directory
+    dealer_countries = find_countries(query_lower)
+    query_words = set(query_lower.replace('-', ' ').split())
+    dealer_brands = [brand for brand in index.dealer_directory.by_brand if brand.lower() in query_words]
+
+    is_general_query = any(word in query_lower for word in GENERAL_TERMS)
+    return {
+        'query_lower': query_lower,
+        'query_normalized': query_normalized,
+        'is_used_query': is_used_query,
+        'is_dealer_query': bool(dealer_countries) or any(word in query_normalized for word in DEALER_TERMS),
+        'dealer_countries': dealer_countries,
+        'dealer_brands': dealer_brands,
+        'is_company_query': any(word in query_normalized for word in COMPANY_TERMS),
+        'is_general_query': is_general_query,
+        'facets': facets,
+        'allowed': index.facets.select(facets),
+        # General queries also pull in the 'vehicle' term every inventory document carries
+        'extra_terms': ['vehicle'] if is_general_query else []
+    }
+
+class KnownTerms:
+    """Membership test against the BM25 vocabulary, with the same plural folding"""
+
+    def __init__(self, postings):
+        self.postings = postings
+
+    def __contains__(self, word):
+        return stem(word) in self.postings
+
+def _directory_lookup(plan):
+    """Dealer queries that name a country or brand are served from the directory indexes"""
+    return plan['is_dealer_query'] and bool(plan['dealer_countries'] or plan['dealer_brands'])
+
+def _wants_contact(plan):
+    """Contact passages answer company questions, or open ones; never pure inventory filters"""
+    return plan['is_company_query'] or not plan['facets']
+
+def _hit_to_candidate(index, plan, key, score):
+    """[score, kind, ref] for one BM25 hit, or None if the query's filters exclude it"""
+    doc = index.documents[key]
+    score = round(float(score), 3)
+    if doc['type'] == 'truck':
+        if index.facets.contains(plan['allowed'], doc['ref']):
+            return [score, 'truck', doc['ref']]
+    elif doc['type'] == 'dealer' and plan['is_dealer_query'] and not _directory_lookup(plan):
+        return [score, 'dealer_doc', key]
+    elif doc['type'] == 'contact' and _wants_contact(plan):
+        return [score + COMPANY_PASSAGE_SCORE if plan['is_company_query'] else score, 'contact_doc', key]
+    return None
+
+def _candidates(index, plan, candidates):
+    """
+    Every ranked entry for the query as lightweight [score, kind, ref] lists,
+    in insertion order (ties keep that order). The facet matches and the
+    catalogue fallback are yielded lazily so they never sit in memory at once.
+    """
+    # Typo-tolerant name matches for query words the BM25 vocabulary doesn't know
+    postings = index.bm25.postings
+    fuzzy_hits = index.name_index.search(plan['query_lower'], known_words=KnownTerms(postings))
+    # Vehicle id -> best fuzzy or semantic score, merged into the other sources below
+    similar = {}
+    if fuzzy_hits:
+        app_logger.debug(f"Fuzzy name matches: {fuzzy_hits[:5]}")
+        similar = {vehicle_id: round(similarity * FUZZY_MATCH_WEIGHT, 3) for vehicle_id, similarity in fuzzy_hits
+                   if index.facets.contains(plan['allowed'], vehicle_id)}
+
+    # Paraphrase matches from the semantic index, for queries about the vehicles themselves
+    if not plan['is_dealer_query'] and not plan['is_company_query']:
+        semantic_hits = index.semantic.search(plan['query_lower'], top_k=SEMANTIC_TOP_K,
+                                              min_similarity=MIN_SEMANTIC_SIMILARITY)
+        if semantic_hits:
+            app_logger.debug(f"Semantic matches: {semantic_hits[:5]}")
+        for vehicle_id, similarity in semantic_hits:
+            if index.facets.contains(plan['allowed'], vehicle_id):
+                score = round(similarity * SEMANTIC_MATCH_WEIGHT, 3)
+                similar[vehicle_id] = max(similar.get(vehicle_id, 0.0), score)
+
+    found = set()
+    contact_hits = False
+    for candidate in candidates:
+        if candidate[1] == 'truck':
+            found.add(candidate[2])
+            if candidate[2] in similar:
+                candidate[0] = max(candidate[0], similar[candidate[2]])
+        elif candidate[1] == 'contact_doc':
+            contact_hits = True
+        yield candidate
+
+    # Vehicles that satisfy every facet filter belong in the answer even without a text match
+    if plan['allowed']:
+        for vehicle_id in index.facets.selected_ids(plan['allowed']):
+            if vehicle_id not in found:
+                found.add(vehicle_id)
+                yield [max(FACET_MATCH_SCORE, similar.get(vehicle_id, 0.0)), 'truck', vehicle_id]
+
+    if _directory_lookup(plan):
+        for dealer in index.dealer_directory.lookup(plan['dealer_countries'], plan['dealer_brands']):
+            yield [DEALER_COUNTRY_SCORE, 'dealer', dealer]
+
+    for vehicle_id, score in similar.items():
+        if vehicle_id not in found:
+            found.add(vehicle_id)
+            yield [score, 'truck', vehicle_id]
+
+    # Company queries whose words miss every contact passage still get the contact text, in file order
+    if plan['is_company_query'] and not contact_hits:
+        for key in _contact_passage_keys(index):
+            yield [COMPANY_PASSAGE_SCORE, 'contact_doc', key]
+
+    # Ensure we have trucks for general queries; with facet filters the facet matches above are the
+    # whole answer, and an empty one must stay empty rather than offer vehicles the filters exclude
+    if not found and plan['allowed'] is None and any(word in plan['query_lower'] for word in ['truck', 'suggest', 'list', 'available', 'used', 'second']):
+        # Fall back to the whole catalogue
+        for vehicle in index.vehicles.values():
+            if 'trucks.csv' in vehicle.sources:
+                yield [1, 'fallback', vehicle.id]
+
+def _contact_passage_keys(index):
+    position = 0
+    while f"contact:{position}" in index.documents:
+        yield f"contact:{position}"
+        position += 1
+
+def _to_result(index, candidate):
+    """Result dict in the shape the AI prompt expects, built only for returned entries"""
+    score, kind, ref = candidate
+    if kind in ('truck', 'fallback'):
+        result = _truck_result(index.vehicles[ref], score)
+        if kind == 'fallback':
+            result['features'] = ''
+        return result
+    if kind == 'dealer':
+        return {'score': score, 'type': 'dealer', 'title': dealer_title(ref), 'content': format_dealer(ref)}
+    if kind == 'dealer_doc':
+        doc = index.documents[ref]
+        return {'score': score, 'type': 'dealer', 'title': doc['title'], 'content': doc['content']}
+    return {'score': score, 'type': 'contact', 'title': 'Contact Information', 'content': index.documents[ref]['content']}
+
+def _finalize(index, plan, candidates, max_results):
+    """Add the facet, contact-passage and fallback entries, then keep the max_results best"""
+    # Bounded heap selection: O(n log k), and only the survivors become result dicts
+    ranked = heapq.nlargest(max_results, _candidates(index, plan, candidates), key=itemgetter(0))
+    return [_to_result(index, candidate) for candidate in ranked]
+
+def _search(index, query, max_results, language=None):
+    plan = _plan_query(query, index, language)
+    if plan['query_lower'] != query.lower():
+        print(f"DEBUG: Translated query: {plan['query_lower']}")
+    if plan['is_used_query']:
+        print(f"DEBUG: Detected used truck query: {query}")
+    if plan['facets']:
+        print(f"DEBUG: Facet filters {plan['facets']} matched {bin(plan['allowed']).count('1')} vehicles")
+
+    # Walk only the posting lists of the query terms
+    hits = index.bm25.search(plan['query_normalized'], extra_terms=plan['extra_terms'])
+    print(f"DEBUG: BM25 matched {len(hits)} of {len(index.bm25)} documents")
+
+    candidates = []
+    for key, score in hits:
+        candidate = _hit_to_candidate(index, plan, key, score)
+        if candidate:
+            candidates.append(candidate)
+
+    print(f"DEBUG: Total results before limit: {len(candidates)}")
+    return _finalize(index, plan, candidates, max_results)
+
+def search_knowledge(query, max_results=8, index=None, language=None):
+    """BM25 search through the in-memory inventory index, memoized per index version"""
+    # Pin one snapshot for the whole query so a concurrent reload can't mix versions
+    index = index or inventory_index.current
+    # Search the text the cache is keyed on, so every variant sharing an entry gets the same results
+    query = normalize_query(query)
+
+    cached = search_cache.get(index.version, query, max_results, language)
+    if cached is not None:
+        print(f"DEBUG: Search cache hit for: {query}")
+        return cached
+
     try:
-        # Normalize query - map synonyms
-        query_normalized = query.lower()
-        is_used_query = any(term in query_normalized for term in ['used', '2nd hand', 'second hand', 'pre-owned', 'second-hand'])
-        if is_used_query:
-            query_normalized += ' used second-hand'
-            print(f"DEBUG: Detected used truck query: {query}")
-        
-        # Check for contact/dealer/office/company info queries first
-        if any(word in query_normalized for word in ['contact', 'phone', 'email', 'address', 'office', 'location', 'where', 'dealer', 'uk', 'germany', 'france', 'netherlands', 'belgium', 'manufacture', 'built', 'vehicles', 'experience', 'employees', 'years', 'company', 'about', 'history']):
-            dealer_files = ['Dealer name stx.txt', 'Dealer names AKX.txt', 'dealer names KETTERER copy.txt']
-            for dealer_file in dealer_files:
-                try:
-                    with open(data_path / dealer_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if 'uk' in query.lower() and 'STX-UK' in content:
-                            results.append({
-                                'score': 10,
-                                'type': 'dealer',
-                                'title': 'UK Dealer Information',
-                                'content': 'STX-UK: Henfield BN5 9SL, UK - Phone: +44 1273 574 000'
-                            })
-                        elif any(country in content.lower() for country in keywords):
-                            brand = 'STX' if 'stx' in dealer_file.lower() else ('AKX' if 'akx' in dealer_file.lower() else 'KETTERER')
-                            results.append({
-                                'score': 8,
-                                'type': 'dealer',
-                                'title': f'{brand} Dealer Network',
-                                'content': content[:500]
-                            })
-                except:
-                    pass
-        # Search trucks with age filtering
-        trucks_df = pd.read_csv(data_path / "trucks.csv")
-        new_trucks_df = pd.read_csv(data_path / "new_trucks.csv")
-        used_trucks_df = pd.read_csv(data_path / "used_trucks.csv", sep='\t')
-        
-        print(f"DEBUG: Loaded {len(trucks_df)} trucks from trucks.csv")
-        print(f"DEBUG: Loaded {len(used_trucks_df)} trucks from used_trucks.csv with separator=tab")
-        print(f"DEBUG: Used trucks columns: {list(used_trucks_df.columns)}")
-        print(f"DEBUG: First row data: {used_trucks_df.iloc[0].to_dict() if len(used_trucks_df) > 0 else 'Empty'}")
-        print(f"DEBUG: Is used query: {is_used_query}")
-        
-        # Check for age requirements
-        import re
-        age_requirement = None
-        age_match = re.search(r'(\d+)\s*years?\s*old', query_normalized)
-        if age_match:
-            age_requirement = int(age_match.group(1))
-        
-        # Check for age-specific queries
-        age_filter = None
-        if ('second' in query_normalized or 'used' in query_normalized) and ('year' in query_normalized or 'old' in query_normalized):
-            age_filter = 'recent_used'
-        
-        # If it's a used truck query, search used_trucks.csv first
-        if is_used_query:
-            print(f"DEBUG: Processing used trucks from used_trucks.csv")
-            for _, row in used_trucks_df.iterrows():
-                name = str(row.get('News__item-button-visible', '')).lower()
-                print(f"DEBUG: Raw row data keys: {list(row.keys())}")
-                horses = str(name).lower()  # Extract horses from name
-                
-                # Check if matches query (2 horses, etc.)
-                score = 0
-                if '2' in query and ('2' in name or 'two' in name):
-                    score += 5
-                score += sum(1 for word in keywords if word in name)
-                
-                print(f"DEBUG: Processing used truck: {name}, score: {score}, has_data: {bool(name)}")
-                
-                if score > 0 or not keywords or 'used' in query.lower() or 'second' in query.lower():
-                    # Use actual image URLs from new CSV format
-                    image_url = row.get('Image', '') or 'https://stephexhorsetrucks.com/wp-content/uploads/2021/02/STX-Trucks_donderdag_©Jeroen-Willems_WEB_127-1400x820-1-720x460.jpg'
-                    detail_url = row.get('News__item URL', '') or 'https://stephexhorsetrucks.com/contact'
-                    
-                    # Extract capacity from truck name
-                    truck_name = row.get('News__item-button-visible', '')
-                    capacity = 'horses'
-                    if '2 horse' in truck_name.lower() or '2-horse' in truck_name.lower():
-                        capacity = '2 horses'
-                    elif '4 horse' in truck_name.lower():
-                        capacity = '4 horses'
-                    elif '5 horse' in truck_name.lower():
-                        capacity = '5 horses'
-                    elif '6 horse' in truck_name.lower():
-                        capacity = '6 horses'
-                    elif '7 horse' in truck_name.lower():
-                        capacity = '7 horses'
-                    elif '8 horse' in truck_name.lower():
-                        capacity = '8 horses'
-                    
-                    # Get detailed features and specs from used trucks Details.txt
-                    features = "Second-hand truck in excellent condition"
-                    year = None
-                    mileage = None
-                    
-                    try:
-                        with open(data_path / "used trucks Details.txt", 'r', encoding='utf-8') as f:
-                            details_content = f.read()
-                            # Find truck section in detailed file
-                            truck_section_start = details_content.find(truck_name)
-                            if truck_section_start != -1:
-                                # Get section from truck name to next truck or end
-                                next_truck = details_content.find('Brand:', truck_section_start + len(truck_name))
-                                if next_truck != -1:
-                                    next_next_truck = details_content.find('Brand:', next_truck + 10)
-                                    truck_section = details_content[truck_section_start:next_next_truck if next_next_truck != -1 else truck_section_start + 2000]
-                                else:
-                                    truck_section = details_content[truck_section_start:truck_section_start + 2000]
-                                
-                                # Extract year and mileage
-                                if 'Year:' in truck_section:
-                                    year_match = truck_section[truck_section.find('Year:'):truck_section.find('Year:') + 20]
-                                    try:
-                                        year = int(''.join(filter(str.isdigit, year_match)))
-                                    except:
-                                        pass
-                                
-                                if 'Mileage:' in truck_section:
-                                    mileage_match = truck_section[truck_section.find('Mileage:'):truck_section.find('Mileage:') + 30]
-                                    mileage = mileage_match.replace('Mileage:', '').strip().split()[0] if 'km' in mileage_match else None
-                                
-                                # Extract features
-                                if 'Features' in truck_section:
-                                    features_start = truck_section.find('Features')
-                                    features_end = truck_section.find('GET YOUR OFFER', features_start)
-                                    if features_end == -1:
-                                        features_end = features_start + 800
-                                    features_text = truck_section[features_start:features_end].replace('Features', '').strip()
-                                    if len(features_text) > 50:
-                                        features = features_text[:600]
-                    except:
-                        pass
-                    
-                    results.append({
-                        'score': score + 10,  # Higher score for used trucks
-                        'type': 'truck',
-                        'title': truck_name,
-                        'capacity': capacity,
-                        'condition': 'Used',
-                        'year': year,
-                        'mileage': mileage,
-                        'features': features,
-                        'image_url': image_url,
-                        'url': detail_url
-                    })
-        
-        # Search main trucks.csv
-        for _, row in trucks_df.iterrows():
-            name = str(row.get('name', '')).lower()
-            capacity = str(row.get('capacity', '')).lower()
-            condition = str(row.get('condition', '')).lower()
-            
-            # Skip if used query but this is new truck
-            if is_used_query and condition not in ['used', 'second-hand']:
-                continue
-            
-            # Get year from detailed data
-            truck_year = None
-            for _, detail_row in used_trucks_df.iterrows():
-                if str(detail_row.get('Name', '')).lower() in name:
-                    truck_year = detail_row.get('Year')
-                    break
-            if not truck_year:
-                for _, detail_row in new_trucks_df.iterrows():
-                    if str(detail_row.get('Name', '')).lower() in name:
-                        truck_year = detail_row.get('Year')
-                        break
-            
-            # Apply age filter
-            if age_requirement and truck_year:
-                truck_age = current_year - int(truck_year)
-                if truck_age > age_requirement:
-                    continue
-            
-            # Apply used truck filter
-            if age_filter == 'recent_used':
-                if condition in ['used', 'second-hand']:
-                    if truck_year and int(truck_year) >= 2023:
-                        pass
-                    else:
-                        continue
-                else:
-                    continue
-            
-            score = sum(1 for word in keywords if word in name or word in capacity)
-            # Always show trucks for general queries
-            if score > 0 or not keywords or any(word in query.lower() for word in ['truck', 'suggest', 'list', '5', 'available', 'used', 'second']):
-                # Find detailed features
-                features = ""
-                for _, detail_row in new_trucks_df.iterrows():
-                    if str(detail_row.get('Name', '')).lower() in name:
-                        features = str(detail_row.get('Features', ''))[:300]
-                        break
-                
-                results.append({
-                    'score': score + 3,
-                    'type': 'truck',
-                    'title': row.get('name', ''),
-                    'capacity': row.get('capacity', ''),
-                    'condition': row.get('condition', ''),
-                    'year': truck_year,
-                    'features': features,
-                    'image_url': row.get('image_url', ''),
-                    'url': row.get('url', '')
-                })
-        
-        # If no trucks found, search new_trucks.csv as backup
-        if not any(r['type'] == 'truck' for r in results):
-            new_df = pd.read_csv(data_path / "new_trucks.csv")
-            for _, row in new_df.iterrows():
-                name = str(row.get('Name', '')).lower()
-                score = sum(1 for word in keywords if word in name)
-                if score > 0 or not keywords:
-                    results.append({
-                        'score': score + 2,
-                        'type': 'new_truck',
-                        'title': row.get('Name', ''),
-                        'content': f"{row.get('Horses', '')} horses | {row.get('Year', '')}"
-                    })
-        
-
-        
-        # Search contact info - prioritize for contact/office/company queries
-        if any(word in query_normalized for word in ['contact', 'phone', 'email', 'address', 'info', 'office', 'location', 'where', 'manufacture', 'built', 'vehicles', 'experience', 'employees', 'years', 'company', 'about', 'history']):
-            with open(data_path / "contact.txt", 'r', encoding='utf-8') as f:
-                contact_content = f.read()
-                results.append({
-                    'score': 100,  # High priority for company info queries
-                    'type': 'contact',
-                    'title': 'Company Information',
-                    'content': contact_content
-                })
-        else:
-            # Regular contact search for other queries
-            with open(data_path / "contact.txt", 'r', encoding='utf-8') as f:
-                contact_text = f.read().lower()
-                score = sum(1 for word in keywords if word in contact_text)
-                if score > 0:
-                    results.append({
-                        'score': score,
-                        'type': 'contact',
-                        'title': 'Contact Information',
-                        'content': contact_text
-                    })
-        
-        # Ensure we have trucks for general queries
-        if not any(r['type'] == 'truck' for r in results) and any(word in query.lower() for word in ['truck', 'suggest', 'list', 'available', 'used', 'second']):
-            # Force load all trucks
-            for _, row in trucks_df.iterrows():
-                results.append({
-                    'score': 1,
-                    'type': 'truck',
-                    'title': row.get('name', ''),
-                    'capacity': row.get('capacity', ''),
-                    'condition': row.get('condition', ''),
-                    'year': None,
-                    'features': '',
-                    'image_url': row.get('image_url', ''),
-                    'url': row.get('url', '')
-                })
-        
-        results.sort(key=lambda x: x['score'], reverse=True)
-        print(f"DEBUG: Total results before limit: {len(results)}")
-        print(f"DEBUG: Truck results: {[r['title'] for r in results if r['type'] == 'truck']}")
-        print(f"DEBUG: Used truck count: {len([r for r in results if r['type'] == 'truck' and r.get('condition') == 'Used'])}")
-        final_results = results[:max_results]
+        final_results = _search(index, query, max_results, language)
+        print(f"DEBUG: Truck results: {[r['title'] for r in final_results if r['type'] == 'truck']}")
         print(f"DEBUG: Returning {len(final_results)} results")
+        search_cache.put(index.version, query, max_results, final_results, language)
         return final_results
-        
+
     except Exception as e:
         print(f"Search error: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def search_knowledge_page(query, page_size=8, offset=0, index=None, language=None):
+    """
+    One page of search_knowledge results plus the offset of the next page
+    (None when this is the last one). Pages are cut from a ranked window of
+    PAGE_WINDOW results that lives in the search cache, so asking for the
+    next page of the same query doesn't re-run the search.
+    """
+    index = index or inventory_index.current
+    query = normalize_query(query)
+    end = offset + page_size
+    # One extra entry tells whether another page exists
+    window = PAGE_WINDOW * -(-end // PAGE_WINDOW) + 1
+
+    ranked = search_cache.get(index.version, query, window, language)
+    if ranked is None:
+        try:
+            ranked = _search(index, query, window, language)
+        except Exception as e:
+            print(f"Search error: {e}")
+            return [], None
+        search_cache.put(index.version, query, window, ranked, language)
+    else:
+        print(f"DEBUG: Search cache hit for: {query} (offset {offset})")
+
+    page = ranked[offset:end]
+    print(f"DEBUG: Returning results {offset}-{offset + len(page)} of {len(ranked)}{'+' if len(ranked) == window else ''}")
+    return page, (end if len(ranked) > end else None)
+
+def is_more_request(message, previous_query):
+    """
+    True for follow-ups like "show me more" or "more used trucks please" that
+    ask for the next page of the previous search rather than a new one
+    """
+    words = set(re.findall(r'[^\W\d_]+|\d+', message.lower()))
+    if not previous_query or not words & MORE_WORDS:
+        return False
+    previous_words = set(re.findall(r'[^\W\d_]+|\d+', previous_query.lower()))
+    return words - MORE_WORDS - FOLLOW_UP_FILLER <= previous_words
+
+def _document_masks(index):
+    """Per-document arrays used to apply the query filters to a whole score matrix at once"""
+    import numpy as np
+    docs = [index.documents[key] for key in index.bm25.keys]
+    return {
+        'truck': np.array([d['type'] == 'truck' for d in docs]),
+        'dealer': np.array([d['type'] == 'dealer' for d in docs]),
+        'contact': np.array([d['type'] == 'contact' for d in docs])
+    }
+
+def search_knowledge_many(queries, max_results=8, index=None, batch_size=1024, language=None):
+    """
+    Batch search for offline jobs: scores every query against the sparse
+    term-document matrix in one product per batch and returns the top
+    max_results per query, in the same shape as search_knowledge
+    """
+    import numpy as np
+    index = index or inventory_index.current
+    if not queries:
+        return []
+    if not hasattr(index.bm25, 'matrix'):
+        # Stores without an in-memory term matrix (SQLite) answer one query at a time
+        return [_search(index, query, max_results, language) for query in queries]
+
+    from .bm25_index import tokenize
+    doc_matrix = index.bm25.matrix()
+    masks = _document_masks(index)
+    n_docs = doc_matrix.shape[1]
+    candidate_k = min(n_docs, max_results)
+
+    all_results = []
+    for start in range(0, len(queries), batch_size):
+        plans = [_plan_query(q, index, language) for q in queries[start:start + batch_size]]
+        query_matrix = index.bm25.query_matrix(
+            [tokenize(p['query_normalized']) + p['extra_terms'] for p in plans]
+        )
+        scores = (query_matrix @ doc_matrix).toarray()
+
+        # Vectorized versions of the per-hit filters in _hit_to_candidate
+        dealer_query = np.array([p['is_dealer_query'] and not _directory_lookup(p) for p in plans])[:, None]
+        company_query = np.array([p['is_company_query'] for p in plans])[:, None]
+        contact_query = np.array([_wants_contact(p) for p in plans])[:, None]
+        # Truck documents come first, in facet position order
+        allowed = np.ones(scores.shape, dtype=bool)
+        n_vehicles = len(index.facets.ids)
+        for row, plan in enumerate(plans):
+            if plan['allowed'] is not None:
+                allowed[row, :n_vehicles] = index.facets.to_mask(plan['allowed'])
+
+        excluded = (
+            (masks['truck'][None, :] & ~allowed)
+            | (~dealer_query & masks['dealer'][None, :])
+            | (~contact_query & masks['contact'][None, :])
+        )
+        scores[excluded] = 0.0
+        # Rank with the company boost _hit_to_candidate applies, so the same passages make the cut
+        ranking = scores + COMPANY_PASSAGE_SCORE * (company_query & masks['contact'][None, :] & (scores > 0))
+
+        if candidate_k < n_docs:
+            top = np.argpartition(-ranking, candidate_k - 1, axis=1)[:, :candidate_k]
+        else:
+            top = np.tile(np.arange(n_docs), (len(plans), 1))
+        order = np.argsort(-np.take_along_axis(ranking, top, axis=1), axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+
+        for row, plan in enumerate(plans):
+            candidates = []
+            for doc_idx, score in zip(top[row], top_scores[row]):
+                if score <= 0:
+                    break
+                candidate = _hit_to_candidate(index, plan, index.bm25.keys[doc_idx], score)
+                if candidate:
+                    candidates.append(candidate)
+            all_results.append(_finalize(index, plan, candidates, max_results))
+
+    return all_results
@@ -0,0 +1,571 @@
+"""
+SQLite storage backend for the knowledge base: vehicles with indexed facet
+columns, dealers, contact text and an FTS5 index over every searchable
+document, in one local database file.
+
+Workers keep only small lookup tables (dealers, the name vocabulary, the
+distinct facet values) and bounded caches in memory and read everything else
+on demand. WAL mode lets any number of processes read while one of them
+applies a reload as incremental upserts of the vehicles that changed.
+
+    python -m src.utils.sqlite_store --data data --output data/knowledge.db
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from ..core.logger import app_logger
+from ..core.models import Dealer
+from .bm25_index import tokenize
+from .dealer_directory import DealerDirectory, format_dealer
+from .facet_index import vehicle_brand, vehicle_make, weight_class, parse_weight
+from .fuzzy_match import TrigramIndex, index_words, vehicle_name_text
+from .inventory_index import InventoryIndex, DATA_PATH, SQLITE_FILE
+from .knowledge_snapshot import source_fingerprints
+from .semantic_index import SemanticIndex
+from .vehicle_records import VehicleRecord
+
+RECORD_FIELDS = [field.name for field in fields(VehicleRecord)]
+# BM25 hits per query; the facet matches still reach the answer past this cap
+MAX_TEXT_HITS = 1000
+DOCUMENT_CACHE_SIZE = 20000
+# Bound parameters per IN (...) lookup, well under SQLite's limit
+LOOKUP_CHUNK = 500
+# Same boost as BM25Index.add: title words count three times
+BOOST = 3
+# Seconds between checks of the stored version for a reload by another process
+VERSION_CHECK_INTERVAL = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS vehicles (
+    id TEXT PRIMARY KEY, position INTEGER NOT NULL UNIQUE, digest TEXT NOT NULL,
+    name TEXT, condition TEXT, price INTEGER, capacity TEXT, horses INTEGER, brand TEXT, chassis TEXT,
+    weight TEXT, year INTEGER, mileage INTEGER, features TEXT, options TEXT, description TEXT,
+    image_url TEXT, url TEXT, sources TEXT, aliases TEXT,
+    facet_condition TEXT, facet_brand TEXT, facet_make TEXT, facet_chassis TEXT,
+    facet_year REAL, facet_weight REAL
+);
+CREATE INDEX IF NOT EXISTS vehicles_condition ON vehicles (facet_condition);
+CREATE INDEX IF NOT EXISTS vehicles_horses ON vehicles (horses);
+CREATE INDEX IF NOT EXISTS vehicles_brand ON vehicles (facet_brand);
+CREATE INDEX IF NOT EXISTS vehicles_make ON vehicles (facet_make);
+CREATE INDEX IF NOT EXISTS vehicles_chassis ON vehicles (facet_chassis);
+CREATE INDEX IF NOT EXISTS vehicles_year ON vehicles (facet_year);
+CREATE INDEX IF NOT EXISTS vehicles_weight ON vehicles (facet_weight);
+CREATE TABLE IF NOT EXISTS name_words (
+    word TEXT NOT NULL, vehicle_id TEXT NOT NULL, PRIMARY KEY (word, vehicle_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS name_words_vehicle ON name_words (vehicle_id);
+CREATE TABLE IF NOT EXISTS dealers (
+    position INTEGER PRIMARY KEY, brand TEXT, name TEXT, address TEXT, country TEXT, countries TEXT, phone TEXT
+);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, type TEXT NOT NULL, ref, title TEXT, content TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5 (body, tokenize = 'unicode61 remove_diacritics 0');
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_vocab USING fts5vocab (documents_fts, 'row');
+"""
+
+# Facet name -> column; the values are computed exactly like FacetIndex's
+FACET_COLUMNS = {
+    'condition': 'facet_condition', 'horses': 'horses', 'brand': 'facet_brand',
+    'make': 'facet_make', 'chassis': 'facet_chassis',
+}
+
+
+def vehicle_row(vehicle: VehicleRecord, position: int, digest: str) -> Tuple:
+    """Column values for the vehicles table, in schema order"""
+    values = [getattr(vehicle, name) for name in RECORD_FIELDS]
+    values[-2:] = [json.dumps(list(vehicle.sources)), json.dumps(list(vehicle.aliases))]
+    return (vehicle.id, position, digest, *values[1:],
+            'used' if vehicle.is_used else 'new', vehicle_brand(vehicle), vehicle_make(vehicle),
+            (vehicle.chassis or '').lower() or None, float(vehicle.year) if vehicle.year else None,
+            weight_class(parse_weight(vehicle.weight)))
+
+
+def record_digest(vehicle: VehicleRecord) -> str:
+    return hashlib.sha1(repr(vehicle).encode('utf-8')).hexdigest()
+
+
+def fts_body(text: str, boost_text: str) -> str:
+    """Pre-tokenized document text, so FTS5 sees exactly the BM25 index's terms"""
+    return ' '.join(tokenize(text) + tokenize(boost_text) * BOOST)
+
+
+class BoundedCache(dict):
+    """Dict that empties itself when full: entries are cheap to read again, so no LRU bookkeeping"""
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def put(self, key, value):
+        if len(self) >= self.max_size:
+            self.clear()
+        self[key] = value
+
+
+class FtsVocabulary:
+    """Membership test against the FTS5 term list, in place of BM25Index.postings"""
+
+    def __init__(self, store: 'SqliteKnowledgeStore'):
+        self.store = store
+
+    def __contains__(self, term) -> bool:
+        return self.store.query_one('SELECT 1 FROM documents_vocab WHERE term = ?', (term,)) is not None
+
+
+class FtsIndex:
+    """BM25 ranking by FTS5 over the same tokens and boosts as BM25Index"""
+
+    def __init__(self, snapshot: 'SqliteSnapshot'):
+        self.snapshot = snapshot
+        self.postings = FtsVocabulary(snapshot.store)
+
+    def __len__(self) -> int:
+        return self.snapshot.store.query_one('SELECT COUNT(*) FROM documents')[0]
+
+    def search(self, query: str, top_k: Optional[int] = None, extra_terms: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Documents matching the query as (key, score), best first"""
+        terms = list(dict.fromkeys(list(tokenize(query)) + list(extra_terms)))
+        if not terms:
+            return []
+        match = ' OR '.join('"' + term.replace('"', '""') + '"' for term in terms)
+        rows = self.snapshot.store.query(
+            "SELECT d.key, d.type, d.ref, d.title, d.content, v.position, -documents_fts.rank "
+            "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+            "LEFT JOIN vehicles v ON d.type = 'truck' AND v.id = d.ref "
+            "WHERE documents_fts MATCH ? ORDER BY documents_fts.rank LIMIT ?",
+            (match, min(top_k or MAX_TEXT_HITS, MAX_TEXT_HITS))
+        )
+        hits = []
+        for key, doc_type, ref, title, content, position, score in rows:
+            # The caller looks every hit up next, so keep them at hand
+            self.snapshot.documents.remember(key, _document(doc_type, ref, title, content))
+            if position is not None:
+                self.snapshot.positions.put(ref, position)
+            hits.append((key, score))
+        return hits
+
+
+def _document(doc_type: str, ref: Any, title: str, content: Optional[str]) -> Dict[str, Any]:
+    """Document dict in the shape InventoryIndex.documents holds"""
+    document = {'type': doc_type, 'ref': ref, 'title': title}
+    if content is not None:
+        document['content'] = content
+    return document
+
+
+class SqliteDocuments:
+    """Read-through mapping of document key -> document dict"""
+
+    def __init__(self, store: 'SqliteKnowledgeStore'):
+        self.store = store
+        self.cache = BoundedCache(DOCUMENT_CACHE_SIZE)
+
+    def remember(self, key: str, document: Dict[str, Any]):
+        self.cache.put(key, document)
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        document = self.cache.get(key)
+        if document is None:
+            row = self.store.query_one('SELECT type, ref, title, content FROM documents WHERE key = ?', (key,))
+            if row is None:
+                raise KeyError(key)
+            document = _document(*row)
+            self.cache.put(key, document)
+        return document
+
+    def __contains__(self, key) -> bool:
+        return self.cache.get(key) is not None or \
+            self.store.query_one('SELECT 1 FROM documents WHERE key = ?', (key,)) is not None
+
+
+class SqliteVehicles:
+    """Read-only mapping of vehicle id -> VehicleRecord, iterated in position order"""
+
+    COLUMNS = ', '.join(RECORD_FIELDS)
+
+    def __init__(self, store: 'SqliteKnowledgeStore'):
+        self.store = store
+
+    @staticmethod
+    def _record(row) -> VehicleRecord:
+        return VehicleRecord(*row[:-2], sources=tuple(json.loads(row[-2])), aliases=tuple(json.loads(row[-1])))
+
+    def __getitem__(self, vehicle_id: str) -> VehicleRecord:
+        row = self.store.query_one(f'SELECT {self.COLUMNS} FROM vehicles WHERE id = ?', (vehicle_id,))
+        if row is None:
+            raise KeyError(vehicle_id)
+        return self._record(row)
+
+    def get(self, vehicle_id: str, default=None) -> Optional[VehicleRecord]:
+        try:
+            return self[vehicle_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, vehicle_id) -> bool:
+        return self.store.query_one('SELECT 1 FROM vehicles WHERE id = ?', (vehicle_id,)) is not None
+
+    def __len__(self) -> int:
+        return self.store.query_one('SELECT COUNT(*) FROM vehicles')[0]
+
+    def __iter__(self) -> Iterator[str]:
+        return (vehicle_id for (vehicle_id,) in self.store.query('SELECT id FROM vehicles ORDER BY position'))
+
+    def values(self) -> Iterator[VehicleRecord]:
+        """Streamed from the database, never all in memory at once"""
+        return (self._record(row) for row in self.store.query(f'SELECT {self.COLUMNS} FROM vehicles ORDER BY position'))
+
+
+class SqliteFacets:
+    """
+    The FacetIndex interface over indexed columns: a filter becomes one SQL
+    query whose matching positions are packed into the same bitmap ints, so
+    search code can't tell the two apart
+    """
+
+    def __init__(self, snapshot: 'SqliteSnapshot'):
+        self.snapshot = snapshot
+        self.store = snapshot.store
+        self.values: Dict[str, List[Any]] = {
+            facet: [value for (value,) in self.store.query(
+                f'SELECT DISTINCT {column} FROM vehicles WHERE {column} IS NOT NULL')]
+            for facet, column in FACET_COLUMNS.items()
+        }
+
+    def _where(self, facets: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for facet in ('condition', 'brand', 'make', 'chassis'):
+            if facet in facets:
+                values = list(facets[facet])
+                clauses.append(f"{FACET_COLUMNS[facet]} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if 'horses' in facets:
+            exact = self.store.query_one(
+                f"SELECT 1 FROM vehicles WHERE {' AND '.join(clauses + ['horses = ?'])} LIMIT 1",
+                params + [facets['horses']]
+            )
+            # Nobody has exactly that many stalls: offer the next sizes up instead
+            clauses.append('horses = ?' if exact else 'horses >= ?')
+            params.append(facets['horses'])
+        if 'year_min' in facets or 'year_max' in facets:
+            years, year_params = self._range('facet_year', facets.get('year_min'), facets.get('year_max'))
+            if facets.get('year_allow_unknown'):
+                years = f'({years} OR facet_year IS NULL)'
+            clauses.append(years)
+            params.extend(year_params)
+        if 'weight_min' in facets or 'weight_max' in facets:
+            weights, weight_params = self._range('facet_weight', facets.get('weight_min'), facets.get('weight_max'))
+            clauses.append(weights)
+            params.extend(weight_params)
+        return ' AND '.join(clauses) or '1', params
+
+    @staticmethod
+    def _range(column: str, low: Optional[float], high: Optional[float]) -> Tuple[str, List[Any]]:
+        bounds = [(f'{column} >= ?', low), (f'{column} <= ?', high)]
+        clauses = [clause for clause, value in bounds if value is not None] or [f'{column} IS NOT NULL']
+        return f"({' AND '.join(clauses)})", [value for _, value in bounds if value is not None]
+
+    def select(self, facets: Dict[str, Any]) -> Optional[int]:
+        """AND together every requested facet; None when the query has no facet constraints"""
+        import numpy as np
+        if not facets:
+            return None
+        where, params = self._where(facets)
+        positions = np.fromiter((position for (position,) in self.store.query(
+            f'SELECT position FROM vehicles WHERE {where}', params)), dtype=np.int64)
+        if not len(positions):
+            return 0
+        bits = np.zeros(int(positions.max()) + 1, dtype=bool)
+        bits[positions] = True
+        return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+    def contains(self, bitmap: Optional[int], vehicle_id: str) -> bool:
+        """True if the vehicle is in the bitmap; a None bitmap matches everything"""
+        if bitmap is None:
+            return True
+        position = self.snapshot.positions.get(vehicle_id)
+        if position is None:
+            row = self.store.query_one('SELECT position FROM vehicles WHERE id = ?', (vehicle_id,))
+            if row is None:
+                return False
+            position = row[0]
+            self.snapshot.positions.put(vehicle_id, position)
+        return bool(bitmap >> position & 1)
+
+    def selected_ids(self, bitmap: int) -> Iterator[str]:
+        """Vehicle ids in the bitmap, in position order"""
+        import numpy as np
+        raw = np.frombuffer(bitmap.to_bytes(bitmap.bit_length() // 8 + 1, 'little'), dtype=np.uint8)
+        positions = np.flatnonzero(np.unpackbits(raw, bitorder='little')).tolist()
+        for start in range(0, len(positions), LOOKUP_CHUNK):
+            chunk = positions[start:start + LOOKUP_CHUNK]
+            rows = self.store.query(
+                f"SELECT id FROM vehicles WHERE position IN ({', '.join('?' * len(chunk))}) ORDER BY position", chunk
+            )
+            for (vehicle_id,) in rows:
+                yield vehicle_id
+
+
+class SqliteNameIndex(TrigramIndex):
+    """Trigram index over the distinct name words only; the words' vehicles are looked up in SQL"""
+
+    def __init__(self, store: 'SqliteKnowledgeStore'):
+        super().__init__()
+        self.store = store
+        for (word,) in store.query('SELECT DISTINCT word FROM name_words'):
+            self.add(word, word)
+
+    def keys_for(self, word: str) -> Iterable[str]:
+        return [vehicle_id for (vehicle_id,) in self.store.query(
+            'SELECT vehicle_id FROM name_words WHERE word = ?', (word,))]
+
+
+class SqliteSnapshot:
+    """
+    One version of the database as search sees it: the same attributes as
+    InventoryIndex, with the small lookup tables loaded and everything else
+    read through. Semantic retrieval is not available from this backend.
+    """
+
+    def __init__(self, store: 'SqliteKnowledgeStore'):
+        self.store = store
+        self.data_path = store.data_path
+        self.version = store.meta('version') or ''
+        self.fingerprints: Dict[str, Optional[str]] = json.loads(store.meta('fingerprints') or '{}')
+        self.contact_info = store.meta('contact_info') or ''
+        self.load_errors: List[str] = []
+        self.positions = BoundedCache(DOCUMENT_CACHE_SIZE)
+        self.documents = SqliteDocuments(store)
+        self.bm25 = FtsIndex(self)
+        self.vehicles = SqliteVehicles(store)
+        self.facets = SqliteFacets(self)
+        self.name_index = SqliteNameIndex(store)
+        self.semantic = SemanticIndex()
+        self.dealer_directory = DealerDirectory(
+            Dealer(brand=brand, name=name, address=address, country=country,
+                   countries=json.loads(countries), phone=phone)
+            for brand, name, address, country, countries, phone in store.query(
+                'SELECT brand, name, address, country, countries, phone FROM dealers ORDER BY position')
+        )
+
+    def knowledge_base(self) -> Dict[str, Any]:
+        """Knowledge base dict for the AI service context; inventory rows stay in the database"""
+        dealers: Dict[str, str] = {}
+        for dealer in self.dealer_directory.dealers:
+            dealers[dealer.brand] = f"{dealers.get(dealer.brand, '')}{format_dealer(dealer)}\n"
+        return {'contact_info': self.contact_info, 'dealers': dealers, 'vehicle_count': len(self.vehicles)}
+
+
+class SqliteKnowledgeStore:
+    """
+    The LiveInventoryIndex interface over a SQLite database. `current` is
+    rebuilt whenever the stored version changes, including after a reload by
+    another process, and a reload writes only the rows that changed.
+    """
+
+    def __init__(self, path: Path, data_path: Path = DATA_PATH):
+        self.path = Path(path)
+        self.data_path = Path(data_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._watcher = None
+        self._current: Optional[SqliteSnapshot] = None
+        self._checked_at = 0.0
+        self._create_schema()
+        self.reload()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside the writer"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _create_schema(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._write_lock:
+            self._connection().executescript(SCHEMA)
+
+    def query(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
+        return self._connection().execute(sql, tuple(params))
+
+    def query_one(self, sql: str, params: Iterable[Any] = ()) -> Optional[Tuple]:
+        return self.query(sql, params).fetchone()
+
+    def meta(self, key: str) -> Optional[str]:
+        row = self.query_one('SELECT value FROM meta WHERE key = ?', (key,))
+        return row[0] if row else None
+
+    def stored_fingerprints(self) -> Optional[Dict[str, Optional[str]]]:
+        return json.loads(self.meta('fingerprints') or 'null')
+
+    @property
+    def current(self) -> SqliteSnapshot:
+        # Another process's reload shows up within VERSION_CHECK_INTERVAL, without a query per access
+        if self._current is not None and time.monotonic() - self._checked_at < VERSION_CHECK_INTERVAL:
+            return self._current
+        version = self.meta('version') or ''
+        if self._current is None or self._current.version != version:
+            with self._refresh_lock:
+                if self._current is None or self._current.version != version:
+                    self._current = SqliteSnapshot(self)
+        self._checked_at = time.monotonic()
+        return self._current
+
+    @property
+    def version(self) -> str:
+        return self.current.version
+
+    def reload(self, changed_files: Optional[Iterable[str]] = None) -> bool:
+        """
+        Re-parse data/ and upsert what changed. Only the one process that
+        takes the database write lock and still finds the stored data stale
+        parses data/; the others see fresh fingerprints and do nothing. The
+        store keeps no parsed sources, so changed_files only serves the
+        watcher's interface.
+        """
+        fingerprints = source_fingerprints(self.data_path)
+        if self.stored_fingerprints() == fingerprints:
+            return False
+        with self._write_lock:
+            connection = self._connection()
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+            except sqlite3.OperationalError as e:
+                # Another process has held the write lock past the timeout, so it is doing this reload
+                app_logger.warning(f"Knowledge store {self.path.name} is locked by another writer: {e}")
+                return False
+            with connection:
+                # Re-read inside the write transaction: another worker may have synced while we waited
+                previous = self.meta('version')
+                if self.stored_fingerprints() == fingerprints:
+                    return False
+                index = InventoryIndex(self.data_path)
+                if index.load_errors:
+                    app_logger.error(f"Knowledge store reload rejected, keeping {previous}: {index.load_errors}")
+                    return False
+                if index.version == previous:
+                    # Same content under new timestamps: record them so the next check is cheap again
+                    connection.execute("UPDATE meta SET value = ? WHERE key = 'fingerprints'",
+                                       (json.dumps(index.fingerprints),))
+                    return False
+                changes = self._write(connection, index)
+            self._checked_at = 0.0
+            app_logger.info(f"Knowledge store {self.path.name} updated {previous} -> {index.version}: {changes}")
+            return True
+
+    def sync(self, index: InventoryIndex) -> Dict[str, int]:
+        """Write an InventoryIndex into the database, touching only new, changed and removed vehicles"""
+        with self._write_lock:
+            connection = self._connection()
+            connection.execute('BEGIN IMMEDIATE')
+            with connection:
+                changes = self._write(connection, index)
+            self._checked_at = 0.0
+            return changes
+
+    def _write(self, connection: sqlite3.Connection, index: InventoryIndex) -> Dict[str, int]:
+        """The writes of sync(), inside the caller's BEGIN IMMEDIATE transaction"""
+        stored = dict(connection.execute('SELECT id, digest FROM vehicles'))
+        changes = {'added': 0, 'updated': 0, 'removed': 0}
+        next_position = connection.execute('SELECT COALESCE(MAX(position), -1) + 1 FROM vehicles').fetchone()[0]
+        # Dealers and contact text are a few rows: replaced wholesale
+        connection.execute("DELETE FROM documents_fts WHERE rowid IN (SELECT id FROM documents WHERE type != 'truck')")
+        connection.execute("DELETE FROM documents WHERE type != 'truck'")
+        connection.execute('DELETE FROM dealers')
+        connection.executemany(
+            'INSERT INTO dealers (position, brand, name, address, country, countries, phone) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(position, dealer.brand, dealer.name, dealer.address, dealer.country, json.dumps(dealer.countries),
+              dealer.phone) for position, dealer in enumerate(index.dealer_directory.dealers)]
+        )
+
+        for key, document, text, boost_text in index.search_documents():
+            if document['type'] == 'truck':
+                vehicle = index.vehicles[document['ref']]
+                digest = record_digest(vehicle)
+                previous = stored.pop(vehicle.id, None)
+                if previous == digest:
+                    continue
+                if previous is None:
+                    position = next_position
+                    next_position += 1
+                    changes['added'] += 1
+                else:
+                    position = connection.execute('SELECT position FROM vehicles WHERE id = ?', (vehicle.id,)).fetchone()[0]
+                    self._delete_vehicle(connection, vehicle.id)
+                    changes['updated'] += 1
+                row = vehicle_row(vehicle, position, digest)
+                connection.execute(f"INSERT INTO vehicles VALUES ({', '.join('?' * len(row))})", row)
+                connection.executemany('INSERT INTO name_words (word, vehicle_id) VALUES (?, ?)',
+                                       [(word, vehicle.id) for word in index_words(vehicle_name_text(vehicle))])
+            cursor = connection.execute(
+                'INSERT INTO documents (key, type, ref, title, content) VALUES (?, ?, ?, ?, ?)',
+                (key, document['type'], document['ref'], document['title'], document.get('content'))
+            )
+            connection.execute('INSERT INTO documents_fts (rowid, body) VALUES (?, ?)',
+                               (cursor.lastrowid, fts_body(text, boost_text)))
+
+        for vehicle_id in stored:
+            self._delete_vehicle(connection, vehicle_id)
+            changes['removed'] += 1
+
+        connection.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', [
+            ('version', index.version),
+            ('fingerprints', json.dumps(index.fingerprints)),
+            ('contact_info', index.contact_info),
+        ])
+        return changes
+
+    @staticmethod
+    def _delete_vehicle(connection: sqlite3.Connection, vehicle_id: str):
+        key = f"truck:{vehicle_id}"
+        connection.execute('DELETE FROM documents_fts WHERE rowid IN (SELECT id FROM documents WHERE key = ?)', (key,))
+        connection.execute('DELETE FROM documents WHERE key = ?', (key,))
+        connection.execute('DELETE FROM name_words WHERE vehicle_id = ?', (vehicle_id,))
+        connection.execute('DELETE FROM vehicles WHERE id = ?', (vehicle_id,))
+
+    def start_watching(self, interval: float):
+        """Start the background data/ watcher once per process (interval <= 0 disables it)"""
+        if interval <= 0 or self._watcher is not None:
+            return
+        from .data_watcher import DataWatcher
+        self._watcher = DataWatcher(self, interval)
+        self._watcher.start()
+
+    def __getattr__(self, name):
+        # Single-attribute reads go to the current snapshot
+        return getattr(self.current, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load data/ into the SQLite knowledge store')
+    parser.add_argument('--data', type=Path, default=DATA_PATH)
+    parser.add_argument('--output', type=Path, help=f'default: <data>/{SQLITE_FILE}')
+    args = parser.parse_args()
+    output = args.output or args.data / SQLITE_FILE
+
+    started = time.perf_counter()
+    store = SqliteKnowledgeStore(output, args.data)
+    if store.meta('version') is None:
+        print(f"Could not load {args.data} into {output}, see the log for errors", file=sys.stderr)
+        sys.exit(1)
+    print(f"{output} is at version {store.version} ({len(store.current.vehicles)} vehicles, "
+          f"{output.stat().st_size / 2**20:.1f} MB) after {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
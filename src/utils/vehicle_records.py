@@ -0,0 +1,172 @@
+"""
+Compact inventory storage: frozen slotted vehicle records and tuple-backed
+source tables, with repeated strings interned
+"""
+import sys
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+from pydantic import ValidationError
+from ..core.models import Truck, TruckType
+from ..core.logger import app_logger
+
+# Longer cell values (feature lists, descriptions) are rarely repeated verbatim
+MAX_INTERN_LENGTH = 64
+
+# Truck fields a listing can do without: an out-of-range value is dropped, not the vehicle
+OPTIONAL_FIELDS = frozenset({'price', 'year', 'image_url'})
+
+
+def intern_text(value: Any, max_length: Optional[int] = None) -> Any:
+    """sys.intern for strings (up to max_length), other values unchanged"""
+    if isinstance(value, str) and (max_length is None or len(value) <= max_length):
+        return sys.intern(value)
+    return value
+
+
+def truck_type(name: str) -> TruckType:
+    lowered = name.lower()
+    if 'tackbox' in lowered:
+        return TruckType.TACKBOX
+    if 'groom' in lowered:
+        return TruckType.GROOM_SUITE
+    if 'trailer' in lowered:
+        return TruckType.TRAILER
+    return TruckType.HORSEBOX
+
+
+@dataclass(frozen=True)
+class VehicleRecord:
+    """One canonical vehicle as served to search"""
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = (
+        'id', 'name', 'condition', 'price', 'capacity', 'horses', 'brand', 'chassis', 'weight', 'year',
+        'mileage', 'features', 'options', 'description', 'image_url', 'url', 'sources', 'aliases',
+    )
+
+    id: str
+    name: str
+    condition: str
+    price: Optional[int]
+    capacity: str
+    horses: Optional[int]
+    brand: Optional[str]
+    chassis: Optional[str]
+    weight: Optional[str]
+    year: Optional[int]
+    mileage: Optional[int]
+    features: str
+    options: str
+    description: str
+    image_url: str
+    url: str
+    sources: Tuple[str, ...]
+    aliases: Tuple[str, ...]
+
+    def __getstate__(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: Tuple):
+        # Frozen: the generated __setattr__ refuses assignment, as in __init__
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+    @property
+    def is_used(self) -> bool:
+        return self.condition.lower() in ('used', 'second-hand')
+
+
+def _price(value: Any) -> Optional[int]:
+    try:
+        return int(float(value)) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def build_record(vehicle: Dict[str, Any]) -> VehicleRecord:
+    """Validate a merged vehicle dict against the Truck schema and freeze it"""
+    fields = dict(
+        id=vehicle['id'],
+        name=vehicle['name'],
+        price=_price(vehicle.get('price')),
+        year=vehicle.get('year'),
+        condition=vehicle['condition'],
+        type=truck_type(vehicle['name']),
+        capacity=str(vehicle.get('capacity') or ''),
+        description=vehicle.get('description') or '',
+        image_url=vehicle.get('image_url') or None,
+        url=vehicle.get('url') or None
+    )
+    try:
+        truck = Truck(**fields)
+    except ValidationError as e:
+        invalid = {error['loc'][0] for error in e.errors()}
+        if not invalid <= OPTIONAL_FIELDS:
+            raise
+        app_logger.warning(f"Vehicle {vehicle['id']}: ignoring invalid {', '.join(sorted(invalid))}: "
+                           f"{e.errors()[0]['msg']}")
+        truck = Truck(**{**fields, **dict.fromkeys(invalid)})
+    return VehicleRecord(
+        id=truck.id,
+        name=truck.name,
+        condition=intern_text(truck.condition.value),
+        price=truck.price,
+        capacity=intern_text(truck.capacity),
+        horses=vehicle.get('horses'),
+        brand=intern_text(vehicle.get('brand')),
+        chassis=intern_text(vehicle.get('chassis')),
+        weight=intern_text(vehicle.get('weight')),
+        year=truck.year,
+        mileage=vehicle.get('mileage'),
+        # Listings of the same model share their feature and option text
+        features=intern_text(vehicle.get('features') or ''),
+        options=intern_text(vehicle.get('options') or ''),
+        description=truck.description,
+        image_url=intern_text(truck.image_url or ''),
+        url=truck.url or '',
+        sources=tuple(intern_text(source) for source in vehicle.get('sources', ())),
+        aliases=tuple(vehicle.get('aliases', ()))
+    )
+
+
+def build_records(vehicles: Dict[str, Dict[str, Any]]) -> Dict[str, VehicleRecord]:
+    """Records for every vehicle that passes the ingest schema; the rest are logged and skipped"""
+    records: Dict[str, VehicleRecord] = {}
+    for vehicle_id, vehicle in vehicles.items():
+        if not vehicle.get('name') or not vehicle.get('url'):
+            app_logger.warning(f"Skipping vehicle {vehicle_id}: no name or URL")
+            continue
+        try:
+            records[vehicle_id] = build_record(vehicle)
+        except ValidationError as e:
+            app_logger.warning(f"Skipping vehicle {vehicle_id}: {e.error_count()} schema errors: {e.errors()[0]['msg']}")
+    return records
+
+
+class CsvTable:
+    """
+    Rows of a source CSV as tuples under one shared column list. Iterating
+    yields a dict per row, so it can stand in for DataFrame.to_dict('records').
+    """
+
+    __slots__ = ('columns', 'rows', '_positions')
+
+    def __init__(self, columns: List[str], rows: List[Tuple[Any, ...]]):
+        self.columns = tuple(intern_text(column) for column in columns)
+        self.rows = [tuple(intern_text(cell, MAX_INTERN_LENGTH) for cell in row) for row in rows]
+        self._positions = {column: i for i, column in enumerate(self.columns)}
+
+    @classmethod
+    def from_frame(cls, df) -> 'CsvTable':
+        # tolist() yields Python scalars rather than NumPy ones
+        return cls(list(df.columns), list(zip(*(df[column].tolist() for column in df.columns))))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in self.rows:
+            yield dict(zip(self.columns, row))
+
+    def column(self, name: str) -> List[Any]:
+        position = self._positions[name]
+        return [row[position] for row in self.rows]
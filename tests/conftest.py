@@ -0,0 +1,74 @@
+"""
+Shared fixtures. Importing src.utils.inventory_index builds the app's global
+index, so it is kept in memory without a knowledge snapshot before anything
+from src is imported; every index under test is built from a temp copy of data/.
+"""
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+os.environ['USE_KNOWLEDGE_SNAPSHOT'] = 'false'
+os.environ['KNOWLEDGE_BACKEND'] = 'memory'
+
+from src.utils.inventory_index import InventoryIndex, DATA_PATH, SOURCE_FILES  # noqa: E402
+
+# Queries covering every retrieval path: facets, typos, synonyms, dealers, contact and no match
+QUERIES = [
+    'Show me used trucks available', 'dealers in Germany', 'scanai', 'renualt master', "camion d'occasion",
+    'used 6-horse under 7.5T from 2022 or newer', 'contact phone', '2 horse trucks', 'stx dealers',
+    'where is your office', 'used truck 3 years old', 'scania from 2022', 'tackbox', 'paardenwagen',
+    'camión usado', 'ketterer dealer uk', 'new trucks under 7.5 tonnes', 'zzqx nothing matches',
+]
+
+
+def copy_sources(target: Path) -> Path:
+    """The source files of data/ (no snapshots or databases) copied into target"""
+    target.mkdir(parents=True, exist_ok=True)
+    for file_name in SOURCE_FILES:
+        if (DATA_PATH / file_name).exists():
+            shutil.copyfile(DATA_PATH / file_name, target / file_name)
+    return target
+
+
+def run_concurrently(count: int, target):
+    """Call target from count threads released together; returns (results, errors)"""
+    barrier = threading.Barrier(count)
+    results, errors = [], []
+
+    def run():
+        barrier.wait()
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+@pytest.fixture(scope='session')
+def session_data(tmp_path_factory) -> Path:
+    return copy_sources(tmp_path_factory.mktemp('data'))
+
+
+@pytest.fixture(scope='session')
+def memory_index(session_data) -> InventoryIndex:
+    index = InventoryIndex(session_data)
+    assert not index.load_errors
+    return index
+
+
+@pytest.fixture
+def data_dir(tmp_path) -> Path:
+    """A private copy of data/ a test may modify"""
+    return copy_sources(tmp_path / 'data')
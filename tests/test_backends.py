@@ -0,0 +1,143 @@
+import contextlib
+import gc
+import io
+import weakref
+
+from src.utils.data_watcher import DataWatcher
+from src.utils.inventory_index import InventoryIndex, LiveInventoryIndex
+from src.utils.mapped_snapshot import MappedInventoryIndex
+from src.utils.smart_search import _search
+from src.utils.sqlite_store import SqliteKnowledgeStore
+from tests.conftest import QUERIES
+
+
+def _results(index, query):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _search(index, query, 8)
+
+
+def _summary(results):
+    return [(result['type'], result['title'], round(result['score'], 6)) for result in results]
+
+
+def _entries(results):
+    return sorted((result['type'], result.get('id') or result['title']) for result in results)
+
+
+def _break_csv(data_dir):
+    """Append a row with too many fields; returns the original file to restore"""
+    path = data_dir / 'trucks.csv'
+    original = path.read_bytes()
+    path.write_bytes(original + b'\n' + b'broken,' * 20 + b'\n')
+    return original
+
+
+def _edit_csv(data_dir):
+    path = data_dir / 'trucks.csv'
+    text = path.read_text(encoding='utf-8')
+    path.write_text(text.replace('Scania', 'Scanía', 1), encoding='utf-8')
+
+
+def test_live_reload_rejects_malformed_csv(data_dir):
+    live = LiveInventoryIndex(data_dir)
+    version = live.version
+    _break_csv(data_dir)
+    assert live.reload() is False
+    assert live.version == version
+
+
+def test_live_reload_swaps_in_changes(data_dir):
+    live = LiveInventoryIndex(data_dir)
+    reader = live.current
+    _edit_csv(data_dir)
+    assert live.reload(changed_files=['trucks.csv']) is True
+    assert live.version != reader.version
+    assert live.version == InventoryIndex(data_dir).version
+    # Only the file the watcher reported was parsed again
+    assert live.current._parsed['new_trucks.csv'] is reader._parsed['new_trucks.csv']
+    assert live.reload() is False
+
+
+def test_watcher_reloads_only_changed_content(data_dir):
+    live = LiveInventoryIndex(data_dir)
+    watcher = DataWatcher(live)
+    # First check: every file is hashed, and matches the live snapshot
+    assert watcher.check_once() is False
+    # A touched file with the same content is not reloaded
+    (data_dir / 'contact.txt').touch()
+    assert watcher.changed_files() == []
+    _edit_csv(data_dir)
+    assert watcher.check_once() is True
+    assert live.version == InventoryIndex(data_dir).version
+
+
+def test_mapped_snapshot_matches_memory(memory_index, session_data, tmp_path):
+    mapped = LiveInventoryIndex(session_data, snapshot_path=tmp_path / 'knowledge.mmap', mapped=True).current
+    assert isinstance(mapped, MappedInventoryIndex)
+    assert mapped.version == memory_index.version
+    for query in QUERIES:
+        assert _summary(_results(mapped, query)) == _summary(_results(memory_index, query)), query
+
+
+def test_mapped_reload_rejects_malformed_csv_and_remaps_changes(data_dir, tmp_path):
+    live = LiveInventoryIndex(data_dir, snapshot_path=tmp_path / 'knowledge.mmap', mapped=True)
+    version = live.version
+    original = _break_csv(data_dir)
+    assert live.reload() is False
+    assert live.version == version
+
+    (data_dir / 'trucks.csv').write_bytes(original)
+    _edit_csv(data_dir)
+    assert live.reload() is True
+    assert isinstance(live.current, MappedInventoryIndex)
+    # A second worker maps the file the first one wrote
+    other = LiveInventoryIndex(data_dir, snapshot_path=tmp_path / 'knowledge.mmap', mapped=True)
+    assert other.version == live.version
+
+
+def test_replaced_mapping_stays_readable_until_released(data_dir, tmp_path):
+    live = LiveInventoryIndex(data_dir, snapshot_path=tmp_path / 'knowledge.mmap', mapped=True)
+    reader = live.current
+    buffer = weakref.ref(reader._buffer)
+    _edit_csv(data_dir)
+    assert live.reload() is True
+
+    # A request that took the old snapshot before the swap still reads it
+    assert _results(reader, 'scania from 2022')
+    del reader
+    gc.collect()
+    assert buffer() is None
+
+
+def test_sqlite_store_returns_the_memory_results(memory_index, session_data, tmp_path):
+    store = SqliteKnowledgeStore(tmp_path / 'knowledge.db', session_data)
+    assert store.version == memory_index.version
+    # FTS5 ranks on its own scale, so only the returned entries are compared
+    for query in QUERIES:
+        assert _entries(_results(store.current, query)) == _entries(_results(memory_index, query)), query
+
+
+def test_sqlite_reload_rejects_malformed_csv(data_dir, tmp_path):
+    store = SqliteKnowledgeStore(tmp_path / 'knowledge.db', data_dir)
+    version = store.version
+    original = _break_csv(data_dir)
+    assert store.reload() is False
+    assert store.meta('version') == version
+
+    (data_dir / 'trucks.csv').write_bytes(original)
+    _edit_csv(data_dir)
+    assert store.reload() is True
+    assert store.meta('version') == InventoryIndex(data_dir).version
+    # Already in sync: nothing is parsed again
+    assert store.reload() is False
+
+
+def test_sqlite_sync_writes_only_changed_vehicles(data_dir, tmp_path):
+    store = SqliteKnowledgeStore(tmp_path / 'knowledge.db', data_dir)
+    assert store.sync(InventoryIndex(data_dir)) == {'added': 0, 'updated': 0, 'removed': 0}
+
+    path = data_dir / 'trucks.csv'
+    path.write_text(path.read_text(encoding='utf-8').replace(',180000,', ',185000,', 1), encoding='utf-8')
+    index = InventoryIndex(data_dir)
+    assert store.sync(index) == {'added': 0, 'updated': 1, 'removed': 0}
+    assert store.meta('version') == index.version
@@ -0,0 +1,32 @@
+from src.utils.boilerplate import estimate_tokens, strip_boilerplate, strip_page_boilerplate
+
+CHROME = 'Manage Consent To provide the best experiences we use technologies like cookies'
+PAGES = [
+    f"{CHROME} STX Groom Suite Brand: STX Horses: 2",
+    f"{CHROME} KETTERER Exclusive Brand: Ketterer Horses: 6",
+    f"{CHROME} AKX Horsebox Brand: AKX Horses: 4",
+]
+
+
+def test_text_shared_by_most_pages_is_removed():
+    assert strip_boilerplate(PAGES) == [page[len(CHROME) + 1:] for page in PAGES]
+    # A single page has nothing to compare against
+    assert strip_boilerplate(PAGES[:1]) == PAGES[:1]
+
+
+def test_detail_file_is_cleaned_by_url():
+    text = 'URL\tTitle\tContent\tWord Count\n' + '\n'.join(
+        f"https://example.com/{i}\tTitle {i}\t{page}\t10" for i, page in enumerate(PAGES))
+    cleaned, by_url, report = strip_page_boilerplate(text)
+    assert cleaned.startswith('URL\tTitle\tContent\tWord Count\n')
+    assert by_url['https://example.com/1'] == 'KETTERER Exclusive Brand: Ketterer Horses: 6'
+    assert report['pages'] == 3
+    assert report['bytes_saved'] == 3 * (len(CHROME) + 1)
+    assert report['tokens_saved'] == estimate_tokens(text) - estimate_tokens(cleaned)
+
+
+def test_loaded_detail_pages_keep_their_specs(memory_index):
+    assert all(report['bytes_saved'] > 0 for report in memory_index.boilerplate_reports.values())
+    for detail in memory_index.details_by_url.values():
+        assert 'Manage Consent' not in detail.content
+        assert detail.name and detail.specs
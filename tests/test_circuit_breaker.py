@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+from src.core.exceptions import CircuitOpenError
+from src.utils.ai_service import AIService
+from src.utils.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from src.utils.fallback_responder import FallbackResponder
+from src.utils.language_manager import language_manager
+
+
+class Transient(Exception):
+    pass
+
+
+def _breaker(**options):
+    defaults = dict(failure_threshold=2, reset_timeout=0.05, max_retries=0, backoff=0.001, retry_on=(Transient,))
+    defaults.update(options)
+    return CircuitBreaker('test', **defaults)
+
+
+def _fail(error):
+    def call():
+        raise error
+    return call
+
+
+def test_breaker_opens_after_threshold_and_rejects():
+    breaker = _breaker()
+    for _ in range(2):
+        with pytest.raises(Transient):
+            breaker.call(_fail(Transient()))
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: 'never called')
+    assert breaker.rejected == 1
+
+
+def test_breaker_half_open_probe_closes_or_reopens():
+    breaker = _breaker()
+    for _ in range(2):
+        with pytest.raises(Transient):
+            breaker.call(_fail(Transient()))
+    time.sleep(0.06)
+    with pytest.raises(Transient):
+        breaker.call(_fail(Transient()))
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+
+def test_breaker_retries_transient_errors():
+    breaker = _breaker(max_retries=2)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Transient()
+        return 'ok'
+
+    assert breaker.call(flaky) == 'ok'
+    assert len(attempts) == 3
+    assert breaker.failures == 0
+
+
+def test_breaker_ignores_non_transient_errors():
+    breaker = _breaker()
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            breaker.call(_fail(ValueError('bad request')))
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+
+def test_breaker_counts_timeouts():
+    breaker = _breaker()
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            breaker.call(_fail(TimeoutError()))
+    assert breaker.state == OPEN
+
+
+def test_interrupted_probe_lets_the_next_caller_probe():
+    breaker = _breaker()
+    for _ in range(2):
+        with pytest.raises(Transient):
+            breaker.call(_fail(Transient()))
+    time.sleep(0.06)
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(_fail(KeyboardInterrupt()))
+    assert breaker.state == HALF_OPEN
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED
+
+
+def test_stream_failure_mid_way_counts_once_started():
+    breaker = _breaker(failure_threshold=1)
+
+    def chunks():
+        yield 'a'
+        raise Transient()
+
+    stream = breaker.stream(chunks)
+    assert next(stream) == 'a'
+    with pytest.raises(Transient):
+        next(stream)
+    assert breaker.state == OPEN
+
+
+def test_fallback_renders_the_prompt_results_in_the_session_language():
+    truck = {'type': 'truck', 'title': 'STX Groom Suite', 'capacity': '2 horses', 'condition': 'New',
+             'year': 2021, 'url': 'https://stephexhorsetrucks.com/vehicles/stx-groom-suite/'}
+    dealer = {'type': 'dealer', 'title': 'STX Dealer - Belgium', 'content': 'Verpas, Torhout'}
+    answer = FallbackResponder().respond('groom suite', {'search_results': [truck, dealer]}, 'fr')
+    assert answer.startswith(language_manager.get_text('fallback_intro', 'fr'))
+    assert '**STX Groom Suite**\n2 horses · New · 2021' in answer
+    assert language_manager.get_text('view_details', 'fr') in answer
+    assert '**STX Dealer - Belgium**\nVerpas, Torhout' in answer
+
+
+def test_open_circuit_answers_from_the_search_results(monkeypatch):
+    service = AIService()
+    service.model = object()
+    # The prompt's search results are the ones in the context
+    monkeypatch.setattr(service, '_create_prompt', lambda message, context, language: 'prompt: open circuit')
+    service.breaker = _breaker(failure_threshold=1)
+    with pytest.raises(Transient):
+        service.breaker.call(_fail(Transient()))
+    context = {'search_results': [{'type': 'contact', 'content': 'Call +32 50 21 67 29'}]}
+    answer = service.generate_response('anything new?', context, 'en')
+    assert answer.endswith('Call +32 50 21 67 29')
+    assert service.breaker.rejected == 1
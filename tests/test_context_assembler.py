@@ -0,0 +1,32 @@
+import contextlib
+import io
+
+from src.utils.context_assembler import ContextAssembler
+from src.utils.smart_search import _search
+
+
+def _results(index, query, max_results=20):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _search(index, query, max_results)
+
+
+def test_context_stays_within_the_token_budget(memory_index):
+    results = _results(memory_index, 'Show me used trucks available')
+    assembler = ContextAssembler(token_budget=200)
+    context, consumed, tokens = assembler.assemble('used trucks', results, memory_index.vehicles)
+    assert 0 < consumed < len(results)
+    assert tokens <= 200
+
+
+def test_first_result_always_goes_in(memory_index):
+    results = _results(memory_index, 'scania from 2022')
+    context, consumed, _ = ContextAssembler(token_budget=1).assemble('scania', results, memory_index.vehicles)
+    assert consumed == 1
+    assert context.startswith(f"TRUCK: {results[0]['title']}")
+
+
+def test_repeated_passages_are_kept_once():
+    dealer = {'type': 'dealer', 'title': 'STX Dealer - Belgium', 'content': 'Stephex, Brussels, +32 2 000 00 00'}
+    context, consumed, _ = ContextAssembler(token_budget=1000).assemble('stx dealer', [dealer, dict(dealer)])
+    assert consumed == 2
+    assert context.count('DEALER:') == 1
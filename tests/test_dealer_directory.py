@@ -0,0 +1,50 @@
+import contextlib
+import io
+
+from src.utils.dealer_directory import DealerDirectory, find_countries, parse_dealer_file
+from src.utils.smart_search import _search
+
+DEALER_LIST = """DEALER-LIST_NAME,
+DEALER-LIST ADDRESS,
+#
+1
+Verpas Horsetrucks and Trailers✏️
+2
+Kingsrød ApS✏️
+Ambachtstraat 9, 8820 Torhout, Belgium
++32 50 21 67 29✏️
+Hestehavevej 22, Hillerød, Den...
++45 209 98 484✏️
+3
+Horse Trucks Ltd
+Unit 4, Newmarket
++44 1638 000000
+"""
+
+
+def test_interleaved_entries_get_their_own_address_and_phone():
+    verpas, kingsrod, uk = parse_dealer_file('STX', DEALER_LIST)
+    assert (verpas.name, verpas.country, verpas.phone) == ('Verpas Horsetrucks and Trailers', 'Belgium', '+32 50 21 67 29')
+    # Truncated address tail, then the phone prefix when the address names no country
+    assert (kingsrod.name, kingsrod.country) == ('Kingsrød ApS', 'Denmark')
+    assert uk.country == 'United Kingdom'
+
+
+def test_countries_found_in_any_language():
+    assert find_countries('dealers in Deutschland or the UK?') == ['Germany', 'United Kingdom']
+    assert find_countries('ukulele') == []
+
+
+def test_lookup_by_country_and_brand(memory_index):
+    directory = memory_index.dealer_directory
+    assert directory.in_country('allemagne') == directory.by_country['Germany']
+    stx_uk = directory.lookup(countries=['United Kingdom'], brands=['stx'])
+    assert stx_uk and all(dealer.brand == 'STX' and 'United Kingdom' in dealer.countries for dealer in stx_uk)
+    assert DealerDirectory().lookup(countries=['Germany']) == []
+
+
+def test_country_queries_return_that_countrys_dealers(memory_index):
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = _search(memory_index, 'dealers in Germany', 8)
+    dealers = [result for result in results if result['type'] == 'dealer']
+    assert dealers and all(result['title'].endswith('Germany') for result in dealers)
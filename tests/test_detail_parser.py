@@ -0,0 +1,35 @@
+from src.utils.chat_utils import format_truck_info
+from src.utils.detail_parser import normalize_key, parse_detail_file
+
+PAGE = (
+    'https://stephexhorsetrucks.com/vehicles/ketterer-actros-6-horses/\t'
+    'FOR SALE I Second-Hand KETTERER Exclusive - 6 horses I Stephex Horsetrucks\t'
+    'Manage Consent Back KETTERER Exclusive - 6 horses Brand: Ketterer Chassis: Mercedes Actros '
+    'Weight: 26T Horses: 6 Year: 2019 Mileage: 148.000 km Features Horse Area Rubber flooring '
+    'Skylights Living Area Shower Toilet GET YOUR OFFER Options Air suspension Generator Share: Facebook\t'
+    '412'
+)
+
+
+def test_detail_page_becomes_a_typed_record():
+    detail, = parse_detail_file('URL\tTitle\tContent\tWord Count\n' + PAGE + '\nnot a page\n')
+    assert detail.title == 'KETTERER Exclusive - 6 horses'
+    assert detail.name == 'KETTERER Exclusive - 6 horses'
+    assert (detail.brand, detail.chassis, detail.weight) == ('Ketterer', 'Mercedes Actros', '26T')
+    assert (detail.horses, detail.year, detail.mileage, detail.word_count) == (6, 2019, 148000, 412)
+    assert detail.features == ['Rubber flooring', 'Skylights', 'Shower', 'Toilet']
+    assert detail.options == ['Air suspension', 'Generator']
+
+
+def test_details_are_keyed_by_url_and_name(memory_index):
+    assert memory_index.details_by_url
+    for url, detail in memory_index.details_by_url.items():
+        assert detail.url == url
+        assert memory_index.details_by_name[normalize_key(detail.name)].url
+    assert normalize_key('STX  Horsebox – 6') == 'stx horsebox - 6'
+
+
+def test_truck_info_leaves_out_unknown_price_and_year():
+    text = format_truck_info({'name': 'STX Groom Suite', 'price': None, 'year': None, 'condition': 'New'})
+    assert 'Price' not in text and 'Year' not in text
+    assert '- Price: $95,000' in format_truck_info({'name': 'STX Groom Suite', 'price': 95000})
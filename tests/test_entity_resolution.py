@@ -0,0 +1,40 @@
+from src.utils.entity_resolution import canonical_id, lookup_vehicle, resolve_vehicles
+from src.utils.inventory_index import InventoryIndex
+
+NAME = 'STX HORSEBOX Scania P 420 Super 6 Horses'
+URL = 'https://stephexhorsetrucks.com/vehicles/stx-horsebox-scania-p-420-super-6-horses/'
+
+
+def test_name_variants_and_urls_resolve_to_one_vehicle():
+    trucks = [{'name': NAME, 'condition': 'New', 'price': '180000', 'capacity': '6 horses', 'url': URL}]
+    new_trucks = [{'Name': 'stx horsebox scania p 420 super 6 horse', 'Brand': 'STX', 'Horses': '6', 'Year': '2025'}]
+    used_trucks = [{'News__item-button-visible': 'For sale I STX HORSEBOX Scania P 420 Super 6 Horses',
+                    'News__item URL': URL}]
+    vehicles, aliases = resolve_vehicles(trucks, new_trucks, used_trucks, [])
+
+    assert list(vehicles) == [canonical_id(NAME)]
+    vehicle = vehicles[canonical_id(NAME)]
+    assert (vehicle['brand'], vehicle['horses'], vehicle['year']) == ('STX', 6, 2025)
+    assert lookup_vehicle(vehicles, aliases, url=URL) is vehicle
+    assert lookup_vehicle(vehicles, aliases, name='Stx Horsebox Scania P 420 Super 6 Horse') is vehicle
+
+
+def test_malformed_cells_leave_the_field_empty():
+    new_trucks = [{'Name': NAME, 'Horses': 'six', 'Year': '2024/25'}]
+    vehicle, = resolve_vehicles([], new_trucks, [], [])[0].values()
+    assert vehicle['year'] is None
+    # The horse count still comes from the name
+    assert vehicle['horses'] == 6
+
+
+def test_malformed_year_cell_keeps_every_vehicle(memory_index, data_dir):
+    with (data_dir / 'trucks.csv').open('a', encoding='utf-8') as csv_file:
+        csv_file.write('\n99,STX Test Horsebox 4 Horses,New,120000,4 horses,,https://example.com/stx-test/\n')
+    with (data_dir / 'new_trucks.csv').open('a', encoding='utf-8') as csv_file:
+        csv_file.write('STX Test Horsebox 4 Horses,STX,Scania P,18T,,,,4,2024/25,,,,,,\n')
+
+    index = InventoryIndex(data_dir)
+    assert not index.load_errors
+    assert set(index.vehicles) == set(memory_index.vehicles) | {'stx-test-horsebox-4-horse'}
+    vehicle = index.vehicles['stx-test-horsebox-4-horse']
+    assert (vehicle.year, vehicle.horses) == (None, 4)
@@ -0,0 +1,28 @@
+import contextlib
+import io
+
+from src.utils.fuzzy_match import TrigramIndex, index_words
+from src.utils.smart_search import _search
+
+
+def _truck_titles(index, query):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [result['title'] for result in _search(index, query, 8) if result['type'] == 'truck']
+
+
+def test_misspelled_words_match_their_vocabulary_word():
+    index = TrigramIndex()
+    index.add('scania-p', 'STX Horsebox Scania P 420')
+    index.add('renault', 'STX 2 Horses Renault Master')
+    assert index.similar_words('scanai')[0][0] == 'scania'
+    assert [key for key, _ in index.search('renualt mastr')] == ['renault']
+    # Exact vocabulary words are left to the regular search
+    assert index.search('scania') == []
+    assert index_words('P 420 Scania-Horsebox') == {'scania', 'horsebox'}
+
+
+def test_typo_queries_find_the_named_trucks(memory_index):
+    titles = _truck_titles(memory_index, 'scanai')
+    assert titles and 'scania' in titles[0].lower()
+    titles = _truck_titles(memory_index, 'renualt master')
+    assert titles and 'renault master' in titles[0].lower()
@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from src.utils.gemini_client import AsyncGeminiClient
+from tests.conftest import run_concurrently
+
+
+class FakeModel:
+    """Async model stand-in that records how many calls overlap"""
+
+    def __init__(self, delay=0.05, chunks=('Hello', ' world')):
+        self.delay = delay
+        self.chunks = chunks
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content_async(self, prompt, stream=False, **options):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if stream:
+            return self._stream()
+        return f"answer to {prompt}"
+
+    async def _stream(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+
+def test_calls_beyond_the_limit_wait_for_a_slot():
+    client = AsyncGeminiClient(max_concurrent=2, timeout=5)
+    model = FakeModel()
+    results, errors = run_concurrently(6, lambda: client.generate(model, 'q'))
+    assert not errors
+    assert results == ['answer to q'] * 6
+    assert model.peak == 2
+    assert client.stats() == {'in_flight': 0, 'queued': 0, 'max_concurrent': 2}
+
+
+def test_a_call_without_a_free_slot_times_out():
+    client = AsyncGeminiClient(max_concurrent=1, timeout=0.2)
+
+    async def hold_slot():
+        await client._acquire()
+        await asyncio.sleep(1)
+        client._release()
+
+    client.submit(hold_slot())
+    time.sleep(0.05)
+    with pytest.raises(TimeoutError, match='No free Gemini slot'):
+        client.generate(FakeModel(), 'q')
+    assert client.stats()['queued'] == 0
+
+
+def test_stream_yields_chunks_and_frees_its_slot():
+    client = AsyncGeminiClient(max_concurrent=1, timeout=5)
+    assert list(client.stream(FakeModel(), 'q')) == ['Hello', ' world']
+    # The slot is free again for the next call
+    assert client.generate(FakeModel(), 'q') == 'answer to q'
+    assert client.stats()['in_flight'] == 0
@@ -0,0 +1,40 @@
+import time
+
+from src.utils.prompt_cache import LocalContentCache, PromptCache, system_instruction
+from tests.conftest import run_concurrently
+
+
+def test_prompt_cache_builds_once_per_language():
+    class SlowCache(LocalContentCache):
+        creates = []
+
+        def create(self, model, system_instruction, ttl):
+            self.creates.append(model)
+            time.sleep(0.1)
+            return super().create(model, system_instruction, ttl)
+
+    prompts = PromptCache('gemini-2.5-flash', mode='local', ttl=3600)
+    prompts.content_cache = SlowCache()
+    results, errors = run_concurrently(8, lambda: prompts.model_for('en'))
+    assert not errors
+    assert len(SlowCache.creates) == 1
+    assert len({id(model) for model in results}) == 1
+    assert prompts.model_for('fr') is not results[0]
+    assert len(SlowCache.creates) == 2
+
+
+def test_prompt_cache_falls_back_to_a_system_instruction():
+    class RefusingCache(LocalContentCache):
+        def create(self, model, system_instruction, ttl):
+            raise RuntimeError('below the minimum cacheable size')
+
+    prompts = PromptCache('gemini-2.5-flash', mode='local')
+    prompts.content_cache = RefusingCache()
+    assert prompts.model_for('fr')._system_instruction
+
+
+def test_expired_entries_are_rebuilt():
+    prompts = PromptCache('gemini-2.5-flash', mode='local', ttl=0)
+    first = prompts.model_for('it')
+    assert prompts.model_for('it') is not first
+    assert system_instruction('it') is system_instruction('it')
@@ -0,0 +1,22 @@
+import contextlib
+import io
+
+from src.utils.query_translation import query_translator
+from src.utils.smart_search import _search
+
+
+def test_synonyms_apply_in_their_session_language_only():
+    assert query_translator.translate("camion d'occasion", 'fr') == 'truck used'
+    assert query_translator.translate('dove sono', 'it') == 'where sono'
+    assert query_translator.translate('Any occasion at the bureau', 'en') == 'any occasion at the bureau'
+    assert query_translator.translate('dove', 'en') == 'dove'
+    assert query_translator.translate('usado', 'fr') == 'usado'
+    # Unknown language: every table
+    assert query_translator.translate('camión usado') == 'truck used'
+
+
+def test_translated_queries_search_like_english(memory_index):
+    with contextlib.redirect_stdout(io.StringIO()):
+        spanish = _search(memory_index, 'camión usado', 8, 'es')
+        english = _search(memory_index, 'truck used', 8, 'en')
+    assert spanish and [r['title'] for r in spanish] == [r['title'] for r in english]
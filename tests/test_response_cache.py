@@ -0,0 +1,56 @@
+import time
+
+from src.utils.response_cache import ResponseCache
+from tests.conftest import run_concurrently
+
+
+class Transient(Exception):
+    pass
+
+
+def test_identical_requests_share_one_generation():
+    cache = ResponseCache(max_size=10, ttl=60)
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'answer'
+
+    results, errors = run_concurrently(8, lambda: cache.get_or_generate('key', generate))
+    assert not errors
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert {text for text, _ in results} == {'answer'}
+    assert cache.get_or_generate('key', generate) == ('answer', True)
+    assert len(calls) == 1
+
+
+def test_coalesced_errors_reach_every_caller_and_are_not_cached():
+    cache = ResponseCache(max_size=10, ttl=60)
+
+    def generate():
+        time.sleep(0.1)
+        raise Transient()
+
+    results, errors = run_concurrently(4, lambda: cache.get_or_generate('key', generate))
+    assert not results
+    assert len(errors) == 4 and all(isinstance(error, Transient) for error in errors)
+    assert cache.get_or_generate('key', lambda: 'retried') == ('retried', False)
+
+
+def test_streams_coalesce_and_cache_the_joined_text():
+    cache = ResponseCache(max_size=10, ttl=60)
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        yield 'Hello'
+        yield ' world'
+
+    results, errors = run_concurrently(4, lambda: ''.join(cache.stream('key', generate)))
+    assert not errors
+    assert len(calls) == 1
+    assert results == ['Hello world'] * 4
+    assert cache.get_or_generate('key', generate) == ('Hello world', True)
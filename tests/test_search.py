@@ -0,0 +1,71 @@
+import contextlib
+import io
+
+from src.utils.facet_index import parse_facets
+from src.utils.smart_search import _candidates, _plan_query, _search, search_knowledge_many
+from tests.conftest import QUERIES
+
+FACET_QUERIES = ['used trucks', '2 horse trucks', 'new trucks under 7.5 tonnes', 'scania from 2022',
+                 'used 6-horse under 7.5T from 2022 or newer', '3 horses']
+
+
+def _summary(results):
+    return [(result['type'], result['title'], round(result['score'], 6)) for result in results]
+
+
+def _results(index, query, max_results=8):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _search(index, query, max_results)
+
+
+def test_batch_search_matches_single_search(memory_index):
+    with contextlib.redirect_stdout(io.StringIO()):
+        batch = search_knowledge_many(QUERIES, max_results=8, index=memory_index)
+    for query, results in zip(QUERIES, batch):
+        assert _summary(results) == _summary(_results(memory_index, query)), query
+
+
+def test_batch_search_matches_single_search_across_batches(memory_index):
+    with contextlib.redirect_stdout(io.StringIO()):
+        batch = search_knowledge_many(QUERIES, max_results=5, index=memory_index, batch_size=4)
+    assert [_summary(results) for results in batch] == [_summary(_results(memory_index, q, 5)) for q in QUERIES]
+
+
+def test_facets_parsed_from_the_lowercased_query():
+    assert parse_facets('used 6-horse under 7.5t from 2022 or newer') == {
+        'condition': ['used'], 'horses': 6, 'weight_max': 7.5, 'year_min': 2022}
+    assert parse_facets('scania from 2022', chassis=['scania p']) == {'year_min': 2022, 'make': ['scania']}
+    assert parse_facets('tell me about your company') == {}
+
+
+def test_facet_queries_only_return_matching_vehicles(memory_index):
+    for query in FACET_QUERIES:
+        plan = _plan_query(query, memory_index)
+        assert plan['allowed'] is not None, query
+        for result in _results(memory_index, query, 20):
+            if result['type'] == 'truck':
+                assert memory_index.facets.contains(plan['allowed'], result['id']), (query, result['title'])
+
+
+def test_facet_queries_get_no_contact_passages(memory_index):
+    for query in FACET_QUERIES:
+        assert all(result['type'] != 'contact' for result in _results(memory_index, query, 20)), query
+
+
+def test_empty_facet_match_skips_the_catalogue_fallback(memory_index):
+    query = 'used 6-horse under 7.5T from 2022 or newer'
+    plan = _plan_query(query, memory_index)
+    assert not list(memory_index.facets.selected_ids(plan['allowed']))
+    assert _results(memory_index, query) == []
+
+
+def test_catalogue_fallback_only_without_facets(memory_index):
+    # With no text match at all, a general query falls back to the catalogue...
+    plan = _plan_query('suggest something', memory_index)
+    assert plan['allowed'] is None
+    assert {kind for _, kind, _ in _candidates(memory_index, plan, [])} == {'fallback'}
+    # ...while a faceted one keeps to the vehicles its filters select
+    plan = _plan_query('list used', memory_index)
+    entries = list(_candidates(memory_index, plan, []))
+    assert entries and all(kind == 'truck' for _, kind, _ in entries)
+    assert all(memory_index.facets.contains(plan['allowed'], ref) for _, _, ref in entries)
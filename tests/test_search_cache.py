@@ -0,0 +1,46 @@
+import contextlib
+import io
+
+from src.utils.search_cache import SearchCache, normalize_query, search_cache
+from src.utils.smart_search import _search, search_knowledge, search_knowledge_page
+
+
+def _titles(results):
+    return [result['title'] for result in results]
+
+
+def test_trivial_variants_share_a_key():
+    assert normalize_query('  STX   Dealers?! ') == normalize_query('stx dealers') == 'stx dealers'
+
+
+def test_variants_get_the_results_of_the_normalized_query(memory_index):
+    search_cache.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = _titles(_search(memory_index, 'stx dealers', 8))
+        first = search_knowledge('STX dealers?', index=memory_index)
+        hits = search_cache.hits
+        second = search_knowledge('stx  dealers', index=memory_index)
+        page, _ = search_knowledge_page('Stx dealers!', page_size=8, index=memory_index)
+    assert expected and any('STX' in title for title in expected)
+    assert _titles(first) == _titles(second) == _titles(page) == expected
+    assert search_cache.hits == hits + 1
+
+
+def test_entries_belong_to_one_index_version():
+    cache = SearchCache(max_size=2, ttl=60)
+    cache.put('v1', 'scania', 8, [{'title': 'Scania'}])
+    assert cache.get('v1', 'Scania?', 8) == [{'title': 'Scania'}]
+    assert cache.get('v1', 'scania', 8, language='fr') is None
+    assert cache.get('v2', 'scania', 8) is None
+    assert cache.get('v1', 'scania', 8) is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SearchCache(max_size=2, ttl=60)
+    for query in ('a', 'b'):
+        cache.put('v1', query, 8, [])
+    cache.get('v1', 'a', 8)
+    cache.put('v1', 'c', 8, [])
+    assert cache.get('v1', 'b', 8) is None
+    assert cache.get('v1', 'a', 8) == []
+    assert cache.evictions == 1
@@ -0,0 +1,29 @@
+from src.utils.semantic_index import build_semantic_index, paragraph_passages, split_passages, vehicle_passages
+
+
+def test_passages_respect_the_word_limit():
+    assert split_passages('a b c d e', max_words=2) == ['a b', 'c d', 'e']
+    text = 'one two\n\nthree four\n\n' + ' '.join(['x'] * 5)
+    assert paragraph_passages(text, max_words=4) == ['one two\n\nthree four', 'x x x x', 'x']
+
+
+def test_search_returns_vehicles_best_first(memory_index):
+    hits = memory_index.semantic.search('horsebox with shower and toilet', top_k=5)
+    assert 0 < len(hits) <= 5
+    assert all(vehicle_id in memory_index.vehicles for vehicle_id, _ in hits)
+    similarities = [similarity for _, similarity in hits]
+    assert similarities == sorted(similarities, reverse=True)
+    assert len({vehicle_id for vehicle_id, _ in hits}) == len(hits)
+
+
+def test_a_vehicles_own_description_finds_it(memory_index):
+    for vehicle in list(memory_index.vehicles.values())[:5]:
+        header = vehicle_passages(vehicle)[0][1]
+        # Listings of the same model share most of their header, so the top few are checked
+        assert vehicle.id in [vehicle_id for vehicle_id, _ in memory_index.semantic.search(header, top_k=3)]
+
+
+def test_build_is_deterministic(memory_index):
+    vehicles = list(memory_index.vehicles.values())
+    query = 'something for a long trip with living area'
+    assert build_semantic_index(vehicles).search(query) == build_semantic_index(vehicles).search(query)
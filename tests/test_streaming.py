@@ -0,0 +1,52 @@
+from src.components.ui_components import UIComponents
+from src.utils import ai_service as ai_service_module
+from src.utils.ai_service import AIService
+from src.utils.language_manager import language_manager
+
+
+def _service(monkeypatch, stream_model, prompt):
+    service = AIService()
+    service.model = object()
+    monkeypatch.setattr(service, '_create_prompt', lambda user_message, context, language: prompt)
+    monkeypatch.setattr(service, '_stream_model', lambda prompt, language: stream_model())
+    monkeypatch.setattr(ai_service_module.fallback_responder, 'respond', lambda *args: 'FALLBACK')
+    return service
+
+
+def test_chunks_are_yielded_as_they_arrive(monkeypatch):
+    def stream_model():
+        yield '  '
+        yield '\nHello'
+        yield ' world'
+
+    service = _service(monkeypatch, stream_model, 'prompt: streamed chunks')
+    assert list(service.generate_response_stream('hi', {})) == ['Hello', ' world']
+    # The joined answer was cached for the next identical prompt
+    assert service.generate_response('hi', {}) == 'Hello world'
+
+
+def test_failure_before_the_first_chunk_falls_back(monkeypatch):
+    def stream_model():
+        raise RuntimeError('upstream down')
+        yield
+
+    service = _service(monkeypatch, stream_model, 'prompt: failed stream')
+    assert list(service.generate_response_stream('hi', {})) == ['FALLBACK']
+
+
+def test_failure_mid_stream_keeps_the_partial_answer(monkeypatch):
+    def stream_model():
+        yield 'Half an'
+        raise RuntimeError('connection reset')
+
+    service = _service(monkeypatch, stream_model, 'prompt: broken stream')
+    assert list(service.generate_response_stream('hi', {}, 'es')) == [
+        'Half an', '\n\n' + language_manager.get_text('error_message', 'es')]
+
+
+def test_partial_markup_is_held_back_until_complete():
+    assert UIComponents._complete_prefix('Our **best') == 'Our '
+    assert UIComponents._complete_prefix('Our **best** truck*') == 'Our **best** truck'
+    assert UIComponents._complete_prefix('See <a href="https://x') == 'See '
+    assert UIComponents._complete_prefix('TRUCK: STX\nImage: https://exa') == 'TRUCK: STX\n'
+    assert UIComponents._complete_prefix('Done.\n') == 'Done.\n'
@@ -0,0 +1,44 @@
+import pickle
+
+from src.utils.vehicle_records import CsvTable, build_record, build_records
+
+
+def _vehicle(**fields):
+    vehicle = {
+        'id': 'stx-groom-suite', 'name': 'STX Groom Suite', 'condition': 'New', 'price': '95000',
+        'capacity': '2 horses', 'horses': 2, 'year': 2021, 'url': 'https://stephexhorsetrucks.com/vehicles/stx-groom-suite/',
+        'sources': ['trucks.csv'], 'aliases': ['stx groom suite'],
+    }
+    vehicle.update(fields)
+    return vehicle
+
+
+def test_record_keeps_the_validated_fields():
+    record = build_record(_vehicle())
+    assert (record.price, record.year, record.horses, record.is_used) == (95000, 2021, 2, False)
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_out_of_range_optional_fields_are_dropped_not_the_vehicle():
+    records = build_records({
+        'zero-price': _vehicle(id='zero-price', price=0),
+        'old-truck': _vehicle(id='old-truck', year=1998, condition='Used'),
+    })
+    assert set(records) == {'zero-price', 'old-truck'}
+    assert (records['zero-price'].price, records['zero-price'].year) == (None, 2021)
+    assert (records['old-truck'].price, records['old-truck'].year) == (95000, None)
+
+
+def test_vehicles_without_identity_or_condition_are_skipped():
+    records = build_records({
+        'no-url': _vehicle(id='no-url', url=''),
+        'bad-condition': _vehicle(id='bad-condition', condition='Ex-demo'),
+        'kept': _vehicle(id='kept'),
+    })
+    assert list(records) == ['kept']
+
+
+def test_csv_table_iterates_like_records():
+    table = CsvTable(['name', 'price'], [('A', 1), ('B', 2)])
+    assert list(table) == [{'name': 'A', 'price': 1}, {'name': 'B', 'price': 2}]
+    assert table.column('price') == [1, 2]